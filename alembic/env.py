@@ -10,7 +10,6 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app.database import Base
 from app.models.lead import Lead
-from app.models.automation_log import AutomationLog
 from app.config import settings
 
 # this is the Alembic Config object, which provides
@@ -34,7 +33,7 @@ target_metadata = Base.metadata
 
 def get_url():
     """Obter URL do banco de dados das configurações."""
-    return settings.DATABASE_URL
+    return settings.database_url
 
 
 def run_migrations_offline() -> None:
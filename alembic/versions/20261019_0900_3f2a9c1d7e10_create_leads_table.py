@@ -0,0 +1,84 @@
+"""create leads table
+
+Revision ID: 3f2a9c1d7e10
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f2a9c1d7e10"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXED_COLUMNS = [
+    "id",
+    "nome",
+    "email",
+    "origem",
+    "cidade",
+    "score",
+    "status",
+    "created_at",
+]
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Bancos criados antes das migrações (via create_all) já possuem a tabela
+    if sa.inspect(op.get_bind()).has_table("leads"):
+        return
+
+    op.create_table(
+        "leads",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("nome", sa.String(length=255), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("telefone", sa.String(length=20), nullable=False),
+        sa.Column(
+            "origem",
+            sa.Enum(
+                "META_ADS",
+                "GOOGLE_ADS",
+                "WHATSAPP",
+                "SITE",
+                "INDICACAO",
+                "OUTROS",
+                name="leadorigin",
+            ),
+            nullable=False,
+        ),
+        sa.Column("interesse", sa.Text(), nullable=True),
+        sa.Column("renda_aproximada", sa.Float(), nullable=True),
+        sa.Column("cidade", sa.String(length=100), nullable=True),
+        sa.Column("score", sa.Integer(), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum("QUENTE", "MORNO", "FRIO", "PROCESSANDO", name="leadstatus"),
+            nullable=True,
+        ),
+        sa.Column("processado", sa.String(length=1), nullable=True),
+        sa.Column("observacoes", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("follow_up_date", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    for column in INDEXED_COLUMNS:
+        op.create_index(f"ix_leads_{column}", "leads", [column], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_table("leads")
+    sa.Enum(name="leadstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="leadorigin").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,47 @@
+"""partition leads by created_at month
+
+Revision ID: 8b41d06e5c2f
+Revises: 3f2a9c1d7e10
+Create Date: 2026-10-19 09:10:00.000000
+
+Opcional: só tem efeito no PostgreSQL com LEADS_PARTITIONING_ENABLED=true.
+Converte a tabela leads em uma tabela particionada por RANGE (created_at),
+com uma partição por mês, copiando os dados existentes.
+
+A revisão é registrada mesmo com a flag desligada; para particionar depois,
+habilite a flag e execute `streamleads partitions convert`.
+
+"""
+from alembic import op
+
+from app.config import settings
+from app.services.partitioning import LeadPartitionManager
+
+
+# revision identifiers, used by Alembic.
+revision = "8b41d06e5c2f"
+down_revision = "3f2a9c1d7e10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    bind = op.get_bind()
+    if not settings.leads_partitioning_enabled or bind.dialect.name != "postgresql":
+        return
+
+    manager = LeadPartitionManager(bind)
+    if manager.is_partitioned():
+        return
+
+    manager.rebuild_table(partitioned=True, months_ahead=settings.leads_partitions_ahead_months)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    manager = LeadPartitionManager(op.get_bind())
+    if not manager.is_partitioned():
+        return
+
+    manager.rebuild_table(partitioned=False)
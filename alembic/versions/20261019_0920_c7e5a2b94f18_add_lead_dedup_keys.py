@@ -0,0 +1,109 @@
+"""add lead dedup keys
+
+Revision ID: c7e5a2b94f18
+Revises: 8b41d06e5c2f
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.normalization import (
+    name_key,
+    normalize_city,
+    normalize_email,
+    normalize_phone,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = "c7e5a2b94f18"
+down_revision = "8b41d06e5c2f"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _backfill() -> None:
+    """Calcula as chaves dos leads existentes em lotes ordenados por id"""
+    bind = op.get_bind()
+    leads = sa.table(
+        "leads",
+        sa.column("id", sa.Integer),
+        sa.column("nome", sa.String),
+        sa.column("email", sa.String),
+        sa.column("telefone", sa.String),
+        sa.column("cidade", sa.String),
+        sa.column("email_normalizado", sa.String),
+        sa.column("telefone_normalizado", sa.String),
+        sa.column("nome_chave", sa.String),
+        sa.column("cidade_normalizada", sa.String),
+    )
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                leads.c.id,
+                leads.c.nome,
+                leads.c.email,
+                leads.c.telefone,
+                leads.c.cidade,
+            )
+            .where(leads.c.id > last_id)
+            .order_by(leads.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        bind.execute(
+            leads.update()
+            .where(leads.c.id == sa.bindparam("lead_id"))
+            .values(
+                email_normalizado=sa.bindparam("email_n"),
+                telefone_normalizado=sa.bindparam("telefone_n"),
+                nome_chave=sa.bindparam("nome_k"),
+                cidade_normalizada=sa.bindparam("cidade_n"),
+            ),
+            [
+                {
+                    "lead_id": row.id,
+                    "email_n": normalize_email(row.email),
+                    "telefone_n": normalize_phone(row.telefone),
+                    "nome_k": name_key(row.nome),
+                    "cidade_n": normalize_city(row.cidade),
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    for name, length in [
+        ("email_normalizado", 255),
+        ("telefone_normalizado", 20),
+        ("nome_chave", 100),
+        ("cidade_normalizada", 100),
+    ]:
+        op.add_column("leads", sa.Column(name, sa.String(length=length), nullable=True))
+
+    _backfill()
+
+    op.create_index("ix_leads_email_normalizado", "leads", ["email_normalizado"])
+    op.create_index("ix_leads_telefone_normalizado", "leads", ["telefone_normalizado"])
+    op.create_index("ix_leads_bloqueio", "leads", ["nome_chave", "cidade_normalizada"])
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index("ix_leads_bloqueio", table_name="leads")
+    op.drop_index("ix_leads_telefone_normalizado", table_name="leads")
+    op.drop_index("ix_leads_email_normalizado", table_name="leads")
+    op.drop_column("leads", "cidade_normalizada")
+    op.drop_column("leads", "nome_chave")
+    op.drop_column("leads", "telefone_normalizado")
+    op.drop_column("leads", "email_normalizado")
@@ -0,0 +1,186 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from typing import Optional
+import threading
+
+from app.config import settings
+from app.database import engine
+from app.profiling import get_profile_path, is_admin_token, list_profiles, summarize_profile
+from app.services.diagnostics import memory_diagnostics
+from app.services.rescoring import LeadRescoringService, RescoringCheckpoint
+from loguru import logger
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Dependency que exige o header X-Admin-Token igual a ADMIN_TOKEN"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Rotas administrativas desabilitadas")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Token administrativo inválido")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def get_profiles():
+    """
+    Lista os perfis de CPU gravados (requisições e tarefas em background).
+
+    Para perfilar uma requisição, envie `X-Profile: 1` e `X-Admin-Token`;
+    o nome do arquivo volta no header `X-Profile-File`.
+    """
+    return {"perfis": list_profiles()}
+
+
+@router.get("/profiles/{name}", response_class=PlainTextResponse)
+async def get_profile_summary(
+    name: str,
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|ncalls)$"),
+    limit: int = Query(30, ge=1, le=500)
+):
+    """Resumo das funções mais custosas de um perfil"""
+    path = get_profile_path(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+
+    try:
+        return summarize_profile(path, sort=sort, limit=limit)
+    except Exception as e:
+        logger.error(f"Erro ao ler perfil {name}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+
+@router.get("/profiles/{name}/download")
+async def download_profile(name: str):
+    """Arquivo .pstats (abre com snakeviz, pstats ou conversores para speedscope)"""
+    path = get_profile_path(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+@router.get("/memory")
+async def get_memory_stats(
+    objects: bool = Query(False, description="Conta sessões e leads vivos (percorre o heap)")
+):
+    """
+    Memória (RSS/VMS), coletor de lixo e tracemalloc do worker que atendeu.
+
+    Com vários workers, cada chamada pode cair em um processo diferente: use o
+    `pid` da resposta para acompanhar o mesmo worker.
+    """
+    return memory_diagnostics.process_stats(include_objects=objects)
+
+
+@router.post("/memory/gc")
+async def collect_garbage():
+    """Força uma coleta completa do coletor de lixo"""
+    return memory_diagnostics.collect()
+
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(frames: int = Query(1, ge=1, le=50)):
+    """Inicia o tracemalloc neste worker (há overhead de CPU e memória enquanto ativo)"""
+    return memory_diagnostics.start(frames)
+
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc():
+    """Para o tracemalloc e descarta os snapshots deste worker"""
+    return memory_diagnostics.stop()
+
+
+@router.get("/memory/snapshots")
+async def get_snapshots():
+    """Snapshots do tracemalloc guardados neste worker"""
+    return {"snapshots": memory_diagnostics.list_snapshots()}
+
+
+@router.post("/memory/snapshots", status_code=201)
+async def take_snapshot(label: Optional[str] = Query(None, max_length=100)):
+    """Tira um snapshot do tracemalloc (mantém apenas os mais recentes)"""
+    try:
+        return memory_diagnostics.take_snapshot(label)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/memory/snapshots/{snapshot_id}")
+async def get_snapshot_top(
+    snapshot_id: int,
+    key_type: str = Query("lineno", pattern="^(lineno|filename)$"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Maiores alocações do snapshot por linha ou por arquivo"""
+    try:
+        return memory_diagnostics.top(snapshot_id, key_type=key_type, limit=limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot não encontrado")
+
+
+@router.get("/memory/snapshots/{snapshot_id}/diff")
+async def get_snapshot_diff(
+    snapshot_id: int,
+    base: int = Query(..., description="Id do snapshot de referência"),
+    key_type: str = Query("lineno", pattern="^(lineno|filename)$"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Maiores crescimentos de memória entre o snapshot `base` e este"""
+    try:
+        return memory_diagnostics.diff(snapshot_id, base, key_type=key_type, limit=limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot não encontrado")
+
+
+@router.get("/rescoring")
+async def get_rescoring_status():
+    """
+    Progresso do rescoring atual ou do último executado (CLI ou API).
+
+    Inclui o último id gravado, leads processados e alterados, percentual,
+    vazão e ETA estimado em segundos.
+    """
+    checkpoint = RescoringCheckpoint()
+    state = checkpoint.load()
+    if state is None:
+        raise HTTPException(status_code=404, detail="Nenhum rescoring executado")
+
+    return {**state, "ativo": checkpoint.is_active(state)}
+
+
+@router.post("/rescoring", status_code=202)
+async def start_rescoring(
+    skip_automations: bool = Query(False, description="Não dispara automações para quem mudar de status"),
+    restart: bool = Query(False, description="Ignora o checkpoint e recomeça do primeiro lead"),
+    chunk_size: Optional[int] = Query(None, ge=100, le=100000)
+):
+    """
+    Recalcula score e status de todos os leads com as regras atuais.
+
+    Roda em uma thread deste worker, com os blocos pontuados em processos
+    separados; retoma do checkpoint se uma execução anterior com as mesmas
+    regras foi interrompida. Acompanhe por `GET /admin/rescoring`.
+    """
+    service = LeadRescoringService(
+        engine, chunk_size=chunk_size, trigger_automations=not skip_automations
+    )
+    try:
+        state = service.begin(restart=restart)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro ao iniciar rescoring: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+    threading.Thread(target=_run_rescoring, args=(service, state), name="rescoring", daemon=True).start()
+    return state
+
+
+def _run_rescoring(service: LeadRescoringService, state: dict):
+    try:
+        service.execute(state)
+    except Exception:
+        # O erro já foi registrado no checkpoint e no log
+        pass
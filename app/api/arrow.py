@@ -0,0 +1,88 @@
+"""
+Respostas em Apache Arrow IPC, negociadas pelo header Accept.
+
+`application/vnd.apache.arrow.stream` devolve o formato de streaming e
+`application/vnd.apache.arrow.file` o formato de arquivo (Feather v2). O
+cliente lê as colunas direto dos buffers (pandas, polars, DuckDB), sem
+parsear JSON linha a linha. O pyarrow é importado sob demanda.
+"""
+
+from typing import Dict, List, Optional
+import enum
+
+from fastapi import Request, Response
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+ARROW_FILE_MEDIA_TYPE = "application/vnd.apache.arrow.file"
+
+ARROW_MEDIA_TYPES = (ARROW_STREAM_MEDIA_TYPE, ARROW_FILE_MEDIA_TYPE)
+
+
+def negotiate_arrow(request: Request) -> Optional[str]:
+    """Media type Arrow pedido no Accept (o primeiro listado), ou None para JSON"""
+    for part in request.headers.get("accept", "").split(","):
+        media_type = part.split(";", 1)[0].strip().lower()
+        if media_type in ARROW_MEDIA_TYPES:
+            return media_type
+    return None
+
+
+def leads_table(rows: List[dict], columns: List[str], metadata: Dict[str, str] = None):
+    """
+    Monta uma tabela Arrow com as colunas de leads pedidas.
+
+    Os tipos seguem o schema do arquivo Parquet; enums viram colunas
+    dicionário (Categorical no pandas).
+    """
+    import pyarrow as pa
+
+    from app.repositories.lead_archive import ARCHIVE_SCHEMA, ENUM_COLUMNS
+
+    arrays = []
+    for column in columns:
+        field = ARCHIVE_SCHEMA.field(column)
+        if column in ENUM_COLUMNS:
+            values = [_plain_value(row[column]) for row in rows]
+            arrays.append(pa.array(values, type=field.type).dictionary_encode())
+        else:
+            arrays.append(pa.array([row[column] for row in rows], type=field.type))
+
+    return pa.Table.from_arrays(arrays, names=columns, metadata=metadata)
+
+
+def columns_table(columns: Dict[str, list], types: Dict[str, str] = None):
+    """Tabela a partir de colunas; `types` força tipos por alias (ex.: {"data": "date32"})"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    arrays = []
+    for name, values in columns.items():
+        array = pa.array(values)
+        if types and name in types:
+            array = pc.cast(array, pa.type_for_alias(types[name]))
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, names=list(columns))
+
+
+def arrow_response(table, media_type: str, headers: Dict[str, str] = None) -> Response:
+    """Serializa a tabela no formato IPC pedido"""
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    if media_type == ARROW_FILE_MEDIA_TYPE:
+        writer = pa.ipc.new_file(sink, table.schema)
+    else:
+        writer = pa.ipc.new_stream(sink, table.schema)
+    with writer:
+        writer.write_table(table)
+
+    return Response(
+        content=sink.getvalue().to_pybytes(),
+        media_type=media_type,
+        headers={**(headers or {}), "Vary": "Accept"}
+    )
+
+
+def _plain_value(value):
+    return value.value if isinstance(value, enum.Enum) else value
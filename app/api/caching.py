@@ -0,0 +1,37 @@
+from typing import Optional
+import hashlib
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """Gera um ETag fraco a partir das partes que identificam a versão do recurso"""
+    fingerprint = "|".join("" if part is None else str(part) for part in parts)
+    return f'W/"{hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara If-None-Match com o ETag (comparação fraca, aceita lista e *)"""
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == opaque for candidate in candidates)
+
+
+def check_etag(request: Request, response: Response, *parts) -> Optional[Response]:
+    """
+    Define o header ETag na resposta e retorna um 304 quando o cliente já tem a versão.
+
+    O corpo não é montado nem serializado quando o 304 é retornado.
+    """
+    etag = make_etag(request.url.path, *parts)
+    response.headers["ETag"] = etag
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
@@ -1,24 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import (
+    APIRouter, Depends, HTTPException, Query, BackgroundTasks, Header, Request, Response
+)
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import date
+from typing import List, Optional, Tuple
+from datetime import date, datetime, time, timedelta, timezone
 import math
 
-from app.database import get_db
+from app.config import settings
+from app.database import (
+    SessionLocal, create_read_session, get_db, get_read_db, set_statement_timeout
+)
 from app.schemas.lead import (
-    LeadCreate, LeadUpdate, LeadResponse, LeadListResponse, LeadStats
+    LeadCreate, LeadUpdate, LeadResponse, LeadListResponse, LeadStats, LeadDashboardStats,
+    LeadBulkUpdate, LeadBulkUpdateResponse, LeadTimeSeries
 )
-from app.models.lead import LeadStatus, LeadOrigin
-from app.repositories.lead_repository import LeadRepository
+from app.models.lead import Lead, LeadStatus, LeadOrigin
+from app.repositories.lead_repository import LeadRepository, PUBLIC_COLUMNS
+from app.api.arrow import arrow_response, columns_table, leads_table, negotiate_arrow
+from app.api.caching import check_etag
+from app.api.serialization import route_class
+from app.metrics import BACKGROUND_TASKS_PENDING
+from app.profiling import profile_block, profile_requested
+from app.tracing import current_context as current_trace_context, set_attribute, start_span
 from app.services.scoring import LeadScoringService
 from app.services.automation import AutomationService
+from app.services.deduplication import LeadDeduplicationService
+from app.services.events import (
+    LEAD_CREATED, LEAD_SCORED, LEAD_STATUS_CHANGED, LEADS_BULK_UPDATED, event_broker
+)
+from app.services.export import EXPORT_COLUMNS, MEDIA_TYPES, ExportFormat, LeadExporter
+from app.services.timeseries import Breakdown, Granularity, TimeSeriesBuilder
 from loguru import logger
 
-router = APIRouter(prefix="/leads", tags=["leads"])
+router = APIRouter(prefix="/leads", tags=["leads"], route_class=route_class)
+
+# Campos cuja alteração exige recalcular o score
+SCORING_FIELDS = ['interesse', 'renda_aproximada', 'cidade']
+
+# Leads reprocessados por commit no processamento em lote
+BULK_PROCESS_CHUNK_SIZE = 200
+
+# Itens por página na listagem em JSON (em Arrow vale ARROW_MAX_PAGE_SIZE)
+MAX_JSON_PAGE_SIZE = 100
 
 
 def process_lead_background(lead_id: int, db: Session):
     """Processa lead em background"""
+    set_attribute("lead.id", lead_id)
     try:
         repo = LeadRepository(db)
         scoring_service = LeadScoringService()
@@ -31,10 +60,12 @@ def process_lead_background(lead_id: int, db: Session):
             return
         
         # Processar scoring
+        previous_status = lead.status
         lead = scoring_service.process_lead(lead)
         
         # Atualizar no banco
         repo.db.commit()
+        _publish_scoring_events(lead, previous_status)
         
         # Executar automações
         automation_result = automation_service.process_lead_actions(lead)
@@ -47,6 +78,140 @@ def process_lead_background(lead_id: int, db: Session):
         db.close()
 
 
+def _enqueue_background(background_tasks: BackgroundTasks, func, *args):
+    """Agenda uma tarefa em background contabilizando o backlog nas métricas"""
+    # O trace da requisição continua na tarefa, mesmo rodando em outra thread
+    trace_context = current_trace_context()
+    # Requisições perfiladas a pedido também perfilam suas tarefas
+    force_profile = profile_requested.get()
+    
+    def run():
+        try:
+            with start_span(f"background.{func.__name__}", parent=trace_context), \
+                    profile_block(f"background_{func.__name__}", force=force_profile):
+                func(*args)
+        finally:
+            BACKGROUND_TASKS_PENDING.dec()
+    
+    BACKGROUND_TASKS_PENDING.inc()
+    background_tasks.add_task(run)
+
+
+def _publish_scoring_events(lead: Lead, previous_status: LeadStatus):
+    """Notifica os assinantes sobre o scoring e a eventual mudança de status"""
+    event_broker.publish_lead(LEAD_SCORED, lead)
+    if lead.status != previous_status:
+        event_broker.publish_lead(
+            LEAD_STATUS_CHANGED,
+            lead,
+            status_anterior=previous_status.value if previous_status else None
+        )
+
+
+def _parse_fields(fields: str) -> List[str]:
+    """Valida a lista de campos pedida em `fields`; o id é sempre incluído"""
+    selected = ["id"]
+    for field in fields.split(","):
+        field = field.strip()
+        if field and field not in selected:
+            selected.append(field)
+    
+    invalid = [field for field in selected if field not in PUBLIC_COLUMNS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos inválidos: {', '.join(invalid)}. Disponíveis: {', '.join(PUBLIC_COLUMNS)}"
+        )
+    return selected
+
+
+def _list_fields(fields: Optional[str], per_page: int, arrow_media_type: Optional[str]) -> Optional[List[str]]:
+    """
+    Colunas consultadas pela listagem; None usa o caminho completo com
+    LeadResponse. Páginas acima de MAX_JSON_PAGE_SIZE só saem em Arrow.
+    """
+    if not arrow_media_type and per_page > MAX_JSON_PAGE_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"per_page acima de {MAX_JSON_PAGE_SIZE} só é aceito em Arrow IPC "
+                   f"(Accept: application/vnd.apache.arrow.stream)"
+        )
+    
+    if fields:
+        return _parse_fields(fields)
+    if settings.fast_json_enabled or arrow_media_type:
+        # Caminho rápido: linhas do banco serializadas direto pelo orjson
+        return list(PUBLIC_COLUMNS)
+    return None
+
+
+def _timeseries_window(data_inicio: Optional[date], data_fim: Optional[date]) -> Tuple[datetime, datetime]:
+    """Valida o intervalo da série e o converte em [início, fim) em UTC"""
+    data_fim = data_fim or datetime.now(timezone.utc).date()
+    data_inicio = data_inicio or data_fim - timedelta(days=29)
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=422, detail="data_inicio deve ser anterior a data_fim")
+    if (data_fim - data_inicio).days >= settings.timeseries_max_days:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Intervalo máximo da série: {settings.timeseries_max_days} dias"
+        )
+    
+    start = datetime.combine(data_inicio, time.min, tzinfo=timezone.utc)
+    end = datetime.combine(data_fim + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    return start, end
+
+
+def _timeseries_response(
+    builder: TimeSeriesBuilder,
+    series: List[dict],
+    breakdown: Optional[Breakdown],
+    max_points: Optional[int]
+) -> LeadTimeSeries:
+    return LeadTimeSeries(
+        granularidade=builder.granularity.value,
+        breakdown=breakdown.value if breakdown else None,
+        inicio=builder.start,
+        fim=builder.end,
+        buckets=len(builder.buckets),
+        amostrado=bool(max_points) and len(builder.buckets) > max_points,
+        series=series
+    )
+
+
+def process_leads_background(lead_ids: List[int]):
+    """Reprocessa vários leads em background, em blocos, com sessão própria"""
+    db = SessionLocal()
+    try:
+        scoring_service = LeadScoringService()
+        automation_service = AutomationService()
+        
+        for start in range(0, len(lead_ids), BULK_PROCESS_CHUNK_SIZE):
+            chunk = lead_ids[start:start + BULK_PROCESS_CHUNK_SIZE]
+            leads = db.query(Lead).filter(Lead.id.in_(chunk)).all()
+            previous_status = {lead.id: lead.status for lead in leads}
+            
+            for lead in leads:
+                scoring_service.process_lead(lead)
+            db.commit()
+            
+            for lead in leads:
+                _publish_scoring_events(lead, previous_status[lead.id])
+            
+            # Automações só para leads que mudaram de classificação
+            for lead in leads:
+                if lead.status != previous_status[lead.id]:
+                    automation_service.process_lead_actions(lead)
+        
+        logger.info(f"Reprocessamento em lote concluído: {len(lead_ids)} leads")
+        
+    except Exception as e:
+        logger.error(f"Erro no reprocessamento em lote: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
 @router.post("/", response_model=LeadResponse, status_code=201)
 async def create_lead(
     lead_data: LeadCreate,
@@ -56,6 +221,9 @@ async def create_lead(
     """
     Cria um novo lead e processa automaticamente o scoring e automações.
     
+    Leads duplicados (mesmo email ou telefone normalizados, ou mesmo nome e
+    cidade com email/telefone compatíveis) são rejeitados.
+    
     - **nome**: Nome completo do lead
     - **email**: Email válido do lead
     - **telefone**: Telefone com DDD (10 ou 11 dígitos)
@@ -67,19 +235,24 @@ async def create_lead(
     try:
         repo = LeadRepository(db)
         
-        # Verificar se já existe lead com mesmo email
-        existing_lead = repo.get_by_email(lead_data.email)
-        if existing_lead:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Já existe um lead cadastrado com o email {lead_data.email}"
-            )
+        # Verificar duplicidade (email/telefone normalizados ou nome + cidade)
+        duplicate = LeadDeduplicationService(db).find_duplicate(lead_data)
+        if duplicate:
+            existing_lead, motivo = duplicate
+            detail = {
+                "email": f"Já existe um lead cadastrado com o email {lead_data.email}",
+                "telefone": f"Já existe um lead cadastrado com o telefone {lead_data.telefone}",
+                "nome_cidade": f"Já existe um lead semelhante cadastrado (ID {existing_lead.id})"
+            }[motivo]
+            raise HTTPException(status_code=400, detail=detail)
         
         # Criar lead
         lead = repo.create(lead_data)
         
         # Processar em background
-        background_tasks.add_task(process_lead_background, lead.id, db)
+        set_attribute("lead.id", lead.id)
+        _enqueue_background(background_tasks, process_lead_background, lead.id, db)
+        event_broker.publish_lead(LEAD_CREATED, lead)
         
         logger.info(f"Lead criado e enviado para processamento - ID: {lead.id}")
         return lead
@@ -93,15 +266,24 @@ async def create_lead(
 
 @router.get("/", response_model=LeadListResponse)
 async def list_leads(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Número da página"),
-    per_page: int = Query(20, ge=1, le=100, description="Itens por página"),
+    per_page: int = Query(
+        20, ge=1, le=settings.arrow_max_page_size,
+        description=f"Itens por página (até {MAX_JSON_PAGE_SIZE} em JSON)"
+    ),
     status: Optional[LeadStatus] = Query(None, description="Filtrar por status"),
     origem: Optional[LeadOrigin] = Query(None, description="Filtrar por origem"),
     cidade: Optional[str] = Query(None, description="Filtrar por cidade"),
     data_inicio: Optional[date] = Query(None, description="Data início (YYYY-MM-DD)"),
     data_fim: Optional[date] = Query(None, description="Data fim (YYYY-MM-DD)"),
     search: Optional[str] = Query(None, description="Buscar por nome, email ou telefone"),
-    db: Session = Depends(get_db)
+    include_archived: bool = Query(False, description="Incluir leads arquivados (cold storage)"),
+    fields: Optional[str] = Query(
+        None, description="Campos a retornar, separados por vírgula (ex.: nome,status,score)"
+    ),
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista leads com filtros e paginação.
@@ -112,21 +294,82 @@ async def list_leads(
     - **cidade**: Nome da cidade
     - **data_inicio/data_fim**: Período de criação
     - **search**: Busca por nome, email ou telefone
+    - **include_archived**: Inclui leads movidos para o arquivo Parquet
+    
+    Com **fields**, apenas as colunas pedidas (e sempre o id) são consultadas e
+    retornadas, sem a validação completa de LeadResponse.
+    
+    Com `Accept: application/vnd.apache.arrow.stream` (ou `.file`, Feather) a
+    página vem em Arrow IPC, com total e paginação nos metadados do schema, e
+    aceita até ARROW_MAX_PAGE_SIZE itens.
+    
+    Responde com ETag; `If-None-Match` com o mesmo valor retorna 304.
     """
     try:
+        arrow_media_type = negotiate_arrow(request)
+        selected_fields = _list_fields(fields, per_page, arrow_media_type)
+        
         repo = LeadRepository(db)
         
+        # Buscas textuais (ILIKE) recebem um timeout mais restrito
+        if search:
+            set_statement_timeout(db, settings.db_search_statement_timeout_ms)
+        
+        filters = {
+            "status": status,
+            "origem": origem,
+            "cidade": cidade,
+            "data_inicio": data_inicio,
+            "data_fim": data_fim,
+            "search": search
+        }
+        
+        # ETag pela versão do conjunto filtrado + parâmetros da página + representação
+        response.headers["Vary"] = "Accept"
+        not_modified = check_etag(
+            request, response, *repo.get_fingerprint(**filters), str(request.query_params),
+            arrow_media_type
+        )
+        if not_modified:
+            return not_modified
+        
         skip = (page - 1) * per_page
         
+        if selected_fields:
+            rows, total = repo.get_projected(
+                selected_fields,
+                skip=skip,
+                limit=per_page,
+                include_archived=include_archived,
+                **filters
+            )
+            total_pages = math.ceil(total / per_page) if total > 0 else 1
+            
+            if arrow_media_type:
+                table = leads_table(rows, selected_fields, metadata={
+                    "total": str(total),
+                    "page": str(page),
+                    "per_page": str(per_page),
+                    "total_pages": str(total_pages)
+                })
+                return arrow_response(table, arrow_media_type, headers={"ETag": response.headers["ETag"]})
+            
+            return ORJSONResponse(
+                {
+                    "leads": rows,
+                    "total": total,
+                    "page": page,
+                    "per_page": per_page,
+                    "total_pages": total_pages
+                },
+                headers={"ETag": response.headers["ETag"], "Vary": "Accept"}
+            )
+        
         leads, total = repo.get_all(
             skip=skip,
             limit=per_page,
-            status=status,
-            origem=origem,
-            cidade=cidade,
-            data_inicio=data_inicio,
-            data_fim=data_fim,
-            search=search
+            include_archived=include_archived,
+            **filters
         )
         
         total_pages = math.ceil(total / per_page) if total > 0 else 1
@@ -139,23 +382,174 @@ async def list_leads(
             total_pages=total_pages
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro ao listar leads: {str(e)}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 
+@router.get("/export")
+async def export_leads(
+    request: Request,
+    formato: Optional[ExportFormat] = Query(
+        None, description="csv, ndjson, parquet, arrow ou feather (padrão: pelo Accept, senão csv)"
+    ),
+    status: Optional[LeadStatus] = Query(None, description="Filtrar por status"),
+    origem: Optional[LeadOrigin] = Query(None, description="Filtrar por origem"),
+    cidade: Optional[str] = Query(None, description="Filtrar por cidade"),
+    data_inicio: Optional[date] = Query(None, description="Data início (YYYY-MM-DD)"),
+    data_fim: Optional[date] = Query(None, description="Data fim (YYYY-MM-DD)"),
+    search: Optional[str] = Query(None, description="Buscar por nome, email ou telefone")
+):
+    """
+    Exporta todos os leads filtrados em CSV, NDJSON, Parquet ou Arrow IPC.
+    
+    O arquivo é gerado enquanto as linhas são lidas do banco (cursor do lado do
+    servidor), sem paginação e com uso de memória constante. Sem `formato`, um
+    Accept Arrow (stream ou file) escolhe arrow/feather.
+    """
+    if formato is None:
+        formato = {
+            MEDIA_TYPES[ExportFormat.ARROW]: ExportFormat.ARROW,
+            MEDIA_TYPES[ExportFormat.FEATHER]: ExportFormat.FEATHER
+        }.get(negotiate_arrow(request), ExportFormat.CSV)
+    
+    filters = {
+        "status": status,
+        "origem": origem,
+        "cidade": cidade,
+        "data_inicio": data_inicio,
+        "data_fim": data_fim,
+        "search": search
+    }
+    exporter = LeadExporter(EXPORT_COLUMNS, batch_size=settings.export_batch_size)
+    
+    def generate():
+        # Sessão própria: o gerador continua rodando depois que o endpoint retorna
+        db = create_read_session(request)
+        try:
+            rows = LeadRepository(db).iter_rows(
+                EXPORT_COLUMNS, batch_size=settings.export_batch_size, **filters
+            )
+            yield from exporter.stream(rows, formato)
+        except Exception as e:
+            logger.error(f"Erro ao exportar leads: {str(e)}")
+            raise
+        finally:
+            db.close()
+    
+    filename = f"leads_{date.today():%Y%m%d}.{formato.value}"
+    return StreamingResponse(
+        generate(),
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/events")
+async def lead_events(
+    last_event_id: Optional[str] = Header(None, description="Último evento recebido (retomada)")
+):
+    """
+    Fluxo de eventos de leads em tempo real (Server-Sent Events).
+    
+    Eventos: **lead.created**, **lead.scored**, **lead.status_changed** e
+    **leads.bulk_updated** (mudança de status em lote, acima de
+    EVENTS_BULK_THRESHOLD leads).
+    Ao reconectar, o navegador envia `Last-Event-ID` e recebe os eventos
+    perdidos ainda presentes no histórico. Clientes lentos demais são
+    desconectados e retomam do último id.
+    """
+    return StreamingResponse(
+        event_broker.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/bulk", response_model=LeadBulkUpdateResponse)
+async def bulk_update_leads(
+    bulk_data: LeadBulkUpdate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Atualiza vários leads de uma vez, selecionados por **ids** ou por **filtro**.
+    
+    As alterações são aplicadas em um único UPDATE. Apenas leads cujos campos
+    de scoring (interesse, renda, cidade) realmente mudaram são reprocessados,
+    e só os leads cujo status mudou geram eventos.
+    """
+    try:
+        repo = LeadRepository(db)
+        changes = bulk_data.alteracoes.model_dump(exclude_unset=True)
+        filters = bulk_data.filtro.model_dump(exclude_none=True) if bulk_data.filtro else {}
+        
+        updated_ids, rescore_ids, status_changes = repo.bulk_update(
+            changes,
+            ids=bulk_data.ids,
+            rescore_fields=SCORING_FIELDS,
+            **filters
+        )
+        
+        if len(status_changes) > settings.events_bulk_threshold:
+            event_broker.publish(LEADS_BULK_UPDATED, {
+                "ids": list(status_changes),
+                "total": len(status_changes),
+                "status": changes["status"].value
+            })
+        else:
+            for lead_id, previous_status in status_changes.items():
+                event_broker.publish(LEAD_STATUS_CHANGED, {
+                    "id": lead_id,
+                    "status": changes["status"].value,
+                    "status_anterior": previous_status.value if previous_status else None
+                })
+        
+        if rescore_ids:
+            _enqueue_background(background_tasks, process_leads_background, rescore_ids)
+            logger.info(f"{len(rescore_ids)} leads enviados para reprocessamento em lote")
+        
+        return LeadBulkUpdateResponse(
+            atualizados=len(updated_ids),
+            reprocessando=len(rescore_ids),
+            ids=updated_ids
+        )
+        
+    except Exception as e:
+        logger.error(f"Erro na atualização em lote: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+
 @router.get("/{lead_id}", response_model=LeadResponse)
-async def get_lead(lead_id: int, db: Session = Depends(get_db)):
+async def get_lead(
+    lead_id: int,
+    request: Request,
+    response: Response,
+    include_archived: bool = Query(False, description="Buscar também no arquivo morto"),
+    db: Session = Depends(get_read_db)
+):
     """
     Busca um lead específico por ID.
+    
+    Com `include_archived=true`, leads arquivados (cold storage) também são
+    encontrados; fica desligado por padrão para que ids inexistentes não
+    custem uma varredura do arquivo Parquet. Responde com ETag (id + updated_at); `If-None-Match` igual retorna 304.
     """
     try:
         repo = LeadRepository(db)
-        lead = repo.get_by_id(lead_id)
+        lead = repo.get_by_id(lead_id, include_archived=include_archived)
         
         if not lead:
             raise HTTPException(status_code=404, detail="Lead não encontrado")
         
+        not_modified = check_etag(
+            request, response, lead.id, lead.updated_at or lead.created_at
+        )
+        if not_modified:
+            return not_modified
+        
         return lead
         
     except HTTPException:
@@ -188,19 +582,24 @@ async def update_lead(
         # Verificar email duplicado se email for alterado
         if lead_data.email and lead_data.email != existing_lead.email:
             email_exists = repo.get_by_email(lead_data.email)
-            if email_exists:
+            if email_exists and email_exists.id != lead_id:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Já existe um lead cadastrado com o email {lead_data.email}"
                 )
         
         # Atualizar lead
+        previous_status = existing_lead.status
         updated_lead = repo.update(lead_id, lead_data)
         
+        if updated_lead.status != previous_status:
+            event_broker.publish_lead(
+                LEAD_STATUS_CHANGED, updated_lead, status_anterior=previous_status.value
+            )
+        
         # Se campos relevantes para scoring foram alterados, reprocessar
-        scoring_fields = ['interesse', 'renda_aproximada', 'cidade']
-        if any(getattr(lead_data, field, None) is not None for field in scoring_fields):
-            background_tasks.add_task(process_lead_background, lead_id, db)
+        if any(getattr(lead_data, field, None) is not None for field in SCORING_FIELDS):
+            _enqueue_background(background_tasks, process_lead_background, lead_id, db)
             logger.info(f"Lead {lead_id} enviado para reprocessamento após atualização")
         
         return updated_lead
@@ -236,7 +635,7 @@ async def delete_lead(lead_id: int, db: Session = Depends(get_db)):
 @router.get("/{lead_id}/scoring", response_model=dict)
 async def get_lead_scoring_explanation(
     lead_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna explicação detalhada do scoring de um lead.
@@ -281,7 +680,7 @@ async def reprocess_lead(
         db.commit()
         
         # Processar em background
-        background_tasks.add_task(process_lead_background, lead_id, db)
+        _enqueue_background(background_tasks, process_lead_background, lead_id, db)
         
         return {
             "message": f"Lead {lead_id} enviado para reprocessamento",
@@ -296,12 +695,22 @@ async def reprocess_lead(
 
 
 @router.get("/stats/overview", response_model=LeadStats)
-async def get_leads_stats(db: Session = Depends(get_db)):
+async def get_leads_stats(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
+):
     """
     Retorna estatísticas gerais dos leads.
     """
     try:
         repo = LeadRepository(db)
+        
+        # leads_hoje depende da data: ela entra no ETag
+        not_modified = check_etag(request, response, *repo.get_fingerprint(), date.today())
+        if not_modified:
+            return not_modified
+        
         stats = repo.get_stats()
         return LeadStats(**stats)
         
@@ -310,14 +719,146 @@ async def get_leads_stats(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 
+@router.get("/stats/dashboard", response_model=LeadDashboardStats)
+async def get_dashboard_stats(
+    request: Request,
+    response: Response,
+    days: int = Query(30, ge=1, le=365, description="Dias da série por período"),
+    granularity: Optional[Granularity] = Query(
+        None, description="Inclui a série temporal (hour, day, week ou month)"
+    ),
+    data_inicio: Optional[date] = Query(None, description="Início da série temporal (padrão: 30 dias atrás)"),
+    data_fim: Optional[date] = Query(None, description="Fim da série temporal, inclusive (padrão: hoje)"),
+    breakdown: Optional[Breakdown] = Query(None, description="Uma série por origem ou status"),
+    max_points: Optional[int] = Query(
+        None, ge=3, le=10000, description="Reduz cada série a no máximo N pontos (LTTB)"
+    ),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Retorna resumo, leads por origem e leads por dia em uma única consulta.
+    
+    Substitui as três chamadas da página de overview (overview, origem e
+    periodo) com um snapshot consistente dos dados. Com **granularity**, inclui
+    em `serie_temporal` a mesma série de /stats/timeseries, calculada na mesma
+    consulta.
+    """
+    try:
+        builder = None
+        serie = None
+        if granularity:
+            start, end = _timeseries_window(data_inicio, data_fim)
+            builder = TimeSeriesBuilder(granularity, start, end)
+            serie = (granularity.value, start, end, breakdown.value if breakdown else None)
+        
+        stats = LeadRepository(db).get_dashboard_stats(days, serie)
+        
+        # O fingerprint vem na mesma consulta; o 304 economiza a serialização e a rede
+        not_modified = check_etag(
+            request, response, *stats.pop("fingerprint"), date.today(), days,
+            str(request.query_params), builder and builder.end
+        )
+        if not_modified:
+            return not_modified
+        
+        rows = stats.pop("serie")
+        if builder:
+            stats["serie_temporal"] = _timeseries_response(
+                builder, builder.build(rows, max_points), breakdown, max_points
+            )
+        
+        return LeadDashboardStats(**stats, dias=days)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao buscar estatísticas do dashboard: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+
+@router.get("/stats/timeseries", response_model=LeadTimeSeries)
+async def get_leads_timeseries(
+    request: Request,
+    response: Response,
+    granularity: Granularity = Query(Granularity.DAY, description="hour, day, week ou month"),
+    data_inicio: Optional[date] = Query(None, description="Data início (padrão: 30 dias atrás)"),
+    data_fim: Optional[date] = Query(None, description="Data fim, inclusive (padrão: hoje)"),
+    breakdown: Optional[Breakdown] = Query(None, description="Uma série por origem ou status"),
+    max_points: Optional[int] = Query(
+        None, ge=3, le=10000, description="Reduz cada série a no máximo N pontos (LTTB)"
+    ),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Série temporal de leads criados, agregada no banco por hora, dia, semana
+    (começando na segunda) ou mês, em UTC.
+    
+    Buckets sem leads vêm com zero. Com **max_points**, cada série é reduzida
+    por Largest-Triangle-Three-Buckets, preservando picos e vales. Com Accept
+    Arrow, responde uma tabela longa (t, serie, count) em Arrow IPC.
+    """
+    try:
+        start, end = _timeseries_window(data_inicio, data_fim)
+        repo = LeadRepository(db)
+        arrow_media_type = negotiate_arrow(request)
+        
+        response.headers["Vary"] = "Accept"
+        not_modified = check_etag(
+            request, response, *repo.get_fingerprint(), str(request.query_params),
+            end, arrow_media_type
+        )
+        if not_modified:
+            return not_modified
+        
+        builder = TimeSeriesBuilder(granularity, start, end)
+        rows = repo.get_timeseries(
+            granularity.value, start, end, breakdown.value if breakdown else None
+        )
+        series = builder.build(rows, max_points)
+        
+        if arrow_media_type:
+            table = columns_table({
+                "t": [point["t"] for item in series for point in item["pontos"]],
+                "serie": [item["nome"] for item in series for _ in item["pontos"]],
+                "count": [point["count"] for item in series for point in item["pontos"]]
+            }, {"count": "int64"})
+            return arrow_response(table, arrow_media_type, headers={"ETag": response.headers["ETag"]})
+        
+        return _timeseries_response(builder, series, breakdown, max_points)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao buscar série temporal de leads: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+
 @router.get("/stats/origem", response_model=dict)
-async def get_leads_by_origem(db: Session = Depends(get_db)):
+async def get_leads_by_origem(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
+):
     """
     Retorna contagem de leads por origem.
+    
+    Com Accept Arrow, responde uma tabela (origem, count) em Arrow IPC.
     """
     try:
         repo = LeadRepository(db)
+        arrow_media_type = negotiate_arrow(request)
+        
+        response.headers["Vary"] = "Accept"
+        not_modified = check_etag(request, response, *repo.get_fingerprint(), arrow_media_type)
+        if not_modified:
+            return not_modified
+        
         stats = repo.get_leads_by_origem()
+        
+        if arrow_media_type:
+            table = columns_table({"origem": list(stats), "count": list(stats.values())}, {"count": "int64"})
+            return arrow_response(table, arrow_media_type, headers={"ETag": response.headers["ETag"]})
+        
         return {"leads_por_origem": stats}
         
     except Exception as e:
@@ -327,15 +868,36 @@ async def get_leads_by_origem(db: Session = Depends(get_db)):
 
 @router.get("/stats/periodo", response_model=dict)
 async def get_leads_by_period(
+    request: Request,
+    response: Response,
     days: int = Query(30, ge=1, le=365, description="Número de dias"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna leads agrupados por data dos últimos N dias.
+    
+    Com Accept Arrow, responde uma tabela (data como date32, count) em Arrow IPC.
     """
     try:
         repo = LeadRepository(db)
+        arrow_media_type = negotiate_arrow(request)
+        
+        response.headers["Vary"] = "Accept"
+        not_modified = check_etag(
+            request, response, *repo.get_fingerprint(), date.today(), days, arrow_media_type
+        )
+        if not_modified:
+            return not_modified
+        
         stats = repo.get_leads_by_period(days)
+        
+        if arrow_media_type:
+            table = columns_table(
+                {"data": [row["data"] for row in stats], "count": [row["count"] for row in stats]},
+                {"data": "date32", "count": "int64"}
+            )
+            return arrow_response(table, arrow_media_type, headers={"ETag": response.headers["ETag"]})
+        
         return {"leads_por_periodo": stats}
         
     except Exception as e:
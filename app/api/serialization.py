@@ -0,0 +1,34 @@
+from typing import Callable
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute
+
+from app.config import settings
+
+
+class ORJSONRequest(Request):
+    """Request que decodifica o corpo JSON com orjson"""
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """Rota que entrega aos endpoints um ORJSONRequest"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return route_handler
+
+
+# Classes usadas pela aplicação conforme FAST_JSON_ENABLED
+default_response_class = ORJSONResponse if settings.fast_json_enabled else JSONResponse
+route_class = ORJSONRoute if settings.fast_json_enabled else APIRoute
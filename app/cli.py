@@ -0,0 +1,254 @@
+"""
+Comandos de manutenção do StreamLeads (`streamleads --help`).
+"""
+
+import os
+
+import click
+from loguru import logger
+
+from app.config import settings
+
+
+@click.group()
+def main():
+    """StreamLeads - comandos de manutenção"""
+
+
+@main.group()
+def partitions():
+    """Gerencia as partições mensais da tabela leads"""
+
+
+def _partition_manager():
+    from app.database import engine
+    from app.services.partitioning import LeadPartitionManager
+
+    manager = LeadPartitionManager(engine)
+    if not manager.is_partitioned():
+        raise click.ClickException(
+            "A tabela leads não é particionada. Habilite LEADS_PARTITIONING_ENABLED "
+            "e execute `streamleads partitions convert`."
+        )
+    return manager
+
+
+@partitions.command("convert")
+@click.option(
+    "--months-ahead",
+    type=int,
+    default=settings.leads_partitions_ahead_months,
+    show_default=True,
+    help="Meses futuros com partição criada antecipadamente"
+)
+@click.confirmation_option(
+    prompt="A tabela leads será recriada e ficará bloqueada durante a cópia. Continuar?"
+)
+def partitions_convert(months_ahead):
+    """Converte a tabela leads em particionada por mês, copiando os dados"""
+    from app.database import engine
+    from app.services.partitioning import LeadPartitionManager
+
+    manager = LeadPartitionManager(engine)
+    if not manager.is_supported():
+        raise click.ClickException("Particionamento disponível apenas no PostgreSQL.")
+    if manager.is_partitioned():
+        raise click.ClickException("A tabela leads já é particionada.")
+
+    manager.rebuild_table(partitioned=True, months_ahead=months_ahead)
+    for partition in manager.list_partitions():
+        click.echo(f"{partition['nome']}: {partition['limites']}")
+
+
+@partitions.command("list")
+def partitions_list():
+    """Lista as partições existentes"""
+    for partition in _partition_manager().list_partitions():
+        click.echo(f"{partition['nome']}: {partition['limites']}")
+
+
+@partitions.command("maintain")
+@click.option(
+    "--months-ahead",
+    type=int,
+    default=settings.leads_partitions_ahead_months,
+    show_default=True,
+    help="Meses futuros com partição criada antecipadamente"
+)
+@click.option(
+    "--retention-months",
+    type=int,
+    default=settings.leads_partitions_retention_months,
+    help="Desanexa partições mais antigas que N meses (padrão: não desanexa)"
+)
+@click.option("--drop", is_flag=True, help="Remove as partições desanexadas")
+def partitions_maintain(months_ahead, retention_months, drop):
+    """Cria partições futuras e desanexa as antigas"""
+    manager = _partition_manager()
+
+    created = manager.ensure_partitions(months_ahead)
+    logger.info(f"Partições criadas: {created or 'nenhuma'}")
+
+    if retention_months:
+        detached = manager.detach_old_partitions(retention_months, drop=drop)
+        logger.info(f"Partições desanexadas: {detached or 'nenhuma'}")
+
+
+@main.command("archive")
+@click.option(
+    "--older-than-days",
+    type=int,
+    default=settings.archive_after_days,
+    show_default=True,
+    help="Arquiva leads processados criados há mais de N dias"
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    default=settings.archive_batch_size,
+    show_default=True,
+    help="Leads por lote"
+)
+@click.option("--max-batches", type=int, default=None, help="Limite de lotes nesta execução")
+def archive(older_than_days, batch_size, max_batches):
+    """Move leads antigos e processados para arquivos Parquet"""
+    from app.database import SessionLocal
+    from app.services.archive import LeadArchiveService
+
+    db = SessionLocal()
+    try:
+        result = LeadArchiveService(db).run(
+            older_than_days=older_than_days,
+            batch_size=batch_size,
+            max_batches=max_batches
+        )
+        click.echo(result)
+    finally:
+        db.close()
+
+
+@main.command("dedupe")
+@click.option("--dry-run", is_flag=True, help="Apenas lista os grupos de duplicados")
+def dedupe(dry_run):
+    """Preenche chaves de deduplicação e mescla leads duplicados"""
+    from app.database import SessionLocal
+    from app.services.deduplication import LeadDeduplicationService
+
+    db = SessionLocal()
+    try:
+        click.echo(LeadDeduplicationService(db).merge_duplicates(dry_run=dry_run))
+    finally:
+        db.close()
+
+
+def _weights_option(value):
+    from app.services.synthetic import parse_weights
+
+    try:
+        return parse_weights(value) if value else None
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+@main.command("generate-leads")
+@click.argument("count", type=int)
+@click.option("--seed", type=int, default=42, show_default=True, help="Semente (mesma semente, mesmos dados)")
+@click.option("--days", type=int, default=365, show_default=True, help="Período coberto por created_at")
+@click.option(
+    "--origem", "origem_weights", callback=lambda ctx, param, value: _weights_option(value),
+    help='Pesos por origem (ex.: "Meta Ads=40,Google Ads=30,Site=30")'
+)
+@click.option(
+    "--cidade", "cidade_weights", callback=lambda ctx, param, value: _weights_option(value),
+    help='Pesos por cidade (ex.: "São Paulo=50,Campinas=10")'
+)
+@click.option(
+    "--interesse", "interesse_weights", callback=lambda ctx, param, value: _weights_option(value),
+    help='Pesos das palavras de interesse (ex.: "apartamento=5,terreno=1")'
+)
+@click.option("--renda-mediana", type=float, default=6000.0, show_default=True, help="Mediana da renda (log-normal)")
+@click.option("--renda-dispersao", type=float, default=0.7, show_default=True, help="Sigma da renda (log-normal)")
+@click.option(
+    "--processados", "processed_ratio", type=click.FloatRange(0, 1), default=0.9, show_default=True,
+    help="Fração já pontuada pelas regras de scoring (o restante fica em processamento)"
+)
+@click.option(
+    "--workers", type=int, default=min(os.cpu_count() or 1, 8), show_default=True,
+    help="Processos gerando os blocos enquanto o principal grava no banco"
+)
+@click.option(
+    "--method", type=click.Choice(["auto", "copy", "insert"]), default="auto", show_default=True,
+    help="auto: COPY no PostgreSQL, INSERT em lote nos demais"
+)
+@click.option(
+    "--rebuild-indexes", is_flag=True,
+    help="Remove os índices de leads durante a carga e os recria no fim (mais rápido; sem tráfego)"
+)
+def generate_leads(count, seed, days, origem_weights, cidade_weights, interesse_weights,
+                   renda_mediana, renda_dispersao, processed_ratio, workers, method,
+                   rebuild_indexes):
+    """Insere COUNT leads sintéticos e determinísticos (benchmarks)"""
+    from app.database import engine
+    from app.services.synthetic import SyntheticLeadGenerator, SyntheticLeadLoader
+
+    try:
+        generator = SyntheticLeadGenerator(
+            seed=seed,
+            days=days,
+            origem_weights=origem_weights,
+            cidade_weights=cidade_weights,
+            interesse_weights=interesse_weights,
+            renda_mediana=renda_mediana,
+            renda_dispersao=renda_dispersao,
+            processed_ratio=processed_ratio
+        )
+        loader = SyntheticLeadLoader(
+            engine, method=method, workers=workers, rebuild_indexes=rebuild_indexes
+        )
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+
+    click.echo(loader.load(generator, count))
+
+
+@main.command("rescore")
+@click.option(
+    "--chunk-size",
+    type=int,
+    default=settings.rescoring_chunk_size,
+    show_default=True,
+    help="Leads por bloco (unidade de leitura, de scoring e de UPDATE)"
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=settings.rescoring_workers,
+    show_default=True,
+    help="Processos de scoring (0: um por CPU, até 8)"
+)
+@click.option(
+    "--skip-automations", is_flag=True,
+    help="Não dispara automações nem eventos para os leads que mudaram de status"
+)
+@click.option("--restart", is_flag=True, help="Ignora o checkpoint e recomeça do primeiro lead")
+def rescore(chunk_size, workers, skip_automations, restart):
+    """Recalcula score e status de todos os leads com as regras atuais (retomável)"""
+    from app.database import engine
+    from app.services.rescoring import LeadRescoringService
+
+    service = LeadRescoringService(
+        engine,
+        chunk_size=chunk_size,
+        workers=workers,
+        trigger_automations=not skip_automations
+    )
+    try:
+        state = service.begin(restart=restart)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(service.execute(state))
+
+
+if __name__ == "__main__":
+    main()
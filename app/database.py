@@ -1,22 +1,283 @@
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.config import settings
+from loguru import logger
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que registra tempo de espera e timeouts no checkout"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Rótulo do engine nas métricas ("primary" ou "replica:<host>")
+        self.metrics_label = "primary"
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            from app.metrics import DB_POOL_TIMEOUTS
+
+            with self._stats_lock:
+                self.timeouts += 1
+            DB_POOL_TIMEOUTS.labels(self.metrics_label).inc()
+            logger.warning(f"Timeout aguardando conexão do pool: {self.status()}")
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # dispose() troca o pool por uma nova instância; o rótulo acompanha
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+    def get_stats(self) -> dict:
+        """Retorna estatísticas de uso do pool"""
+        with self._stats_lock:
+            avg_wait = self.wait_total / self.checkouts if self.checkouts else 0.0
+            return {
+                "size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                "overflow": max(self.overflow(), 0),
+                "max_overflow": self._max_overflow,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(avg_wait * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3)
+            }
+
+
+def _register_idle_pre_ping(engine: Engine, idle_seconds: float):
+    """Faz ping apenas em conexões que ficaram ociosas além do limite"""
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception:
+            # O pool descarta a conexão e tenta novamente com uma nova
+            raise exc.DisconnectionError()
+        finally:
+            cursor.close()
+
+
+def _register_timeouts(engine: Engine):
+    """Aplica statement_timeout e lock_timeout em cada nova conexão"""
+    timeouts = {
+        "statement_timeout": settings.db_statement_timeout_ms,
+        "lock_timeout": settings.db_lock_timeout_ms
+    }
+    timeouts = {name: int(value) for name, value in timeouts.items() if value}
+    if not timeouts:
+        return
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in timeouts.items():
+            cursor.execute(f"SET {name} = {value}")
+        cursor.close()
+        # Evita que os SETs fiquem presos em uma transação implícita
+        dbapi_connection.commit()
+
+
+def build_engine(url: str, metrics_label: str = "primary") -> Engine:
+    """Cria um engine com as configurações de pool e timeouts do Settings"""
+    url = make_url(url)
+    pre_ping = settings.db_pool_pre_ping.lower()
+    options = {
+        "echo": settings.debug,
+        "pool_pre_ping": pre_ping == "always",
+        "pool_recycle": settings.db_pool_recycle
+    }
+
+    # SQLite em memória usa um pool próprio, sem fila de conexões
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout
+        )
+
+    new_engine = create_engine(url, **options)
+    if isinstance(new_engine.pool, InstrumentedQueuePool):
+        new_engine.pool.metrics_label = metrics_label
+
+    if pre_ping == "idle":
+        _register_idle_pre_ping(new_engine, settings.db_pool_pre_ping_idle_seconds)
+
+    if new_engine.dialect.name == "postgresql":
+        _register_timeouts(new_engine)
+
+    if settings.tracing_enabled:
+        from app.tracing import instrument_engine
+
+        instrument_engine(new_engine)
+
+    return new_engine
+
 
 # Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
-    pool_recycle=300
-)
+engine = build_engine(settings.database_url)
+
+# Engines das réplicas de leitura (opcionais)
+replica_engines: List[Engine] = [
+    build_engine(url, metrics_label=f"replica:{make_url(url).host}")
+    for url in settings.replica_urls
+]
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessões de leitura recebem o engine escolhido pelo roteador
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
 # Create Base class for models
 Base = declarative_base()
 
+# Header que força leituras no primário (read-your-writes)
+CONSISTENCY_HEADER = "X-Consistency"
+
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class ReplicaRouter:
+    """
+    Distribui leituras entre réplicas, com fallback para o primário quando há lag.
+
+    O lag é medido por uma thread em background a cada `check_interval`; as
+    requisições só leem o último valor. Sem medição recente (thread parada ou
+    presa em uma réplica travada) a réplica é tratada como indisponível.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: List[Engine],
+        max_lag_seconds: float,
+        check_interval: float
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(replicas) if replicas else None
+        self._lag = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Inicia a thread de atualização; até a primeira medição, lê do primário"""
+        if not self.replicas or self._thread is not None:
+            return
+        # Evento novo a cada início: uma thread antiga ainda presa em uma
+        # medição não volta a rodar após um stop/start
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._stopped,), name="replica-lag-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Encerra a thread de atualização (sem esperar uma medição em andamento)"""
+        self._stopped.set()
+        self._thread = None
+
+    def _run(self, stopped: threading.Event):
+        while not stopped.is_set():
+            self.refresh()
+            stopped.wait(self.check_interval)
+
+    def refresh(self):
+        """Mede o lag de todas as réplicas e atualiza o cache"""
+        for replica in self.replicas:
+            lag = self._measure_lag(replica)
+            with self._lock:
+                self._lag[replica] = lag
+                self._checked_at[replica] = time.monotonic()
+
+    def get_read_engine(self) -> Engine:
+        """Retorna a próxima réplica saudável ou o primário"""
+        if not self._cycle:
+            return self.primary
+
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if self.get_lag(replica) <= self.max_lag_seconds:
+                return replica
+
+        logger.warning("Nenhuma réplica dentro do lag máximo, lendo do primário")
+        return self.primary
+
+    def get_lag(self, replica: Engine) -> float:
+        """Último lag medido da réplica em segundos; infinito se não há medição recente"""
+        with self._lock:
+            checked_at = self._checked_at.get(replica)
+            lag = self._lag.get(replica, float("inf"))
+        # Tolera alguns ciclos de atraso antes de descartar a medição
+        if checked_at is None or time.monotonic() - checked_at > 3 * self.check_interval:
+            return float("inf")
+        return lag
+
+    def _measure_lag(self, replica: Engine) -> float:
+        """Consulta o lag de replicação; réplicas inacessíveis são descartadas"""
+        if replica.dialect.name != "postgresql":
+            return 0.0
+
+        try:
+            with replica.connect() as conn:
+                return float(conn.execute(REPLICA_LAG_QUERY).scalar() or 0)
+        except Exception as e:
+            logger.error(f"Erro ao medir lag da réplica {replica.url.host}: {str(e)}")
+            return float("inf")
+
+
+replica_router = ReplicaRouter(
+    engine,
+    replica_engines,
+    max_lag_seconds=settings.replica_max_lag_seconds,
+    check_interval=settings.replica_lag_check_interval
+)
+
 
 def get_db():
     """Dependency to get database session"""
@@ -27,6 +288,88 @@ def get_db():
         db.close()
 
 
+def create_read_session(request: Optional[Request] = None) -> Session:
+    """Abre uma sessão de leitura no primário ou em uma réplica, conforme o header"""
+    if request is not None and request.headers.get(CONSISTENCY_HEADER, "").lower() == "primary":
+        bind = engine
+    else:
+        bind = replica_router.get_read_engine()
+
+    return ReadSessionLocal(bind=bind)
+
+
+def get_read_db(request: Request):
+    """Dependency para sessões somente leitura, roteadas para as réplicas"""
+    db = create_read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def set_statement_timeout(db: Session, timeout_ms: Optional[int]):
+    """Define um statement_timeout mais restrito para a transação atual"""
+    if not timeout_ms or db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+
+
+def _engine_pool_stats(target: Engine) -> dict:
+    """Estatísticas do pool de um engine"""
+    pool = target.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.get_stats()
+    return {"status": pool.status()}
+
+
+def get_pool_stats() -> dict:
+    """Retorna estatísticas dos pools do primário e das réplicas"""
+    return {
+        "primary": _engine_pool_stats(engine),
+        "replicas": [
+            {"host": replica.url.host, **_engine_pool_stats(replica)}
+            for replica in replica_engines
+        ]
+    }
+
+
+def prewarm_pool(target: Engine, connections: int) -> int:
+    """Abre conexões antecipadamente para as primeiras requisições não pagarem o connect"""
+    if isinstance(target.pool, InstrumentedQueuePool):
+        connections = min(connections, target.pool.size())
+
+    opened = []
+    try:
+        # Mantidas abertas ao mesmo tempo, senão o pool reaproveitaria a mesma
+        for _ in range(connections):
+            opened.append(target.connect())
+    except Exception as e:
+        logger.warning(f"Falha ao pré-aquecer o pool de {target.url.host or target.url.database}: {str(e)}")
+    finally:
+        for conn in opened:
+            conn.close()
+
+    return len(opened)
+
+
+def ensure_lead_partitions():
+    """Cria as partições futuras; acusa a flag ligada com a tabela ainda não convertida"""
+    if not settings.leads_partitioning_enabled:
+        return
+    
+    from app.services.partitioning import LeadPartitionManager
+    
+    manager = LeadPartitionManager(engine)
+    if manager.is_partitioned():
+        manager.ensure_partitions(settings.leads_partitions_ahead_months)
+    elif manager.is_supported():
+        logger.error(
+            "LEADS_PARTITIONING_ENABLED=true, mas a tabela leads NÃO é particionada. "
+            "Execute `streamleads partitions convert` para convertê-la."
+        )
+
+
 def create_tables():
     """Create all tables in the database"""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    ensure_lead_partitions()
@@ -0,0 +1,150 @@
+"""
+Verificação de saúde em background para os probes de liveness/readiness.
+
+Um laço no event loop executa periodicamente o teste do banco (em thread),
+lê o estado do pool e da fila de tarefas em background e guarda o resultado.
+Os endpoints `/readyz` e `/health` apenas leem esse cache: os probes do
+orquestrador nunca disputam conexões do pool com o tráfego real.
+"""
+
+from datetime import datetime
+from typing import Optional
+import asyncio
+import time
+
+from sqlalchemy import text
+from loguru import logger
+
+from app.config import settings
+
+
+def _pending_background_tasks() -> int:
+    """Tarefas em background enfileiradas neste worker (gauge do Prometheus)"""
+    from app.metrics import BACKGROUND_TASKS_PENDING
+
+    samples = BACKGROUND_TASKS_PENDING.collect()[0].samples
+    return int(samples[0].value) if samples else 0
+
+
+def _check_database():
+    from app.database import engine
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+class HealthMonitor:
+    """Executa a verificação periodicamente e mantém o último resultado"""
+
+    def __init__(self, interval_seconds: float, timeout_seconds: float, max_pending_tasks: int):
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_pending_tasks = max_pending_tasks
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._db_check: Optional[asyncio.Future] = None
+        self._shutting_down = False
+
+    async def start(self):
+        """Executa a primeira verificação e inicia o laço em background"""
+        self._shutting_down = False
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Marca o worker como não pronto e encerra o laço"""
+        self._shutting_down = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Erro na verificação de saúde: {str(e)}")
+
+    async def check(self) -> dict:
+        """Verifica banco, pool e fila e atualiza o resultado em cache"""
+        from app.database import get_pool_stats
+
+        checks = {"database": await self._probe_database()}
+
+        pool = get_pool_stats()["primary"]
+        if "checked_out" in pool:
+            capacity = pool["size"] + max(pool["max_overflow"], 0)
+            saturated = capacity > 0 and pool["checked_out"] >= capacity
+            checks["pool"] = {
+                "status": "saturated" if saturated else "ok",
+                "checked_out": pool["checked_out"],
+                "capacidade": capacity,
+                "timeouts": pool["timeouts"]
+            }
+
+        if settings.metrics_enabled:
+            from app.metrics import update_pool_metrics
+
+            # Com vários workers, só quem atende o scrape atualiza os gauges
+            # em render_metrics; os demais ficam em dia a cada verificação
+            update_pool_metrics()
+
+        pending = _pending_background_tasks()
+        checks["background_tasks"] = {
+            "status": "ok" if pending <= self.max_pending_tasks else "overloaded",
+            "pendentes": pending,
+            "limite": self.max_pending_tasks
+        }
+
+        # Pool saturado é informativo; banco fora ou fila acima do limite tiram o worker do balanceamento
+        ready = checks["database"]["status"] == "ok" and checks["background_tasks"]["status"] == "ok"
+        if not ready and (self._result is None or self._result["ready"]):
+            logger.warning(f"Worker não está pronto: {checks}")
+
+        self._result = {
+            "ready": ready,
+            "checks": checks,
+            "checked_at": datetime.now().isoformat(timespec="seconds")
+        }
+        self._checked_at = time.monotonic()
+        return self._result
+
+    async def _probe_database(self) -> dict:
+        """SELECT 1 em thread, limitado por timeout; não sobrepõe verificações"""
+        if self._db_check is None or self._db_check.done():
+            self._db_check = asyncio.ensure_future(asyncio.to_thread(_check_database))
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._db_check), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            return {"status": "timeout", "timeout_s": self.timeout_seconds}
+        except Exception as e:
+            return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+
+        return {"status": "ok", "latencia_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    def readiness(self) -> dict:
+        """Último resultado; vencido (laço travado) ou em desligamento conta como não pronto"""
+        if self._result is None:
+            return {"ready": False, "reason": "verificação inicial pendente"}
+        if self._shutting_down:
+            return {**self._result, "ready": False, "reason": "encerrando"}
+
+        age = time.monotonic() - self._checked_at
+        if age > self.interval_seconds * 3 + self.timeout_seconds:
+            return {**self._result, "ready": False, "reason": f"verificação desatualizada ({age:.0f}s)"}
+        return self._result
+
+
+health_monitor = HealthMonitor(
+    interval_seconds=settings.health_check_interval_seconds,
+    timeout_seconds=settings.health_check_timeout_seconds,
+    max_pending_tasks=settings.health_max_pending_tasks
+)
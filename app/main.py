@@ -1,12 +1,23 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional
 import uvicorn
 
 from app.config import settings
-from app.database import create_tables
+from app.database import (
+    create_tables, engine, ensure_lead_partitions, prewarm_pool, replica_engines, replica_router
+)
 from app.api.leads import router as leads_router
+from app.models.lead import LeadOrigin, LeadStatus
+from app.schemas.lead import LeadCreate, LeadResponse
+from app.api.admin import require_admin, router as admin_router
+from app.profiling import ProfilingMiddleware
+from app.api.serialization import default_response_class
+from app.services.events import event_broker
+from app.health import health_monitor
 from loguru import logger
 import sys
 
@@ -26,23 +37,56 @@ logger.add(
 )
 
 
+def warm_up():
+    """Pré-aquece o pool de conexões e a validação/serialização dos schemas"""
+    if settings.db_pool_prewarm > 0:
+        opened = sum(
+            prewarm_pool(target, settings.db_pool_prewarm)
+            for target in [engine, *replica_engines]
+        )
+        logger.info(f"Pool de conexões pré-aquecido ({opened} conexões)")
+    
+    # A primeira validação de email e serialização carregam módulos e caches
+    sample = LeadCreate(
+        nome="Aquecimento", email="aquecimento@example.com",
+        telefone="11999999999", origem=LeadOrigin.SITE
+    )
+    LeadResponse(
+        **sample.model_dump(), id=0, score=0, status=LeadStatus.FRIO,
+        processado="N", created_at=datetime.now()
+    ).model_dump_json()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação"""
     # Startup
     logger.info("Iniciando StreamLeads API...")
-    try:
-        create_tables()
-        logger.info("Tabelas do banco de dados criadas/verificadas")
-    except Exception as e:
-        logger.error(f"Erro ao criar tabelas: {str(e)}")
-        raise
+    if settings.db_create_tables_on_startup:
+        try:
+            create_tables()
+            logger.info("Tabelas do banco de dados criadas/verificadas")
+        except Exception as e:
+            logger.error(f"Erro ao criar tabelas: {str(e)}")
+            raise
+    else:
+        logger.info("Schema gerenciado pelas migrações do Alembic (create_all ignorado)")
+        ensure_lead_partitions()
+    
+    warm_up()
+    
+    replica_router.start()
+    await event_broker.start()
+    await health_monitor.start()
     
     logger.info("StreamLeads API iniciada com sucesso!")
     yield
     
     # Shutdown
     logger.info("Encerrando StreamLeads API...")
+    await health_monitor.stop()
+    await event_broker.stop()
+    replica_router.stop()
 
 
 # Criar aplicação FastAPI
@@ -88,7 +132,8 @@ app = FastAPI(
     license_info={
         "name": "MIT",
     },
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=default_response_class
 )
 
 # Configurar CORS
@@ -98,10 +143,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Latência por rota para o Prometheus
+if settings.metrics_enabled:
+    from app.metrics import PrometheusMiddleware
+    
+    app.add_middleware(PrometheusMiddleware)
+
+# Span raiz de cada requisição (tracing)
+if settings.tracing_enabled:
+    from app.tracing import TracingMiddleware
+    
+    app.add_middleware(TracingMiddleware)
+
+# Profiling de CPU sob demanda ou por amostragem
+app.add_middleware(ProfilingMiddleware)
+
 # Incluir routers
 app.include_router(leads_router, prefix="/api/v1")
+app.include_router(admin_router)
 
 
 @app.get("/", tags=["root"])
@@ -116,24 +178,81 @@ async def root():
     }
 
 
+@app.get("/livez", tags=["health"])
+async def liveness():
+    """Liveness: o processo e o event loop respondem (não consulta o banco)"""
+    return {"status": "alive"}
+
+
+@app.get("/readyz", tags=["health"])
+async def readiness():
+    """
+    Readiness a partir da última verificação em background (banco, pool e fila).
+    
+    Responde 503 quando o worker não deve receber tráfego.
+    """
+    result = health_monitor.readiness()
+    return JSONResponse(status_code=200 if result["ready"] else 503, content=result)
+
+
 @app.get("/health", tags=["health"])
 async def health_check():
-    """Endpoint para verificação de saúde da API"""
-    try:
-        from app.database import engine
-        
-        # Testar conexão com banco
-        with engine.connect() as conn:
-            conn.execute("SELECT 1")
-        
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "environment": settings.environment
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+    """Endpoint para verificação de saúde da API (usa o resultado em cache do /readyz)"""
+    result = health_monitor.readiness()
+    if not result["ready"]:
         raise HTTPException(status_code=503, detail="Service unavailable")
+    
+    return {
+        "status": "healthy",
+        "database": "connected",
+        "environment": settings.environment
+    }
+
+
+@app.get("/health/pool", tags=["health"], dependencies=[Depends(require_admin)])
+async def pool_stats():
+    """Estatísticas dos pools de conexão (checked out, overflow, tempo de espera); exige X-Admin-Token"""
+    from app.database import get_pool_stats
+    
+    return get_pool_stats()
+
+
+@app.get("/traces", tags=["tracing"], dependencies=[Depends(require_admin)])
+async def list_traces(lead_id: Optional[int] = None, limit: int = Query(20, ge=1, le=200)):
+    """Traces mais recentes guardados em memória (opcionalmente de um lead); exige X-Admin-Token"""
+    from app import tracing
+    
+    if not tracing.memory_exporter:
+        raise HTTPException(status_code=404, detail="Exportador de traces em memória desabilitado")
+    
+    return {"traces": tracing.memory_exporter.find_traces(lead_id=lead_id, limit=limit)}
+
+
+@app.get("/traces/{trace_id}", tags=["tracing"], dependencies=[Depends(require_admin)])
+async def get_trace(trace_id: str):
+    """Spans de um trace e o tempo total por etapa; exige X-Admin-Token"""
+    from app import tracing
+    
+    if not tracing.memory_exporter:
+        raise HTTPException(status_code=404, detail="Exportador de traces em memória desabilitado")
+    
+    spans, stages = tracing.trace_summary(trace_id)
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace não encontrado")
+    
+    return {"trace_id": trace_id, "etapas_ms": stages, "spans": spans}
+
+
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+async def metrics():
+    """Métricas no formato de exposição do Prometheus"""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Métricas desabilitadas")
+    
+    from app.metrics import render_metrics
+    
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
 
 
 @app.exception_handler(Exception)
@@ -0,0 +1,215 @@
+"""
+Métricas Prometheus da aplicação (`GET /metrics`).
+
+Com a variável PROMETHEUS_MULTIPROC_DIR definida (gunicorn com vários
+workers), cada processo grava suas métricas em arquivos nesse diretório e o
+endpoint agrega todos eles.
+"""
+
+from contextlib import contextmanager
+from typing import Tuple
+import os
+import threading
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import func, select
+from loguru import logger
+
+from app.config import settings
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+HTTP_REQUEST_DURATION = Histogram(
+    "streamleads_http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route", "status"]
+)
+
+LEAD_SCORING_DURATION = Histogram(
+    "streamleads_lead_scoring_duration_seconds",
+    "Tempo de cálculo do score de um lead",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+INTEGRATION_DURATION = Histogram(
+    "streamleads_integration_duration_seconds",
+    "Latência das chamadas a integrações externas",
+    ["integration"]
+)
+
+INTEGRATION_ERRORS = Counter(
+    "streamleads_integration_errors_total",
+    "Falhas nas chamadas a integrações externas",
+    ["integration"]
+)
+
+BACKGROUND_TASKS_PENDING = Gauge(
+    "streamleads_background_tasks_pending",
+    "Tarefas em background enfileiradas e ainda não concluídas",
+    multiprocess_mode="livesum"
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "streamleads_db_pool_checked_out",
+    "Conexões do pool em uso",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+
+DB_POOL_CHECKED_IN = Gauge(
+    "streamleads_db_pool_checked_in",
+    "Conexões ociosas no pool",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    "streamleads_db_pool_overflow",
+    "Conexões abertas além do pool_size",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+
+DB_POOL_TIMEOUTS = Counter(
+    "streamleads_db_pool_timeouts_total",
+    "Timeouts aguardando conexão do pool",
+    ["engine"]
+)
+
+
+@contextmanager
+def track_integration(integration: str):
+    """Mede a latência de uma chamada externa e conta exceções como erro"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        INTEGRATION_ERRORS.labels(integration).inc()
+        raise
+    finally:
+        INTEGRATION_DURATION.labels(integration).observe(time.perf_counter() - start)
+
+
+def update_pool_metrics():
+    """Atualiza os gauges do pool com o estado atual deste processo"""
+    from app.database import get_pool_stats
+
+    stats = get_pool_stats()
+    engines = [("primary", stats["primary"])]
+    engines += [(f"replica:{replica['host']}", replica) for replica in stats["replicas"]]
+
+    for name, pool in engines:
+        if "checked_out" not in pool:
+            continue
+        DB_POOL_CHECKED_OUT.labels(name).set(pool["checked_out"])
+        DB_POOL_CHECKED_IN.labels(name).set(pool["checked_in"])
+        DB_POOL_OVERFLOW.labels(name).set(pool["overflow"])
+
+
+class LeadCountCollector:
+    """Contagem de leads por status e origem, consultada no scrape com cache"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._rows = []
+        self._fetched_at = 0.0
+
+    def describe(self):
+        # Evita consultar o banco ao registrar o coletor
+        return [GaugeMetricFamily("streamleads_leads", "", labels=["status", "origem"])]
+
+    def collect(self):
+        metric = GaugeMetricFamily(
+            "streamleads_leads",
+            "Leads por status e origem",
+            labels=["status", "origem"]
+        )
+        for status, origem, total in self._get_rows():
+            metric.add_metric(
+                [status.value if status else "", origem.value if origem else ""], total
+            )
+        yield metric
+
+    def _get_rows(self) -> list:
+        with self._lock:
+            if time.monotonic() - self._fetched_at < self.ttl_seconds:
+                return self._rows
+
+            from app.database import create_read_session
+            from app.models.lead import Lead
+
+            db = create_read_session()
+            try:
+                self._rows = db.execute(
+                    select(Lead.status, Lead.origem, func.count())
+                    .group_by(Lead.status, Lead.origem)
+                ).all()
+            except Exception as e:
+                logger.error(f"Erro ao contar leads para métricas: {str(e)}")
+            finally:
+                db.close()
+
+            self._fetched_at = time.monotonic()
+            return self._rows
+
+
+lead_count_collector = LeadCountCollector(settings.metrics_lead_counts_ttl_seconds)
+
+if not MULTIPROCESS:
+    REGISTRY.register(lead_count_collector)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Gera o texto de exposição de todas as métricas"""
+    update_pool_metrics()
+
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(lead_count_collector)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class PrometheusMiddleware:
+    """Middleware ASGI que mede a latência por rota (template, não o path cru)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        response = {"status": 500, "streaming": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                headers = dict(message.get("headers") or [])
+                response["streaming"] = headers.get(b"content-type", b"").startswith(
+                    b"text/event-stream"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Conexões SSE duram o tempo da sessão e distorceriam o histograma
+            if not response["streaming"]:
+                route = scope.get("route")
+                HTTP_REQUEST_DURATION.labels(
+                    scope["method"],
+                    route.path if route else "unmatched",
+                    str(response["status"])
+                ).observe(time.perf_counter() - start)
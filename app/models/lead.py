@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Enum, Index, event
 from sqlalchemy.sql import func
+from app.config import settings
 from app.database import Base
+from app.utils.normalization import normalize_email, normalize_phone, name_key, normalize_city
 import enum
 
 
@@ -25,8 +27,14 @@ class LeadOrigin(str, enum.Enum):
 class Lead(Base):
     """Modelo de dados para leads"""
     __tablename__ = "leads"
+    
+    # Com particionamento por mês de created_at, o PostgreSQL exige que a
+    # chave de partição faça parte da PK; o ORM continua identificando por id
+    if settings.leads_partitioning_enabled:
+        __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+        __mapper_args__ = {"primary_key": ["id"]}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     nome = Column(String(255), nullable=False, index=True)
     email = Column(String(255), nullable=False, index=True)
     telefone = Column(String(20), nullable=False)
@@ -43,11 +51,30 @@ class Lead(Base):
     processado = Column(String(1), default="N")  # Y/N
     observacoes = Column(Text, nullable=True)
     
+    # Chaves de deduplicação (preenchidas automaticamente)
+    email_normalizado = Column(String(255), nullable=True, index=True)
+    telefone_normalizado = Column(String(20), nullable=True, index=True)
+    nome_chave = Column(String(100), nullable=True)
+    cidade_normalizada = Column(String(100), nullable=True)
+    
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        index=True,
+        primary_key=settings.leads_partitioning_enabled,
+        nullable=not settings.leads_partitioning_enabled
+    )
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     follow_up_date = Column(DateTime(timezone=True), nullable=True)
     
+    def update_dedup_keys(self):
+        """Recalcula as chaves de deduplicação a partir dos dados do lead"""
+        self.email_normalizado = normalize_email(self.email)
+        self.telefone_normalizado = normalize_phone(self.telefone)
+        self.nome_chave = name_key(self.nome)
+        self.cidade_normalizada = normalize_city(self.cidade)
+    
     def __repr__(self):
         return f"<Lead(id={self.id}, nome='{self.nome}', status='{self.status}')>"
     
@@ -69,4 +96,14 @@ class Lead(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "follow_up_date": self.follow_up_date.isoformat() if self.follow_up_date else None
-        }
\ No newline at end of file
+        }
+
+
+# Índice de bloqueio para busca de duplicados por nome + cidade
+Index("ix_leads_bloqueio", Lead.nome_chave, Lead.cidade_normalizada)
+
+
+@event.listens_for(Lead, "before_insert")
+@event.listens_for(Lead, "before_update")
+def _update_dedup_keys(mapper, connection, target):
+    target.update_dedup_keys()
@@ -0,0 +1,245 @@
+"""
+Profiling sob demanda (cProfile) de requisições e tarefas em background.
+
+Uma requisição é perfilada quando traz `X-Profile: 1` (ou `?_profile=1`)
+junto com um `X-Admin-Token` válido, ou quando é sorteada pela taxa de
+amostragem PROFILING_SAMPLE_RATE. Os perfis são gravados como arquivos
+.pstats em PROFILING_DIR e listados em /admin/profiles.
+
+O profiler de uma requisição só fica ativo enquanto a corrotina dela está
+executando: nos `await` o event loop atende outras requisições, que não
+entram no perfil. Trabalho enviado ao threadpool roda em outra thread e
+também fica de fora (as background tasks têm perfil próprio).
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import parse_qs
+import cProfile
+import io
+import pstats
+import random
+import re
+import secrets
+import threading
+
+from loguru import logger
+
+from app.config import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_FLAG = "_profile"
+PROFILE_FILE_HEADER = "X-Profile-File"
+
+# O cProfile perfila apenas a thread que o ativou e aceita um profiler por
+# thread (um por processo a partir do Python 3.12): blocos sorteados enquanto
+# outro perfil está ativo simplesmente não são perfilados
+_active = threading.local()
+
+# Indica que a requisição atual foi perfilada a pedido (propagado ao background)
+profile_requested: ContextVar[bool] = ContextVar("profile_requested", default=False)
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Compara o token recebido com ADMIN_TOKEN em tempo constante"""
+    if not settings.admin_token or not token:
+        return False
+    return secrets.compare_digest(token, settings.admin_token)
+
+
+def should_sample() -> bool:
+    return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
+
+
+def _safe_label(label: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_")[:80] or "perfil"
+
+
+def _rotate(directory: Path):
+    """Mantém apenas os PROFILING_MAX_FILES perfis mais recentes"""
+    files = sorted(directory.glob("*.pstats"), key=lambda path: path.stat().st_mtime)
+    for path in files[:-settings.profiling_max_files]:
+        path.unlink(missing_ok=True)
+
+
+class ProfileResult:
+    """Perfil em andamento: `name` é definido ao iniciar, `path` ao gravar"""
+
+    def __init__(self):
+        self.name: Optional[str] = None
+        self.path: Optional[Path] = None
+
+
+def _profile_name(label: str) -> str:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return f"{timestamp}_{_safe_label(label)}.pstats"
+
+
+def _save_profile(profiler: cProfile.Profile, result: ProfileResult):
+    """Grava o perfil em PROFILING_DIR e descarta os mais antigos"""
+    directory = Path(settings.profiling_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    result.path = directory / result.name
+    profiler.dump_stats(result.path)
+    _rotate(directory)
+    logger.info(f"Perfil gravado: {result.name}")
+
+
+@contextmanager
+def profile_block(label: str, force: bool = False):
+    """
+    Perfila o bloco com cProfile se forçado ou sorteado pela taxa de amostragem.
+
+    Retorna um ProfileResult; `name` fica vazio quando o bloco não é perfilado.
+    """
+    result = ProfileResult()
+    profiler = None
+    if (force or should_sample()) and not getattr(_active, "profiling", False):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Outro profiler já ativo no processo
+            profiler = None
+
+    if profiler is None:
+        yield result
+        return
+
+    _active.profiling = True
+    result.name = _profile_name(label)
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        _active.profiling = False
+
+    _save_profile(profiler, result)
+
+
+class _SteppedProfile:
+    """
+    Aguarda uma corrotina ativando o profiler apenas durante cada passo dela.
+
+    Entre um passo e outro (nos `await`) o profiler fica desligado, então o
+    que o event loop executa para outras requisições não entra no perfil.
+    """
+
+    def __init__(self, coroutine, profiler: cProfile.Profile):
+        self.coroutine = coroutine
+        self.profiler = profiler
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            enabled = self._enable()
+            try:
+                if error is None:
+                    future = self.coroutine.send(value)
+                else:
+                    future = self.coroutine.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                if enabled:
+                    self.profiler.disable()
+                    _active.profiling = False
+
+            try:
+                value, error = (yield future), None
+            except BaseException as e:
+                # Cancelamento e afins seguem para a corrotina da requisição
+                value, error = None, e
+
+    def _enable(self) -> bool:
+        if getattr(_active, "profiling", False):
+            return False
+        try:
+            self.profiler.enable()
+        except ValueError:
+            # Outro profiler já ativo no processo: o passo segue sem perfil
+            return False
+        _active.profiling = True
+        return True
+
+
+def list_profiles() -> List[dict]:
+    """Perfis gravados, do mais recente para o mais antigo"""
+    directory = Path(settings.profiling_dir)
+    if not directory.exists():
+        return []
+
+    files = sorted(directory.glob("*.pstats"), key=lambda path: path.stat().st_mtime, reverse=True)
+    return [
+        {
+            "nome": path.name,
+            "tamanho_bytes": path.stat().st_size,
+            "criado_em": datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+        }
+        for path in files
+    ]
+
+
+def get_profile_path(name: str) -> Optional[Path]:
+    """Caminho de um perfil pelo nome, sem permitir sair do diretório"""
+    path = Path(settings.profiling_dir) / Path(name).name
+    return path if path.suffix == ".pstats" and path.exists() else None
+
+
+def summarize_profile(path: Path, sort: str = "cumulative", limit: int = 30) -> str:
+    """Tabela de funções mais custosas no formato do pstats"""
+    output = io.StringIO()
+    stats = pstats.Stats(str(path), stream=output)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI que perfila requisições marcadas ou sorteadas"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        flagged = (
+            headers.get(PROFILE_HEADER.lower().encode(), b"") == b"1"
+            or query.get(PROFILE_QUERY_FLAG, [""])[-1] == "1"
+        )
+        forced = flagged and is_admin_token(
+            headers.get(b"x-admin-token", b"").decode("latin-1")
+        )
+        if not forced and not should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        token = profile_requested.set(forced)
+        profiler = cProfile.Profile()
+        result = ProfileResult()
+        result.name = _profile_name(f"{scope['method']}_{scope['path']}")
+        try:
+            await _SteppedProfile(
+                self.app(scope, receive, self._send_with_profile_name(send, result)),
+                profiler
+            )
+        finally:
+            profile_requested.reset(token)
+        _save_profile(profiler, result)
+
+    @staticmethod
+    def _send_with_profile_name(send, result: ProfileResult):
+        async def send_wrapper(message):
+            if result.name and message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or []) + [
+                    (PROFILE_FILE_HEADER.lower().encode(), result.name.encode())
+                ]
+            await send(message)
+        return send_wrapper
@@ -0,0 +1,233 @@
+from datetime import date, datetime, timezone
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+import enum
+import os
+import re
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import DateTime, Enum, Float, Integer
+
+from app.config import settings
+from app.models.lead import Lead, LeadStatus, LeadOrigin
+
+# Arquivos seguem o layout <dir>/mes=AAAA-MM/origem=<ORIGEM>/leads_<min_id>_<max_id>.parquet
+FILE_PATTERN = re.compile(r"^leads_(\d+)_(\d+)\.parquet$")
+
+
+def _arrow_type(column) -> pa.DataType:
+    """Tipo Arrow equivalente a uma coluna da tabela leads"""
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+ARCHIVE_SCHEMA = pa.schema(
+    [pa.field(column.name, _arrow_type(column)) for column in Lead.__table__.columns]
+)
+
+ENUM_COLUMNS = {
+    column.name: column.type.enum_class
+    for column in Lead.__table__.columns
+    if isinstance(column.type, Enum)
+}
+
+
+class LeadArchiveRepository:
+    """Armazenamento frio de leads em arquivos Parquet particionados por mês e origem"""
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = Path(base_dir or settings.archive_dir)
+
+    def write(self, rows: List[dict]) -> List[Path]:
+        """Grava linhas da tabela leads, um arquivo por (mês, origem)"""
+        groups = {}
+        for row in rows:
+            created_at = row["created_at"] or datetime.now(timezone.utc)
+            key = (created_at.strftime("%Y-%m"), row["origem"].name)
+            groups.setdefault(key, []).append(row)
+
+        paths = []
+        for (month, origem), group in groups.items():
+            ids = [row["id"] for row in group]
+            directory = self.base_dir / f"mes={month}" / f"origem={origem}"
+            directory.mkdir(parents=True, exist_ok=True)
+
+            # Nome determinístico: reprocessar o mesmo lote sobrescreve o arquivo
+            path = directory / f"leads_{min(ids)}_{max(ids)}.parquet"
+            tmp_path = path.with_suffix(".parquet.tmp")
+
+            table = pa.Table.from_pylist(
+                [self._serialize(row) for row in group], schema=ARCHIVE_SCHEMA
+            )
+            pq.write_table(table, tmp_path, compression=settings.archive_compression)
+            os.replace(tmp_path, path)
+            paths.append(path)
+
+        return paths
+
+    def get_by_id(self, lead_id: int) -> Optional[Lead]:
+        """Busca um lead arquivado, lendo apenas arquivos cujo intervalo de ids o contém"""
+        for path in self._files():
+            min_id, max_id = self._id_range(path)
+            if not min_id <= lead_id <= max_id:
+                continue
+
+            table = pq.read_table(path, filters=[("id", "=", lead_id)])
+            if table.num_rows:
+                return self._to_lead(table.to_pylist()[-1])
+
+        return None
+
+    def search(
+        self,
+        status: Optional[LeadStatus] = None,
+        origem: Optional[LeadOrigin] = None,
+        cidade: Optional[str] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None,
+        search: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Lead], int]:
+        """
+        Busca leads arquivados com os mesmos filtros de LeadRepository.get_all.
+
+        Os meses são lidos do mais recente para o mais antigo e a leitura para
+        assim que `limit` leads foram reunidos; de cada arquivo ficam só os
+        `limit` mais recentes. O total vem de count_rows com o filtro, sem
+        materializar as linhas (um lote arquivado duas vezes conta em dobro).
+        """
+        files = self._files(origem=origem, data_inicio=data_inicio, data_fim=data_fim)
+        if not files:
+            return [], 0
+
+        expression = self._filter_expression(status, cidade, data_inicio, data_fim, search)
+        total = ds.dataset(files, schema=ARCHIVE_SCHEMA, format="parquet").count_rows(filter=expression)
+        if not total or limit == 0:
+            return [], total
+
+        # Um lote reprocessado após falha pode repetir ids em arquivos distintos
+        rows = {}
+        for _, month_files in groupby(reversed(files), key=lambda path: path.parent.parent.name):
+            tables = []
+            for path in month_files:
+                table = pq.read_table(path, schema=ARCHIVE_SCHEMA, filters=expression)
+                if table.num_rows:
+                    tables.append(self._newest(table, limit))
+
+            if tables:
+                for row in self._newest(pa.concat_tables(tables), limit).to_pylist():
+                    rows.setdefault(row["id"], row)
+            if limit is not None and len(rows) >= limit:
+                break
+
+        ordered = sorted(
+            rows.values(),
+            key=lambda row: row["created_at"] or datetime.min.replace(tzinfo=timezone.utc),
+            reverse=True
+        )[:limit]
+
+        return [self._to_lead(row) for row in ordered], total
+
+    @staticmethod
+    def _newest(table: pa.Table, limit: Optional[int]) -> pa.Table:
+        """As `limit` linhas mais recentes por created_at"""
+        table = table.sort_by([("created_at", "descending")])
+        return table.slice(0, limit) if limit is not None else table
+
+    def _files(
+        self,
+        origem: Optional[LeadOrigin] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> Iterable[Path]:
+        """Arquivos do arquivo morto, podando diretórios fora do mês/origem pedidos"""
+        if not self.base_dir.exists():
+            return []
+
+        first_month = data_inicio.strftime("%Y-%m") if data_inicio else None
+        last_month = data_fim.strftime("%Y-%m") if data_fim else None
+
+        files = []
+        for month_dir in sorted(self.base_dir.glob("mes=*")):
+            month = month_dir.name.split("=", 1)[1]
+            if (first_month and month < first_month) or (last_month and month > last_month):
+                continue
+
+            pattern = f"origem={origem.name}" if origem else "origem=*"
+            for origem_dir in month_dir.glob(pattern):
+                files.extend(
+                    path for path in sorted(origem_dir.iterdir())
+                    if FILE_PATTERN.match(path.name)
+                )
+
+        return files
+
+    @staticmethod
+    def _id_range(path: Path) -> Tuple[int, int]:
+        match = FILE_PATTERN.match(path.name)
+        return int(match.group(1)), int(match.group(2))
+
+    @staticmethod
+    def _filter_expression(status, cidade, data_inicio, data_fim, search):
+        """Monta o filtro (expressão do dataset Arrow) equivalente à consulta SQL"""
+        conditions = []
+
+        if status:
+            conditions.append(pc.field("status") == status.value)
+
+        if cidade:
+            conditions.append(pc.match_substring(pc.field("cidade"), cidade, ignore_case=True))
+
+        timestamp_type = ARCHIVE_SCHEMA.field("created_at").type
+
+        if data_inicio:
+            start = datetime.combine(data_inicio, datetime.min.time(), timezone.utc)
+            conditions.append(pc.field("created_at") >= pa.scalar(start, timestamp_type))
+
+        if data_fim:
+            end = datetime.combine(data_fim, datetime.max.time(), timezone.utc)
+            conditions.append(pc.field("created_at") <= pa.scalar(end, timestamp_type))
+
+        if search:
+            any_match = None
+            for field in ["nome", "email", "telefone", "interesse"]:
+                match = pc.match_substring(pc.field(field), search, ignore_case=True)
+                any_match = match if any_match is None else any_match | match
+            conditions.append(any_match)
+
+        if not conditions:
+            return None
+
+        mask = conditions[0]
+        for condition in conditions[1:]:
+            mask = mask & condition
+        return pc.coalesce(mask, pa.scalar(False))
+
+    @staticmethod
+    def _serialize(row: dict) -> dict:
+        """Converte enums para seus valores antes da gravação"""
+        return {
+            key: value.value if isinstance(value, enum.Enum) else value
+            for key, value in row.items()
+        }
+
+    @staticmethod
+    def _to_lead(row: dict) -> Lead:
+        """Cria um Lead transitório (fora da sessão) a partir de uma linha arquivada"""
+        data = {}
+        for key, value in row.items():
+            if not hasattr(Lead, key):
+                continue
+            if key in ENUM_COLUMNS and value is not None:
+                value = ENUM_COLUMNS[key](value)
+            data[key] = value
+        return Lead(**data)
@@ -1,11 +1,41 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import String, and_, case, cast, false, func, literal, or_, select, union_all, update
 from app.models.lead import Lead, LeadStatus, LeadOrigin
 from app.schemas.lead import LeadCreate, LeadUpdate
-from datetime import datetime, date
-from typing import List, Optional, Tuple
+from app.utils.normalization import normalize_email, normalize_city
+from datetime import datetime, date, time, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
 from loguru import logger
 
+# Colunas expostas pela API (as mesmas de Lead.to_dict), por nome
+PUBLIC_COLUMNS = {
+    column.key: column
+    for column in [
+        Lead.id, Lead.nome, Lead.email, Lead.telefone, Lead.origem, Lead.interesse,
+        Lead.renda_aproximada, Lead.cidade, Lead.score, Lead.status, Lead.processado,
+        Lead.observacoes, Lead.created_at, Lead.updated_at, Lead.follow_up_date
+    ]
+}
+
+
+def _start_of_day(value: date) -> datetime:
+    """Converte uma data no início do dia, para filtros por intervalo"""
+    return datetime.combine(value, time.min)
+
+
+def _created_at_utc(lead: Lead) -> datetime:
+    """created_at comparável entre bancos (SQLite devolve datetimes sem timezone, em UTC)"""
+    created_at = lead.created_at or datetime.min
+    if created_at.tzinfo is None:
+        return created_at.replace(tzinfo=timezone.utc)
+    return created_at
+
+
+def _archive_repository():
+    """Repositório do arquivo morto (importado sob demanda por depender do pyarrow)"""
+    from app.repositories.lead_archive import LeadArchiveRepository
+    return LeadArchiveRepository()
+
 
 class LeadRepository:
     """Repositório para operações de banco de dados com leads"""
@@ -29,13 +59,20 @@ class LeadRepository:
             logger.error(f"Erro ao criar lead: {str(e)}")
             raise
     
-    def get_by_id(self, lead_id: int) -> Optional[Lead]:
-        """Busca lead por ID"""
-        return self.db.query(Lead).filter(Lead.id == lead_id).first()
+    def get_by_id(self, lead_id: int, include_archived: bool = False) -> Optional[Lead]:
+        """Busca lead por ID (opcionalmente também no arquivo morto)"""
+        lead = self.db.query(Lead).filter(Lead.id == lead_id).first()
+        
+        if lead is None and include_archived:
+            lead = _archive_repository().get_by_id(lead_id)
+        
+        return lead
     
     def get_by_email(self, email: str) -> Optional[Lead]:
-        """Busca lead por email"""
-        return self.db.query(Lead).filter(Lead.email == email).first()
+        """Busca lead por email (comparando a forma normalizada)"""
+        return self.db.query(Lead).filter(
+            Lead.email_normalizado == normalize_email(email)
+        ).first()
     
     def update(self, lead_id: int, lead_data: LeadUpdate) -> Optional[Lead]:
         """Atualiza um lead"""
@@ -88,43 +125,240 @@ class LeadRepository:
         cidade: Optional[str] = None,
         data_inicio: Optional[date] = None,
         data_fim: Optional[date] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        include_archived: bool = False
     ) -> Tuple[List[Lead], int]:
         """Lista leads com filtros e paginação"""
-        query = self.db.query(Lead)
+        query = self.db.query(Lead).filter(*self.build_filters(
+            status=status,
+            origem=origem,
+            cidade=cidade,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            search=search
+        ))
+        
+        # Contar total
+        total = query.count()
+        
+        if include_archived:
+            return self._merge_archived(
+                query, total, skip, limit,
+                status=status, origem=origem, cidade=cidade,
+                data_inicio=data_inicio, data_fim=data_fim, search=search
+            )
+        
+        # Aplicar paginação e ordenação
+        leads = query.order_by(Lead.created_at.desc()).offset(skip).limit(limit).all()
+        
+        return leads, total
+    
+    def get_projected(
+        self,
+        fields: List[str],
+        skip: int = 0,
+        limit: int = 100,
+        include_archived: bool = False,
+        **filters
+    ) -> Tuple[List[dict], int]:
+        """
+        Lista apenas as colunas pedidas (nomes de PUBLIC_COLUMNS) como dicionários.
+        
+        O SELECT traz só essas colunas, sem montar objetos do ORM; colunas de
+        texto longo (interesse, observacoes) só são lidas quando solicitadas.
+        """
+        if include_archived:
+            leads, total = self.get_all(
+                skip=skip, limit=limit, include_archived=True, **filters
+            )
+            return [{field: getattr(lead, field) for field in fields} for lead in leads], total
+        
+        conditions = self.build_filters(**filters)
+        total = self.db.execute(
+            select(func.count()).select_from(Lead).where(*conditions)
+        ).scalar()
+        
+        statement = (
+            select(*[PUBLIC_COLUMNS[field] for field in fields])
+            .where(*conditions)
+            .order_by(Lead.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        rows = [dict(row) for row in self.db.execute(statement).mappings()]
+        
+        return rows, total
+    
+    def get_fingerprint(self, **filters) -> tuple:
+        """
+        Retorna (total, maior updated_at, maior created_at) dos leads filtrados.
+        
+        Uma única agregação barata que muda sempre que um lead do conjunto é
+        criado, alterado ou removido; usada para gerar ETags.
+        """
+        return tuple(self.db.execute(
+            select(func.count(), func.max(Lead.updated_at), func.max(Lead.created_at))
+            .select_from(Lead)
+            .where(*self.build_filters(**filters))
+        ).one())
+    
+    def _merge_archived(
+        self,
+        query,
+        total: int,
+        skip: int,
+        limit: int,
+        **filters
+    ) -> Tuple[List[Lead], int]:
+        """Combina leads do banco e do arquivo morto, ordenados por created_at"""
+        window = skip + limit
+        leads = query.order_by(Lead.created_at.desc()).limit(window).all()
+        archived, archived_total = _archive_repository().search(limit=window, **filters)
+        
+        merged = sorted(leads + archived, key=_created_at_utc, reverse=True)
+        return merged[skip:window], total + archived_total
+    
+    @staticmethod
+    def build_filters(
+        status: Optional[LeadStatus] = None,
+        origem: Optional[LeadOrigin] = None,
+        cidade: Optional[str] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None,
+        search: Optional[str] = None
+    ) -> list:
+        """Monta as condições de filtro usadas na listagem e nas operações em lote"""
+        conditions = []
         
-        # Aplicar filtros
         if status:
-            query = query.filter(Lead.status == status)
+            conditions.append(Lead.status == status)
         
         if origem:
-            query = query.filter(Lead.origem == origem)
+            conditions.append(Lead.origem == origem)
         
         if cidade:
-            query = query.filter(Lead.cidade.ilike(f"%{cidade}%"))
+            conditions.append(Lead.cidade.ilike(f"%{cidade}%"))
         
+        # Intervalos sobre a coluna crua (sem func.date) usam o índice de
+        # created_at e permitem partition pruning no PostgreSQL
         if data_inicio:
-            query = query.filter(func.date(Lead.created_at) >= data_inicio)
+            conditions.append(Lead.created_at >= _start_of_day(data_inicio))
         
         if data_fim:
-            query = query.filter(func.date(Lead.created_at) <= data_fim)
+            conditions.append(Lead.created_at < _start_of_day(data_fim + timedelta(days=1)))
         
         if search:
-            search_filter = or_(
+            conditions.append(or_(
                 Lead.nome.ilike(f"%{search}%"),
                 Lead.email.ilike(f"%{search}%"),
                 Lead.telefone.ilike(f"%{search}%"),
                 Lead.interesse.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
+            ))
         
-        # Contar total
-        total = query.count()
+        return conditions
+    
+    def iter_rows(
+        self,
+        columns: list,
+        batch_size: int = 1000,
+        **filters
+    ) -> Iterator[dict]:
+        """
+        Percorre os leads filtrados como dicionários, sem carregar tudo em memória.
         
-        # Aplicar paginação e ordenação
-        leads = query.order_by(Lead.created_at.desc()).offset(skip).limit(limit).all()
+        `yield_per` busca as linhas em blocos (cursor do lado do servidor no
+        PostgreSQL) e dispensa o identity map do ORM.
+        """
+        statement = (
+            select(*columns)
+            .where(*self.build_filters(**filters))
+            .order_by(Lead.id)
+            .execution_options(yield_per=batch_size)
+        )
         
-        return leads, total
+        for row in self.db.execute(statement).mappings():
+            yield row
+    
+    def bulk_update(
+        self,
+        values: dict,
+        ids: Optional[List[int]] = None,
+        rescore_fields: Optional[List[str]] = None,
+        **filters
+    ) -> Tuple[List[int], List[int], Dict[int, LeadStatus]]:
+        """
+        Aplica as alterações em um único UPDATE sobre os ids ou filtros informados.
+        
+        Leads cujo valor de algum campo em `rescore_fields` realmente mudou são
+        marcados como não processados. Retorna (ids atualizados, ids a reprocessar,
+        status anterior dos leads cujo status mudou).
+        """
+        conditions = [Lead.id.in_(ids)] if ids is not None else self.build_filters(**filters)
+        values = dict(values)
+        
+        if "cidade" in values:
+            values["cidade_normalizada"] = normalize_city(values["cidade"])
+        
+        changed_scoring = [
+            getattr(Lead, field).is_distinct_from(values[field])
+            for field in (rescore_fields or []) if field in values
+        ]
+        # No SET a expressão ainda vê os valores anteriores; já o RETURNING
+        # enxerga a linha alterada, então a marcação volta como coluna própria
+        reprocessar = (or_(*changed_scoring) if changed_scoring else false()).label("reprocessar")
+        if changed_scoring:
+            values["processado"] = case((or_(*changed_scoring), "N"), else_=Lead.processado)
+        values["updated_at"] = func.now()
+        
+        try:
+            if self.db.get_bind().dialect.name == "postgresql":
+                # Valores anteriores lidos (e travados) na CTE, no mesmo comando
+                previous = (
+                    select(Lead.id, reprocessar, Lead.status.label("status_anterior"))
+                    .where(*conditions)
+                    .with_for_update()
+                    .cte("anterior")
+                )
+                statement = (
+                    update(Lead)
+                    .where(Lead.id == previous.c.id)
+                    .values(**values)
+                    .returning(Lead.id, previous.c.reprocessar, previous.c.status_anterior)
+                    .execution_options(synchronize_session=False)
+                )
+                rows = self.db.execute(statement).all()
+            else:
+                # O SQLite só aceita colunas da própria tabela no RETURNING: os
+                # valores anteriores são lidos antes, na mesma transação
+                rows = self.db.execute(
+                    select(Lead.id, reprocessar, Lead.status).where(*conditions)
+                ).all()
+                self.db.execute(
+                    update(Lead)
+                    .where(*conditions)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            self.db.commit()
+            
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Erro na atualização em lote: {str(e)}")
+            raise
+        
+        updated_ids = [lead_id for lead_id, _, _ in rows]
+        rescore_ids = [lead_id for lead_id, reprocessar, _ in rows if reprocessar]
+        status_changes = {
+            lead_id: previous_status
+            for lead_id, _, previous_status in rows
+            if "status" in values and previous_status != values["status"]
+        }
+        
+        logger.info(
+            f"Atualização em lote - {len(updated_ids)} leads, Campos: {list(values.keys())}, "
+            f"Reprocessamento: {len(rescore_ids)}"
+        )
+        return updated_ids, rescore_ids, status_changes
     
     def get_leads_for_follow_up(self, date_limit: datetime) -> List[Lead]:
         """Busca leads que precisam de follow-up"""
@@ -139,36 +373,44 @@ class LeadRepository:
         """Busca leads não processados"""
         return self.db.query(Lead).filter(Lead.processado == "N").all()
     
+    @staticmethod
+    def _overview_columns() -> list:
+        """Agregados do resumo (contagens por status, média e leads de hoje) em uma linha"""
+        hoje = date.today()
+        
+        def contar(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+        
+        return [
+            func.count(Lead.id).label("total_leads"),
+            contar(Lead.status == LeadStatus.QUENTE).label("leads_quentes"),
+            contar(Lead.status == LeadStatus.MORNO).label("leads_mornos"),
+            contar(Lead.status == LeadStatus.FRIO).label("leads_frios"),
+            contar(Lead.status == LeadStatus.PROCESSANDO).label("leads_processando"),
+            func.coalesce(func.avg(Lead.score), 0).label("media_score"),
+            contar(and_(
+                Lead.created_at >= _start_of_day(hoje),
+                Lead.created_at < _start_of_day(hoje + timedelta(days=1))
+            )).label("leads_hoje")
+        ]
+    
+    @staticmethod
+    def _overview_from_row(row) -> dict:
+        return {
+            "total_leads": int(row.total_leads or 0),
+            "leads_quentes": int(row.leads_quentes or 0),
+            "leads_mornos": int(row.leads_mornos or 0),
+            "leads_frios": int(row.leads_frios or 0),
+            "leads_processando": int(row.leads_processando or 0),
+            "media_score": round(float(row.media_score or 0), 2),
+            "leads_hoje": int(row.leads_hoje or 0)
+        }
+    
     def get_stats(self) -> dict:
-        """Retorna estatísticas dos leads"""
+        """Retorna estatísticas dos leads (uma única agregação)"""
         try:
-            # Total de leads
-            total_leads = self.db.query(Lead).count()
-            
-            # Leads por status
-            leads_quentes = self.db.query(Lead).filter(Lead.status == LeadStatus.QUENTE).count()
-            leads_mornos = self.db.query(Lead).filter(Lead.status == LeadStatus.MORNO).count()
-            leads_frios = self.db.query(Lead).filter(Lead.status == LeadStatus.FRIO).count()
-            leads_processando = self.db.query(Lead).filter(Lead.status == LeadStatus.PROCESSANDO).count()
-            
-            # Média de score
-            media_score = self.db.query(func.avg(Lead.score)).scalar() or 0
-            
-            # Leads de hoje
-            hoje = date.today()
-            leads_hoje = self.db.query(Lead).filter(
-                func.date(Lead.created_at) == hoje
-            ).count()
-            
-            return {
-                "total_leads": total_leads,
-                "leads_quentes": leads_quentes,
-                "leads_mornos": leads_mornos,
-                "leads_frios": leads_frios,
-                "leads_processando": leads_processando,
-                "media_score": round(float(media_score), 2),
-                "leads_hoje": leads_hoje
-            }
+            row = self.db.execute(select(*self._overview_columns())).one()
+            return self._overview_from_row(row)
             
         except Exception as e:
             logger.error(f"Erro ao buscar estatísticas: {str(e)}")
@@ -182,6 +424,75 @@ class LeadRepository:
                 "leads_hoje": 0
             }
     
+    def get_dashboard_stats(self, days: int = 30, serie: Optional[Tuple] = None) -> dict:
+        """
+        Resumo, contagem por origem e por dia dos últimos N dias em uma só consulta.
+        
+        Os três agregados vêm de um UNION ALL: uma ida ao banco e o mesmo
+        snapshot para todos. A consulta também traz o fingerprint usado no ETag.
+        Com `serie` (granularity, start, end, breakdown), a série temporal entra
+        no mesmo UNION ALL, nas linhas do tipo "serie".
+        """
+        dia = cast(func.date(Lead.created_at), String)
+        overview = self._overview_columns()
+        
+        def vazios(*columns):
+            return [literal(None, type_=column.type).label(column.name) for column in columns]
+        
+        resumo = select(
+            literal("resumo").label("tipo"),
+            *vazios(Lead.origem), literal(None, type_=String).label("dia"),
+            *overview,
+            func.max(Lead.updated_at).label("ultimo_updated_at"),
+            func.max(Lead.created_at).label("ultimo_created_at"),
+            literal(None, type_=String).label("grupo")
+        )
+        por_origem = select(
+            literal("origem"), Lead.origem, literal(None, type_=String),
+            func.count(Lead.id), *[literal(None)] * (len(overview) - 1),
+            literal(None), literal(None), literal(None)
+        ).group_by(Lead.origem)
+        por_dia = select(
+            literal("dia"), literal(None), dia,
+            func.count(Lead.id), *[literal(None)] * (len(overview) - 1),
+            literal(None), literal(None), literal(None)
+        ).where(
+            Lead.created_at >= datetime.now() - timedelta(days=days)
+        ).group_by(dia)
+        
+        branches = [resumo, por_origem, por_dia]
+        if serie:
+            granularity, start, end, breakdown = serie
+            bucket = self._time_bucket(granularity)
+            group = PUBLIC_COLUMNS[breakdown] if breakdown else literal(None)
+            # Bucket e grupo viram texto para caber nas colunas dia e grupo
+            branches.append(select(
+                literal("serie"), literal(None), cast(bucket, String),
+                func.count(Lead.id), *[literal(None)] * (len(overview) - 1),
+                literal(None), literal(None), cast(group, String)
+            ).where(
+                Lead.created_at >= start, Lead.created_at < end
+            ).group_by(bucket, *([group] if breakdown else [])))
+        
+        rows = self.db.execute(union_all(*branches)).all()
+        
+        result = {"leads_por_origem": {}, "leads_por_periodo": [], "serie": [], "fingerprint": ()}
+        for row in rows:
+            if row.tipo == "resumo":
+                result["resumo"] = self._overview_from_row(row)
+                result["fingerprint"] = (row.total_leads, row.ultimo_updated_at, row.ultimo_created_at)
+            elif row.tipo == "origem":
+                result["leads_por_origem"][row.origem.value] = row.total_leads
+            elif row.tipo == "dia":
+                result["leads_por_periodo"].append({"data": row.dia, "count": row.total_leads})
+            else:
+                # O cast devolve o nome do enum, como está gravado no banco
+                group = PUBLIC_COLUMNS[breakdown].type.enum_class[row.grupo].value if row.grupo else None
+                result["serie"].append((self._parse_bucket(row.dia), group, row.total_leads))
+        
+        result["leads_por_periodo"].sort(key=lambda item: item["data"])
+        return result
+    
     def get_leads_by_origem(self) -> dict:
         """Retorna contagem de leads por origem"""
         try:
@@ -199,24 +510,24 @@ class LeadRepository:
     def get_leads_by_period(self, days: int = 30) -> List[dict]:
         """Retorna leads agrupados por data dos últimos N dias"""
         try:
-            from datetime import timedelta
-            
             data_limite = datetime.now() - timedelta(days=days)
+            # Texto YYYY-MM-DD em qualquer banco (o SQLite devolve date() como string)
+            dia = cast(func.date(Lead.created_at), String)
             
             result = self.db.query(
-                func.date(Lead.created_at).label('data'),
+                dia.label('data'),
                 func.count(Lead.id).label('count')
             ).filter(
                 Lead.created_at >= data_limite
             ).group_by(
-                func.date(Lead.created_at)
+                dia
             ).order_by(
-                func.date(Lead.created_at)
+                dia
             ).all()
             
             return [
                 {
-                    "data": data.strftime("%Y-%m-%d"),
+                    "data": data,
                     "count": count
                 }
                 for data, count in result
@@ -224,4 +535,49 @@ class LeadRepository:
             
         except Exception as e:
             logger.error(f"Erro ao buscar leads por período: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+    
+    def _time_bucket(self, granularity: str):
+        """Início do bucket (UTC) de created_at: hour, day, week (segunda) ou month"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return func.date_trunc(granularity, func.timezone("UTC", Lead.created_at))
+        
+        # SQLite guarda created_at como texto UTC; o bucket volta como texto ISO
+        formats = {
+            "hour": ("%Y-%m-%d %H:00:00",),
+            "day": ("%Y-%m-%d 00:00:00",),
+            "week": ("%Y-%m-%d 00:00:00", "weekday 0", "-6 days"),
+            "month": ("%Y-%m-01 00:00:00",)
+        }
+        fmt, *modifiers = formats[granularity]
+        return func.strftime(fmt, Lead.created_at, *modifiers)
+    
+    @staticmethod
+    def _parse_bucket(value) -> datetime:
+        """Início do bucket como datetime UTC (SQLite e o cast para texto devolvem ISO)"""
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return value.replace(tzinfo=timezone.utc)
+    
+    def get_timeseries(
+        self,
+        granularity: str,
+        start: datetime,
+        end: datetime,
+        breakdown: Optional[str] = None
+    ) -> List[Tuple[datetime, Optional[str], int]]:
+        """
+        Contagem de leads por bucket de tempo em [start, end), opcionalmente
+        por origem ou status, agregada no banco. Buckets vazios não vêm.
+        """
+        bucket = self._time_bucket(granularity).label("bucket")
+        group = PUBLIC_COLUMNS[breakdown] if breakdown else literal(None)
+        
+        statement = select(bucket, group, func.count(Lead.id)).where(
+            Lead.created_at >= start, Lead.created_at < end
+        ).group_by(bucket, *([group] if breakdown else []))
+        
+        return [
+            (self._parse_bucket(bucket_start), group_value.value if group_value is not None else None, count)
+            for bucket_start, group_value, count in self.db.execute(statement)
+        ]
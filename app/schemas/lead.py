@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr, validator
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, validator, model_validator
+from typing import Dict, List, Optional
+from datetime import date, datetime
 from app.models.lead import LeadStatus, LeadOrigin
 
 
@@ -72,6 +72,60 @@ class LeadUpdate(BaseModel):
         return v
 
 
+class LeadBulkFilter(BaseModel):
+    """Filtros de seleção para operações em lote (mesmos da listagem)"""
+    status: Optional[LeadStatus] = None
+    origem: Optional[LeadOrigin] = None
+    cidade: Optional[str] = None
+    data_inicio: Optional[date] = None
+    data_fim: Optional[date] = None
+    search: Optional[str] = None
+
+
+class LeadBulkChanges(BaseModel):
+    """Alterações aplicáveis em lote (campos de identificação ficam de fora)"""
+    origem: Optional[LeadOrigin] = None
+    interesse: Optional[str] = None
+    renda_aproximada: Optional[float] = None
+    cidade: Optional[str] = None
+    status: Optional[LeadStatus] = None
+    observacoes: Optional[str] = None
+    follow_up_date: Optional[datetime] = None
+
+    @validator('renda_aproximada')
+    def validate_renda(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('Renda não pode ser negativa')
+        return v
+
+
+class LeadBulkUpdate(BaseModel):
+    """Schema para atualização em lote por lista de IDs ou filtro"""
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    filtro: Optional[LeadBulkFilter] = None
+    alteracoes: LeadBulkChanges
+
+    @model_validator(mode='after')
+    def validate_selecao(self):
+        if (self.ids is None) == (self.filtro is None):
+            raise ValueError('Informe exatamente um entre ids e filtro')
+        if self.filtro is not None and not self.filtro.model_dump(exclude_none=True):
+            raise ValueError('O filtro deve ter ao menos um critério')
+        alteracoes = self.alteracoes.model_dump(exclude_unset=True)
+        if not alteracoes:
+            raise ValueError('Nenhuma alteração informada')
+        if any(alteracoes.get(field, True) is None for field in ('status', 'origem')):
+            raise ValueError('status e origem não podem ser nulos')
+        return self
+
+
+class LeadBulkUpdateResponse(BaseModel):
+    """Resultado de uma atualização em lote"""
+    atualizados: int
+    reprocessando: int
+    ids: List[int]
+
+
 class LeadResponse(LeadBase):
     """Schema para resposta de leads"""
     id: int
@@ -103,4 +157,37 @@ class LeadStats(BaseModel):
     leads_frios: int
     leads_processando: int
     media_score: float
-    leads_hoje: int
\ No newline at end of file
+    leads_hoje: int
+
+
+class TimeSeriesPoint(BaseModel):
+    """Ponto de uma série: início do bucket (UTC) e contagem"""
+    t: datetime
+    count: int
+
+
+class TimeSeriesSeries(BaseModel):
+    """Série de um grupo (origem/status) ou do total"""
+    nome: str
+    total: int
+    pontos: List[TimeSeriesPoint]
+
+
+class LeadTimeSeries(BaseModel):
+    """Schema da série temporal de leads"""
+    granularidade: str
+    breakdown: Optional[str] = None
+    inicio: datetime
+    fim: datetime
+    buckets: int
+    amostrado: bool
+    series: List[TimeSeriesSeries]
+
+
+class LeadDashboardStats(BaseModel):
+    """Schema com todos os agregados da página de overview do dashboard"""
+    resumo: LeadStats
+    leads_por_origem: Dict[str, int]
+    leads_por_periodo: List[dict]
+    dias: int
+    serie_temporal: Optional[LeadTimeSeries] = None
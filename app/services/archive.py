@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.config import settings
+from app.models.lead import Lead
+from app.repositories.lead_archive import LeadArchiveRepository
+
+
+class LeadArchiveService:
+    """Move leads antigos e já processados da tabela leads para o arquivo Parquet"""
+
+    def __init__(self, db: Session, archive: Optional[LeadArchiveRepository] = None):
+        self.db = db
+        self.archive = archive or LeadArchiveRepository()
+
+    def run(
+        self,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_batches: Optional[int] = None
+    ) -> dict:
+        """Arquiva em lotes até não restarem leads elegíveis (ou atingir max_batches)"""
+        older_than_days = older_than_days or settings.archive_after_days
+        batch_size = batch_size or settings.archive_batch_size
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+
+        batches = 0
+        archived = 0
+        while max_batches is None or batches < max_batches:
+            count = self.archive_batch(cutoff, batch_size)
+            if not count:
+                break
+
+            batches += 1
+            archived += count
+            logger.info(f"Lote {batches} arquivado: {count} leads (total: {archived})")
+
+        logger.info(f"Arquivamento concluído: {archived} leads em {batches} lotes")
+        return {"leads_arquivados": archived, "lotes": batches, "corte": cutoff.isoformat()}
+
+    def archive_batch(self, cutoff: datetime, batch_size: int) -> int:
+        """
+        Arquiva um lote de leads elegíveis.
+
+        Cada lote é gravado antes de ser removido do banco; se o processo cair
+        entre as duas etapas, a próxima execução seleciona os mesmos leads e
+        sobrescreve os mesmos arquivos, então o job pode ser reiniciado.
+        """
+        table = Lead.__table__
+        rows = self.db.execute(
+            select(table)
+            .where(Lead.processado == "Y", Lead.created_at < cutoff)
+            .order_by(Lead.id)
+            .limit(batch_size)
+        ).mappings().all()
+
+        if not rows:
+            return 0
+
+        try:
+            self.archive.write([dict(row) for row in rows])
+
+            ids = [row["id"] for row in rows]
+            # O filtro por created_at permite partition pruning no DELETE
+            self.db.execute(
+                delete(Lead)
+                .where(Lead.id.in_(ids), Lead.created_at < cutoff)
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+            return len(rows)
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Erro ao arquivar lote de leads: {str(e)}")
+            raise
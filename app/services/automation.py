@@ -1,10 +1,8 @@
-import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 from app.models.lead import Lead, LeadStatus
 from app.config import settings
+from app.metrics import INTEGRATION_ERRORS, track_integration
+from app.tracing import inject_headers, start_span
 from loguru import logger
 from typing import Optional
 
@@ -22,12 +20,8 @@ class AutomationService:
         actions_taken = []
         
         try:
-            if lead.status == LeadStatus.QUENTE:
-                actions_taken.extend(self._handle_hot_lead(lead))
-            elif lead.status == LeadStatus.MORNO:
-                actions_taken.extend(self._handle_warm_lead(lead))
-            elif lead.status == LeadStatus.FRIO:
-                actions_taken.extend(self._handle_cold_lead(lead))
+            with start_span("automation.process_lead_actions", **{"lead.id": lead.id}):
+                actions_taken.extend(self._run_actions(lead))
             
             logger.info(f"Ações processadas para lead {lead.id}: {actions_taken}")
             
@@ -41,6 +35,16 @@ class AutomationService:
             "actions_taken": actions_taken
         }
     
+    def _run_actions(self, lead: Lead) -> list:
+        """Executa as ações do status atual do lead"""
+        if lead.status == LeadStatus.QUENTE:
+            return self._handle_hot_lead(lead)
+        elif lead.status == LeadStatus.MORNO:
+            return self._handle_warm_lead(lead)
+        elif lead.status == LeadStatus.FRIO:
+            return self._handle_cold_lead(lead)
+        return []
+    
     def _handle_hot_lead(self, lead: Lead) -> list:
         """Ações para leads quentes"""
         actions = []
@@ -114,8 +118,7 @@ class AutomationService:
                     }]
                 }
                 
-                response = requests.post(self.slack_webhook, json=message, timeout=10)
-                return response.status_code == 200
+                return self._post("slack", self.slack_webhook, message, ok_statuses=(200,))
             
             return True  # Se não há webhook configurado, considera sucesso
             
@@ -135,13 +138,7 @@ class AutomationService:
                 "timestamp": datetime.now().isoformat()
             }
             
-            response = requests.post(
-                self.n8n_webhook_url,
-                json=payload,
-                timeout=10
-            )
-            
-            return response.status_code in [200, 201]
+            return self._post("n8n", self.n8n_webhook_url, payload, ok_statuses=(200, 201))
             
         except Exception as e:
             logger.error(f"Erro ao enviar para n8n: {str(e)}")
@@ -154,6 +151,11 @@ class AutomationService:
                 logger.warning("Configurações de email não encontradas")
                 return True  # Considera sucesso se não há config
             
+            # Importados sob demanda para não pesar na inicialização dos workers
+            import smtplib
+            from email.mime.text import MIMEText
+            from email.mime.multipart import MIMEMultipart
+            
             # Criar mensagem
             msg = MIMEMultipart()
             msg['From'] = settings.email_user
@@ -179,11 +181,12 @@ class AutomationService:
             msg.attach(MIMEText(body, 'plain'))
             
             # Enviar email
-            server = smtplib.SMTP(settings.smtp_server, settings.smtp_port)
-            server.starttls()
-            server.login(settings.email_user, settings.email_password)
-            server.send_message(msg)
-            server.quit()
+            with start_span("integration.email"), track_integration("email"):
+                server = smtplib.SMTP(settings.smtp_server, settings.smtp_port)
+                server.starttls()
+                server.login(settings.email_user, settings.email_password)
+                server.send_message(msg)
+                server.quit()
             
             return True
             
@@ -220,11 +223,24 @@ class AutomationService:
                     }]
                 }
                 
-                response = requests.post(self.slack_webhook, json=message, timeout=10)
-                return response.status_code == 200
+                return self._post("slack", self.slack_webhook, message, ok_statuses=(200,))
             
             return True
             
         except Exception as e:
             logger.error(f"Erro ao enviar lembrete de follow-up: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+    
+    def _post(self, integration: str, url: str, payload: dict, ok_statuses: tuple) -> bool:
+        """POST para uma integração, registrando latência e erros nas métricas"""
+        import requests
+        
+        with start_span(f"integration.{integration}") as span, track_integration(integration):
+            response = requests.post(url, json=payload, headers=inject_headers(), timeout=10)
+            if span:
+                span.set_attribute("http.status_code", response.status_code)
+        
+        if response.status_code not in ok_statuses:
+            INTEGRATION_ERRORS.labels(integration).inc()
+            return False
+        return True
@@ -0,0 +1,215 @@
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.models.lead import Lead
+from app.schemas.lead import LeadCreate
+from app.utils.normalization import normalize_email, normalize_phone, name_key, normalize_city
+
+# Campos herdados dos duplicados quando o lead mantido não os possui
+MERGE_FIELDS = ["interesse", "renda_aproximada", "cidade", "follow_up_date"]
+
+
+class LeadDeduplicationService:
+    """Detecta e mescla leads duplicados usando chaves normalizadas indexadas"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def find_duplicate(self, lead_data: LeadCreate) -> Optional[Tuple[Lead, str]]:
+        """
+        Procura um lead existente equivalente ao recebido.
+
+        Retorna o lead e o motivo ("email", "telefone" ou "nome_cidade").
+        Cada verificação é uma busca por igualdade em coluna indexada.
+        """
+        email = normalize_email(lead_data.email)
+        telefone = normalize_phone(lead_data.telefone)
+
+        candidate = self.db.query(Lead).filter(
+            or_(Lead.email_normalizado == email, Lead.telefone_normalizado == telefone)
+        ).order_by(Lead.id).first()
+        if candidate:
+            motivo = "email" if candidate.email_normalizado == email else "telefone"
+            return candidate, motivo
+
+        nome = name_key(lead_data.nome)
+        cidade = normalize_city(lead_data.cidade)
+        if not nome or not cidade:
+            return None
+
+        # Mesmo nome e cidade só confirmam duplicidade com outro indício
+        candidates = self.db.query(Lead).filter(
+            Lead.nome_chave == nome,
+            Lead.cidade_normalizada == cidade
+        ).order_by(Lead.id).limit(50).all()
+        for candidate in candidates:
+            if _is_probable_match(
+                candidate.email_normalizado, candidate.telefone_normalizado, email, telefone
+            ):
+                return candidate, "nome_cidade"
+
+        return None
+
+    def backfill_keys(self, batch_size: int = 1000) -> int:
+        """Preenche as chaves de deduplicação de leads antigos"""
+        updated = 0
+        last_id = 0
+        while True:
+            leads = self.db.query(Lead).filter(
+                Lead.id > last_id,
+                Lead.email_normalizado.is_(None)
+            ).order_by(Lead.id).limit(batch_size).all()
+            if not leads:
+                break
+
+            for lead in leads:
+                lead.update_dedup_keys()
+            self.db.commit()
+
+            last_id = leads[-1].id
+            updated += len(leads)
+
+        return updated
+
+    def merge_duplicates(self, dry_run: bool = False) -> dict:
+        """Agrupa leads duplicados e mescla cada grupo no lead mais antigo"""
+        backfilled = self.backfill_keys()
+        clusters = self._find_clusters()
+
+        merged = 0
+        for ids in clusters:
+            leads = self.db.query(Lead).filter(Lead.id.in_(ids)).order_by(Lead.id).all()
+            canonical, duplicates = leads[0], leads[1:]
+            logger.info(
+                f"Lead {canonical.id} duplicado por {[lead.id for lead in duplicates]}"
+                f"{' (dry run)' if dry_run else ''}"
+            )
+            if not dry_run:
+                self._merge_into(canonical, duplicates)
+                merged += len(duplicates)
+
+        if not dry_run:
+            self.db.commit()
+
+        return {
+            "chaves_preenchidas": backfilled,
+            "grupos_duplicados": len(clusters),
+            "leads_mesclados": merged
+        }
+
+    def _find_clusters(self) -> List[List[int]]:
+        """Une leads com mesmo email/telefone normalizado ou nome+cidade compatíveis"""
+        groups = _UnionFind()
+        for lead_id, other_id in chain(self._exact_key_pairs(), self._blocking_key_pairs()):
+            groups.union(lead_id, other_id)
+        return groups.clusters()
+
+    def _exact_key_pairs(self) -> Iterator[Tuple[int, int]]:
+        """Pares (primeiro lead, lead) com o mesmo email ou telefone normalizado"""
+        for column in [Lead.email_normalizado, Lead.telefone_normalizado]:
+            first_by_key = {}
+            for lead_id, key in self._rows_with_repeated_keys([column]):
+                first_id = first_by_key.setdefault(key[0], lead_id)
+                if first_id != lead_id:
+                    yield first_id, lead_id
+
+    def _blocking_key_pairs(self) -> Iterator[Tuple[int, int]]:
+        """Pares compatíveis dentro de cada bloco de mesmo nome + cidade"""
+        blocks: Dict[tuple, list] = {}
+        for lead_id, key in self._rows_with_repeated_keys(
+            [Lead.nome_chave, Lead.cidade_normalizada],
+            extra=[Lead.email_normalizado, Lead.telefone_normalizado]
+        ):
+            blocks.setdefault(key[:2], []).append((lead_id, key[2], key[3]))
+
+        for block in blocks.values():
+            for i, (lead_id, email, telefone) in enumerate(block):
+                for other_id, other_email, other_telefone in block[i + 1:]:
+                    if _is_probable_match(email, telefone, other_email, other_telefone):
+                        yield lead_id, other_id
+
+    def _rows_with_repeated_keys(self, columns: list, extra: Optional[list] = None):
+        """Retorna (id, valores) dos leads cujas chaves aparecem mais de uma vez"""
+        repeated = (
+            select(*columns)
+            .where(*[column.isnot(None) for column in columns])
+            .group_by(*columns)
+            .having(func.count() > 1)
+            .subquery()
+        )
+        query = (
+            select(Lead.id, *columns, *(extra or []))
+            .join(repeated, and_(*[column == repeated.c[column.key] for column in columns]))
+            .order_by(Lead.id)
+        )
+
+        for row in self.db.execute(query):
+            yield row[0], tuple(row[1:])
+
+    def _merge_into(self, canonical: Lead, duplicates: List[Lead]):
+        """Completa o lead mantido com dados dos duplicados e remove os duplicados"""
+        changed = False
+        for field in MERGE_FIELDS:
+            if getattr(canonical, field) is not None:
+                continue
+            value = next(
+                (getattr(lead, field) for lead in duplicates if getattr(lead, field) is not None),
+                None
+            )
+            if value is not None:
+                setattr(canonical, field, value)
+                changed = True
+
+        note = f"Mesclado com leads duplicados: {', '.join(str(lead.id) for lead in duplicates)}"
+        canonical.observacoes = f"{canonical.observacoes}\n{note}" if canonical.observacoes else note
+
+        # Campos de scoring podem ter mudado: o lead volta para reprocessamento
+        if changed:
+            canonical.processado = "N"
+
+        for lead in duplicates:
+            self.db.delete(lead)
+
+
+class _UnionFind:
+    """Conjuntos disjuntos de ids; cada grupo é representado pelo menor id"""
+
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, lead_id: int) -> int:
+        self.parent.setdefault(lead_id, lead_id)
+        while self.parent[lead_id] != lead_id:
+            self.parent[lead_id] = self.parent[self.parent[lead_id]]
+            lead_id = self.parent[lead_id]
+        return lead_id
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def clusters(self) -> List[List[int]]:
+        """Grupos com mais de um id, ordenados"""
+        groups: Dict[int, List[int]] = {}
+        for lead_id in self.parent:
+            groups.setdefault(self.find(lead_id), []).append(lead_id)
+        return [sorted(ids) for ids in groups.values() if len(ids) > 1]
+
+
+def _is_probable_match(
+    email: Optional[str],
+    telefone: Optional[str],
+    other_email: Optional[str],
+    other_telefone: Optional[str]
+) -> bool:
+    """Mesmo usuário de email ou mesmo número (sem DDD) indicam a mesma pessoa"""
+    if email and other_email and email.split("@")[0] == other_email.split("@")[0]:
+        return True
+    if telefone and other_telefone and telefone[-8:] == other_telefone[-8:]:
+        return True
+    return False
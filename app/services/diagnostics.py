@@ -0,0 +1,200 @@
+"""
+Diagnóstico de memória do processo (worker) atual: RSS, coletor de lixo e
+snapshots do tracemalloc para localizar crescimento de memória.
+
+Cada worker tem seu próprio estado; as respostas trazem o `pid` para indicar
+qual processo foi inspecionado.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+import gc
+import os
+import threading
+import tracemalloc
+
+import psutil
+from loguru import logger
+
+from app.config import settings
+
+# Frames internos que não interessam na análise
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+def _format_stat(stat) -> dict:
+    frame = stat.traceback[0]
+    return {
+        "arquivo": frame.filename,
+        "linha": frame.lineno,
+        "tamanho_kb": round(stat.size / 1024, 1),
+        "blocos": stat.count
+    }
+
+
+def _format_diff(stat) -> dict:
+    return {
+        **_format_stat(stat),
+        "diferenca_kb": round(stat.size_diff / 1024, 1),
+        "diferenca_blocos": stat.count_diff
+    }
+
+
+class MemoryDiagnostics:
+    """Controla o tracemalloc e guarda os últimos snapshots deste processo"""
+
+    def __init__(self, max_snapshots: int = 5):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, dict]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def start(self, frames: int = 1) -> dict:
+        """Inicia o tracemalloc (frames > 1 guarda a pilha, com mais overhead)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            logger.info(f"tracemalloc iniciado (pid {os.getpid()}, frames={frames})")
+        return self.tracemalloc_status()
+
+    def stop(self) -> dict:
+        """Para o tracemalloc e descarta os snapshots (liberando a memória deles)"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info(f"tracemalloc parado (pid {os.getpid()})")
+        with self._lock:
+            self._snapshots.clear()
+        return self.tracemalloc_status()
+
+    def tracemalloc_status(self) -> dict:
+        status = {"ativo": tracemalloc.is_tracing(), "snapshots": len(self._snapshots)}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            status.update({
+                "frames": tracemalloc.get_traceback_limit(),
+                "memoria_rastreada_kb": round(current / 1024, 1),
+                "pico_kb": round(peak / 1024, 1),
+                "overhead_kb": round(tracemalloc.get_tracemalloc_memory() / 1024, 1)
+            })
+        return status
+
+    def take_snapshot(self, label: Optional[str] = None) -> dict:
+        """Tira um snapshot; mantém apenas os `max_snapshots` mais recentes"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc não está ativo")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = {
+                "snapshot": snapshot,
+                "label": label,
+                "criado_em": datetime.now().isoformat(),
+                "rss_mb": self._rss_mb()
+            }
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+        return self._describe(snapshot_id)
+
+    def list_snapshots(self) -> List[dict]:
+        with self._lock:
+            ids = list(self._snapshots)
+        return [self._describe(snapshot_id) for snapshot_id in ids]
+
+    def top(self, snapshot_id: int, key_type: str = "lineno", limit: int = 20) -> dict:
+        """Maiores alocações de um snapshot agrupadas por linha ou arquivo"""
+        snapshot = self._get(snapshot_id)
+        stats = snapshot.statistics(key_type)
+        return {
+            **self._describe(snapshot_id),
+            "total_kb": round(sum(stat.size for stat in stats) / 1024, 1),
+            "top": [_format_stat(stat) for stat in stats[:limit]]
+        }
+
+    def diff(self, snapshot_id: int, base_id: int, key_type: str = "lineno", limit: int = 20) -> dict:
+        """Maiores crescimentos de memória entre `base_id` e `snapshot_id`"""
+        snapshot = self._get(snapshot_id)
+        base = self._get(base_id)
+        stats = snapshot.compare_to(base, key_type)
+        return {
+            "base": self._describe(base_id),
+            "snapshot": self._describe(snapshot_id),
+            "diferenca_total_kb": round(sum(stat.size_diff for stat in stats) / 1024, 1),
+            "top": [_format_diff(stat) for stat in stats[:limit]]
+        }
+
+    def process_stats(self, include_objects: bool = False) -> dict:
+        """Memória do processo, estado do coletor de lixo e do tracemalloc"""
+        process = psutil.Process()
+        memory = process.memory_info()
+
+        result = {
+            "pid": process.pid,
+            "rss_mb": round(memory.rss / 1024 / 1024, 1),
+            "vms_mb": round(memory.vms / 1024 / 1024, 1),
+            "threads": process.num_threads(),
+            "gc": {
+                "contagens": gc.get_count(),
+                "limiares": gc.get_threshold(),
+                "geracoes": gc.get_stats(),
+                "objetos_nao_coletaveis": len(gc.garbage)
+            },
+            "tracemalloc": self.tracemalloc_status()
+        }
+        if include_objects:
+            result["objetos"] = self.object_counts()
+        return result
+
+    @staticmethod
+    def object_counts() -> Dict[str, int]:
+        """
+        Objetos vivos dos tipos suspeitos de vazamento (percorre todo o heap;
+        custoso em processos grandes).
+        """
+        from sqlalchemy.orm import Session
+        from app.models.lead import Lead
+
+        counts = {"sessoes_sqlalchemy": 0, "leads_na_memoria": 0, "objetos_rastreados_gc": 0}
+        for obj in gc.get_objects():
+            counts["objetos_rastreados_gc"] += 1
+            if isinstance(obj, Session):
+                counts["sessoes_sqlalchemy"] += 1
+            elif isinstance(obj, Lead):
+                counts["leads_na_memoria"] += 1
+        return counts
+
+    @staticmethod
+    def collect() -> dict:
+        """Força uma coleta completa e informa quantos objetos foram liberados"""
+        before = MemoryDiagnostics._rss_mb()
+        collected = gc.collect()
+        return {"coletados": collected, "rss_antes_mb": before, "rss_depois_mb": MemoryDiagnostics._rss_mb()}
+
+    @staticmethod
+    def _rss_mb() -> float:
+        return round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        with self._lock:
+            entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise KeyError(snapshot_id)
+        return entry["snapshot"]
+
+    def _describe(self, snapshot_id: int) -> dict:
+        with self._lock:
+            entry = self._snapshots[snapshot_id]
+        return {
+            "id": snapshot_id,
+            "pid": os.getpid(),
+            "label": entry["label"],
+            "criado_em": entry["criado_em"],
+            "rss_mb": entry["rss_mb"]
+        }
+
+
+memory_diagnostics = MemoryDiagnostics(max_snapshots=settings.memory_max_snapshots)
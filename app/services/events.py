@@ -0,0 +1,291 @@
+from collections import deque
+from typing import AsyncIterator, Optional, Set
+import asyncio
+import itertools
+import queue
+import threading
+
+import orjson
+from loguru import logger
+
+from app.config import settings
+from app.models.lead import Lead
+
+# Máximo de eventos gravados no Redis em um único pipeline e de eventos
+# aguardando gravação (acima disso, publish descarta em vez de bloquear)
+REDIS_WRITE_BATCH = 500
+REDIS_OUTBOX_SIZE = 10000
+
+# Tipos de evento publicados
+LEAD_CREATED = "lead.created"
+LEAD_SCORED = "lead.scored"
+LEAD_STATUS_CHANGED = "lead.status_changed"
+LEADS_BULK_UPDATED = "leads.bulk_updated"
+
+
+def _event_key(event_id: str) -> tuple:
+    """Chave de ordenação de ids ("42" em memória, "1697040000000-0" no Redis)"""
+    try:
+        return tuple(int(part) for part in str(event_id).split("-"))
+    except ValueError:
+        return ()
+
+
+def format_sse(event: dict) -> str:
+    """Formata um evento no protocolo Server-Sent Events"""
+    data = orjson.dumps(event["data"]).decode("utf-8")
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+class _Subscriber:
+    """Fila limitada de um cliente; estoura em vez de crescer sem limite"""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+
+class LeadEventBroker:
+    """
+    Distribui eventos de leads para os clientes conectados (SSE).
+
+    Cada worker mantém seus assinantes e um histórico circular para retomada
+    via Last-Event-ID. Com EVENTS_BACKEND=redis os eventos passam por um Redis
+    Stream, lido por todos os workers, que fornece ids globais e ordenados;
+    a gravação no stream fica em uma thread própria, fora do event loop.
+    """
+
+    def __init__(
+        self,
+        backend: str = "memory",
+        history_size: int = 1000,
+        queue_size: int = 100,
+        heartbeat_seconds: float = 15.0
+    ):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._history: deque = deque(maxlen=history_size)
+        self._subscribers: Set[_Subscriber] = set()
+        self._ids = itertools.count(1)
+        self._ids_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._redis = None
+        self._outbox: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def start(self):
+        """Associa o broker ao event loop da aplicação (e inicia a leitura do Redis)"""
+        self._loop = asyncio.get_running_loop()
+
+        if self.backend == "redis":
+            import redis
+
+            self._redis = redis.Redis.from_url(settings.redis_url)
+            self._outbox = queue.Queue(maxsize=REDIS_OUTBOX_SIZE)
+            self._writer = threading.Thread(
+                target=self._write_redis_stream, name="events-redis-writer", daemon=True
+            )
+            self._writer.start()
+            self._reader = asyncio.create_task(self._read_redis_stream())
+
+        logger.info(f"Broker de eventos iniciado (backend: {self.backend})")
+
+    async def stop(self):
+        """Encerra a leitura e a gravação do Redis e libera os assinantes"""
+        if self._writer is not None:
+            # Sentinela: a thread grava o que já estava na fila e termina
+            await asyncio.to_thread(self._outbox.put, None)
+            await asyncio.to_thread(self._writer.join, 5)
+            self._writer = None
+            self._outbox = None
+
+        if self._reader:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+
+        if self._redis is not None:
+            self._redis.close()
+            self._redis = None
+
+        for subscriber in list(self._subscribers):
+            subscriber.overflowed = True
+        self._loop = None
+
+    def publish(self, event_type: str, data: dict):
+        """
+        Publica um evento. Pode ser chamado de qualquer thread (inclusive das
+        background tasks, que rodam no threadpool) e nunca bloqueia: com o
+        Redis, o evento só é enfileirado para a thread de gravação.
+        """
+        try:
+            if self._outbox is not None:
+                try:
+                    self._outbox.put_nowait({"type": event_type, "data": orjson.dumps(data)})
+                except queue.Full:
+                    logger.warning(f"Fila de gravação no Redis cheia, evento {event_type} descartado")
+                return
+
+            if self._loop is None:
+                return
+
+            with self._ids_lock:
+                event_id = str(next(self._ids))
+            event = {"id": event_id, "type": event_type, "data": data}
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+
+        except Exception as e:
+            # Falha na notificação nunca deve quebrar o fluxo do lead
+            logger.error(f"Erro ao publicar evento {event_type}: {str(e)}")
+
+    def publish_lead(self, event_type: str, lead: Lead, **extra):
+        """Publica um evento com o resumo do lead"""
+        self.publish(event_type, {
+            "id": lead.id,
+            "nome": lead.nome,
+            "origem": lead.origem.value if lead.origem else None,
+            "status": lead.status.value if lead.status else None,
+            "score": lead.score,
+            **extra
+        })
+
+    def _dispatch(self, event: dict):
+        """Entrega o evento a todos os assinantes locais (no event loop)"""
+        self._history.append(event)
+
+        for subscriber in list(self._subscribers):
+            if subscriber.overflowed:
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Cliente lento: a conexão é encerrada e ele retoma pelo Last-Event-ID
+                subscriber.overflowed = True
+                logger.warning("Assinante de eventos lento desconectado (fila cheia)")
+
+    def replay(self, last_event_id: Optional[str]) -> list:
+        """Eventos do histórico posteriores ao último id recebido pelo cliente"""
+        if not last_event_id:
+            return []
+        last_key = _event_key(last_event_id)
+        return [event for event in self._history if _event_key(event["id"]) > last_key]
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Gera o fluxo SSE de um cliente até ele desconectar ou estourar a fila.
+
+        A desconexão do cliente cancela o gerador (StreamingResponse).
+        """
+        subscriber = _Subscriber(self.queue_size)
+        # Assina antes de reenviar o histórico para não perder eventos no intervalo
+        self._subscribers.add(subscriber)
+        try:
+            # Intervalo de reconexão sugerido ao navegador (ms)
+            yield "retry: 3000\n\n"
+
+            last_key = _event_key(last_event_id) if last_event_id else ()
+            for event in self.replay(last_event_id):
+                last_key = _event_key(event["id"])
+                yield format_sse(event)
+
+            while not subscriber.overflowed:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=self.heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    # Comentário SSE mantém a conexão viva em proxies
+                    yield ": heartbeat\n\n"
+                    continue
+
+                if _event_key(event["id"]) <= last_key:
+                    continue
+                last_key = _event_key(event["id"])
+                yield format_sse(event)
+
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def _write_redis_stream(self):
+        """
+        Grava no Redis Stream os eventos enfileirados por publish (thread própria).
+
+        Os eventos acumulados enquanto o Redis respondia seguem juntos em um
+        pipeline, em uma única ida e volta.
+        """
+        running = True
+        while running:
+            batch = [self._outbox.get()]
+            while len(batch) < REDIS_WRITE_BATCH:
+                try:
+                    batch.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                running = False
+                batch = [fields for fields in batch if fields is not None]
+            if not batch:
+                continue
+
+            try:
+                pipeline = self._redis.pipeline(transaction=False)
+                for fields in batch:
+                    pipeline.xadd(
+                        settings.events_stream_key,
+                        fields,
+                        maxlen=self._history.maxlen,
+                        approximate=True
+                    )
+                pipeline.execute()
+            except Exception as e:
+                logger.error(f"Erro ao gravar {len(batch)} eventos no Redis: {str(e)}")
+
+    async def _read_redis_stream(self):
+        """Lê o Redis Stream e distribui os eventos aos assinantes deste worker"""
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(settings.redis_url)
+        last_id = "$"
+        try:
+            while True:
+                try:
+                    response = await client.xread(
+                        {settings.events_stream_key: last_id},
+                        block=int(self.heartbeat_seconds * 1000),
+                        count=500
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Erro ao ler eventos do Redis: {str(e)}")
+                    await asyncio.sleep(1)
+                    continue
+
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        last_id = entry_id.decode()
+                        self._dispatch({
+                            "id": last_id,
+                            "type": fields[b"type"].decode(),
+                            "data": orjson.loads(fields[b"data"])
+                        })
+        finally:
+            await client.close()
+
+
+event_broker = LeadEventBroker(
+    backend=settings.events_backend,
+    history_size=settings.events_history_size,
+    queue_size=settings.events_queue_size,
+    heartbeat_seconds=settings.events_heartbeat_seconds
+)
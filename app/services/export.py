@@ -0,0 +1,163 @@
+from datetime import datetime
+from typing import Iterable, Iterator, List
+import csv
+import enum
+import io
+
+import orjson
+
+from app.repositories.lead_repository import PUBLIC_COLUMNS
+
+# Colunas expostas na exportação
+EXPORT_COLUMNS = list(PUBLIC_COLUMNS.values())
+
+
+class ExportFormat(str, enum.Enum):
+    """Formatos suportados pela exportação"""
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+    FEATHER = "feather"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+    ExportFormat.FEATHER: "application/vnd.apache.arrow.file"
+}
+
+
+class _DrainableSink(io.RawIOBase):
+    """Destino de escrita que acumula bytes até serem drenados para a resposta"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # O writer Parquet usa a posição absoluta para os offsets do rodapé
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class LeadExporter:
+    """Serializa linhas de leads de forma incremental em CSV, NDJSON, Parquet ou Arrow IPC"""
+
+    def __init__(self, columns: list = None, batch_size: int = 2000):
+        self.columns: List[str] = [column.key for column in (columns or EXPORT_COLUMNS)]
+        self.batch_size = batch_size
+
+    def stream(self, rows: Iterable[dict], formato: ExportFormat) -> Iterator[bytes]:
+        """Gera os bytes do arquivo bloco a bloco; a memória não cresce com o total"""
+        if formato == ExportFormat.CSV:
+            return self._stream_csv(rows)
+        if formato == ExportFormat.NDJSON:
+            return self._stream_ndjson(rows)
+        if formato in (ExportFormat.ARROW, ExportFormat.FEATHER):
+            return self._stream_arrow(rows, file_format=formato == ExportFormat.FEATHER)
+        return self._stream_parquet(rows)
+
+    def _stream_csv(self, rows: Iterable[dict]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.columns)
+
+        for count, row in enumerate(rows, start=1):
+            writer.writerow([_csv_value(row[column]) for column in self.columns])
+            if count % self.batch_size == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        yield buffer.getvalue().encode("utf-8")
+
+    def _stream_ndjson(self, rows: Iterable[dict]) -> Iterator[bytes]:
+        chunk = []
+        for row in rows:
+            chunk.append(orjson.dumps({column: row[column] for column in self.columns}))
+            if len(chunk) >= self.batch_size:
+                yield b"\n".join(chunk) + b"\n"
+                chunk = []
+
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
+
+    def _stream_parquet(self, rows: Iterable[dict]) -> Iterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = self._arrow_schema()
+        sink = _DrainableSink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+        # Cada bloco vira um row group, enviado assim que é gravado
+        batch = []
+        for row in rows:
+            batch.append({column: _plain_value(row[column]) for column in self.columns})
+            if len(batch) >= self.batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+                yield sink.drain()
+
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        writer.close()
+        yield sink.drain()
+
+    def _stream_arrow(self, rows: Iterable[dict], file_format: bool = False) -> Iterator[bytes]:
+        """Arrow IPC: um record batch por bloco (stream) ou Feather v2 (file, com rodapé)"""
+        import pyarrow as pa
+
+        schema = self._arrow_schema()
+        sink = _DrainableSink()
+        writer = pa.ipc.new_file(sink, schema) if file_format else pa.ipc.new_stream(sink, schema)
+        yield sink.drain()
+
+        batch = []
+        for row in rows:
+            batch.append({column: _plain_value(row[column]) for column in self.columns})
+            if len(batch) >= self.batch_size:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                batch = []
+                yield sink.drain()
+
+        if batch:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+        writer.close()
+        yield sink.drain()
+
+    def _arrow_schema(self):
+        import pyarrow as pa
+
+        from app.repositories.lead_archive import ARCHIVE_SCHEMA
+
+        return pa.schema([ARCHIVE_SCHEMA.field(column) for column in self.columns])
+
+
+def _plain_value(value):
+    """Enums viram seus valores textuais"""
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _csv_value(value):
+    value = _plain_value(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
@@ -0,0 +1,263 @@
+from contextlib import contextmanager
+from datetime import date
+from typing import List, Optional, Union
+import re
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from loguru import logger
+
+
+def month_start(value: date) -> date:
+    """Retorna o primeiro dia do mês da data"""
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Soma (ou subtrai) meses a uma data no primeiro dia do mês"""
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class LeadPartitionManager:
+    """Gerencia as partições mensais (por created_at) da tabela leads no PostgreSQL"""
+
+    def __init__(self, bind: Union[Engine, Connection], table: str = "leads"):
+        self.bind = bind
+        self.table = table
+        self._name_pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$")
+
+    @contextmanager
+    def _connection(self):
+        """Abre uma transação no engine ou reutiliza a conexão recebida (migrações)"""
+        if isinstance(self.bind, Engine):
+            with self.bind.begin() as conn:
+                yield conn
+        else:
+            yield self.bind
+
+    @property
+    def default_partition(self) -> str:
+        return f"{self.table}_default"
+
+    def partition_name(self, month: date) -> str:
+        """Nome da partição de um mês (ex.: leads_p2024_01)"""
+        return f"{self.table}_p{month.year:04d}_{month.month:02d}"
+
+    def is_supported(self) -> bool:
+        """Particionamento declarativo só existe no PostgreSQL"""
+        return self.bind.dialect.name == "postgresql"
+
+    def is_partitioned(self) -> bool:
+        """Verifica se a tabela já é particionada"""
+        if not self.is_supported():
+            return False
+
+        with self._connection() as conn:
+            return conn.execute(
+                text(
+                    "SELECT 1 FROM pg_partitioned_table pt "
+                    "JOIN pg_class c ON c.oid = pt.partrelid "
+                    "WHERE c.relname = :table"
+                ),
+                {"table": self.table}
+            ).scalar() is not None
+
+    def list_partitions(self) -> List[dict]:
+        """Lista as partições anexadas com seus limites"""
+        with self._connection() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                    "FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "JOIN pg_class p ON p.oid = i.inhparent "
+                    "WHERE p.relname = :table "
+                    "ORDER BY c.relname"
+                ),
+                {"table": self.table}
+            ).all()
+
+        return [{"nome": name, "limites": bounds} for name, bounds in rows]
+
+    def create_partition(self, month: date) -> bool:
+        """
+        Cria a partição do mês se ainda não existir.
+
+        Se a partição default já guarda linhas do mês (inseridas antes de a
+        partição existir), o PostgreSQL recusa o CREATE: a default é
+        desanexada, as linhas são movidas para a nova partição e a default é
+        anexada de volta, tudo na mesma transação.
+        """
+        month = month_start(month)
+        name = self.partition_name(month)
+        start = f"{month.isoformat()} 00:00:00+00"
+        end = f"{add_months(month, 1).isoformat()} 00:00:00+00"
+
+        with self._connection() as conn:
+            exists = conn.execute(
+                text("SELECT to_regclass(:name)"), {"name": name}
+            ).scalar()
+            if exists:
+                return False
+
+            in_month = "created_at >= CAST(:start AS timestamptz) AND created_at < CAST(:end AS timestamptz)"
+            has_default = conn.execute(
+                text("SELECT to_regclass(:name)"), {"name": self.default_partition}
+            ).scalar()
+            pending = has_default and conn.execute(
+                text(f"SELECT EXISTS (SELECT 1 FROM {self.default_partition} WHERE {in_month})"),
+                {"start": start, "end": end}
+            ).scalar()
+
+            if pending:
+                conn.execute(text(f"ALTER TABLE {self.table} DETACH PARTITION {self.default_partition}"))
+
+            conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {self.table} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            ))
+
+            if pending:
+                moved = conn.execute(
+                    text(
+                        f"WITH moved AS (DELETE FROM {self.default_partition} WHERE {in_month} RETURNING *) "
+                        f"INSERT INTO {name} SELECT * FROM moved"
+                    ),
+                    {"start": start, "end": end}
+                ).rowcount
+                conn.execute(text(
+                    f"ALTER TABLE {self.table} ATTACH PARTITION {self.default_partition} DEFAULT"
+                ))
+                logger.info(f"{moved} leads movidos da partição {self.default_partition} para {name}")
+
+        logger.info(f"Partição {name} criada")
+        return True
+
+    def _index_columns(self, conn) -> List[str]:
+        """Colunas com índice simples ix_<tabela>_<coluna>"""
+        prefix = f"ix_{self.table}_"
+        return [
+            index["column_names"][0]
+            for index in inspect(conn).get_indexes(self.table)
+            if index["name"].startswith(prefix) and len(index["column_names"]) == 1
+        ]
+
+    def rebuild_table(self, partitioned: bool, months_ahead: int = 3):
+        """
+        Recria a tabela (particionada por mês ou comum) copiando os dados.
+
+        Usado pela migração e por `streamleads partitions convert`; a tabela
+        fica bloqueada durante a cópia, tudo em uma única transação.
+        """
+        table, old = self.table, f"{self.table}_old"
+
+        with self._connection() as conn:
+            columns = self._index_columns(conn)
+
+            conn.execute(text(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE"))
+            conn.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+            conn.execute(text(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey"))
+            for column in columns:
+                conn.execute(text(f"ALTER INDEX ix_{table}_{column} RENAME TO ix_{old}_{column}"))
+
+            if partitioned:
+                conn.execute(text(f"UPDATE {old} SET created_at = now() WHERE created_at IS NULL"))
+                conn.execute(text(
+                    f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) "
+                    "PARTITION BY RANGE (created_at)"
+                ))
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL"))
+                conn.execute(text(
+                    f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)"
+                ))
+
+                first = conn.execute(text(f"SELECT min(created_at) FROM {old}")).scalar()
+                LeadPartitionManager(conn, table).ensure_partitions(
+                    months_ahead, start=first.date() if first else date.today()
+                )
+            else:
+                conn.execute(text(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)"))
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN created_at DROP NOT NULL"))
+                conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)"))
+
+            copied = conn.execute(text(f"INSERT INTO {table} SELECT * FROM {old}")).rowcount
+            for column in columns:
+                conn.execute(text(f"CREATE INDEX ix_{table}_{column} ON {table} ({column})"))
+
+            conn.execute(text(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id"))
+            conn.execute(text(f"DROP TABLE {old} CASCADE"))
+
+        logger.info(
+            f"Tabela {table} recriada {'particionada' if partitioned else 'sem particionamento'} "
+            f"({copied} linhas copiadas)"
+        )
+
+    def create_default_partition(self) -> bool:
+        """Cria a partição default, que recebe linhas fora dos meses criados"""
+        with self._connection() as conn:
+            exists = conn.execute(
+                text("SELECT to_regclass(:name)"), {"name": self.default_partition}
+            ).scalar()
+            if exists:
+                return False
+
+            conn.execute(text(
+                f"CREATE TABLE {self.default_partition} PARTITION OF {self.table} DEFAULT"
+            ))
+
+        logger.info(f"Partição {self.default_partition} criada")
+        return True
+
+    def ensure_partitions(
+        self,
+        months_ahead: int,
+        start: Optional[date] = None,
+        today: Optional[date] = None
+    ) -> List[str]:
+        """Garante partições de `start` (ou do mês atual) até `months_ahead` meses à frente"""
+        current = month_start(today or date.today())
+        month = month_start(start) if start else current
+        last = add_months(current, months_ahead)
+
+        created = []
+        while month <= last:
+            if self.create_partition(month):
+                created.append(self.partition_name(month))
+            month = add_months(month, 1)
+
+        self.create_default_partition()
+        return created
+
+    def detach_old_partitions(
+        self,
+        retention_months: int,
+        drop: bool = False,
+        today: Optional[date] = None
+    ) -> List[str]:
+        """Desanexa (e opcionalmente remove) partições mais antigas que a retenção"""
+        cutoff = add_months(month_start(today or date.today()), -retention_months)
+
+        detached = []
+        for partition in self.list_partitions():
+            match = self._name_pattern.match(partition["nome"])
+            if not match:
+                continue
+
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            if month >= cutoff:
+                continue
+
+            with self._connection() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {self.table} DETACH PARTITION {partition['nome']}"
+                ))
+                if drop:
+                    conn.execute(text(f"DROP TABLE {partition['nome']}"))
+
+            detached.append(partition["nome"])
+            logger.info(
+                f"Partição {partition['nome']} {'removida' if drop else 'desanexada'}"
+            )
+
+        return detached
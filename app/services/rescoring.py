@@ -0,0 +1,387 @@
+"""
+Rescoring da base de leads depois de mudanças nas regras de scoring.
+
+Os leads são percorridos em ordem de id, em blocos por keyset (id > último
+id lido), cada bloco lido em uma transação curta: o job não segura um
+snapshot por horas (o VACUUM continua limpando as versões antigas) nem
+bloqueia as escritas no SQLite. Os blocos são pontuados pelo próprio
+LeadScoringService em processos separados enquanto o processo principal lê e
+grava, e só os leads cujo score, status ou flag de processamento mudaram são
+gravados, em um UPDATE por bloco. O progresso fica em um checkpoint JSON
+(último id gravado, contadores, versão das regras), de onde uma execução
+interrompida continua.
+"""
+
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import time
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.config import settings
+from app.models.lead import Lead
+from app.services.automation import AutomationService
+from app.services.events import LEAD_STATUS_CHANGED, event_broker
+from app.services.scoring import LeadScoringService
+from app.utils.concurrency import bounded_map
+
+STATUS_RUNNING = "em_andamento"
+STATUS_INTERRUPTED = "interrompido"
+STATUS_DONE = "concluido"
+
+# Blocos considerados no cálculo da vazão e do ETA
+PROGRESS_WINDOW = 20
+
+# Sem atualização do checkpoint por esse tempo, um job de outro host é dado como morto
+HEARTBEAT_TIMEOUT = timedelta(minutes=5)
+
+# Colunas lidas: tudo o que as regras consultam mais o resultado atual
+RESCORE_COLUMNS = [
+    Lead.id, Lead.nome, Lead.email, Lead.telefone, Lead.origem, Lead.interesse,
+    Lead.renda_aproximada, Lead.cidade, Lead.score, Lead.status, Lead.processado
+]
+
+# Campos que alteram o score: o UPDATE só grava se continuarem como foram lidos,
+# para não sobrescrever um lead editado (e repontuado) durante o job
+GUARD_FIELDS = ["interesse", "renda_aproximada", "cidade"]
+
+# Linha lida do banco; expõe os atributos que LeadScoringService consulta em um Lead
+_LeadRow = namedtuple("_LeadRow", [attribute.key for attribute in RESCORE_COLUMNS])
+
+
+def rules_version(scoring: LeadScoringService) -> str:
+    """Hash da configuração de scoring (pesos, limiares e listas de palavras/regiões)"""
+    payload = json.dumps(vars(scoring), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class RescoringCheckpoint:
+    """Estado do job em um arquivo JSON, compartilhado entre a CLI e a API"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.rescoring_checkpoint_path)
+
+    def load(self) -> Optional[dict]:
+        if not self.path.exists():
+            return None
+        return json.loads(self.path.read_text())
+
+    def save(self, state: dict):
+        """Grava de forma atômica (quem lê nunca vê um arquivo pela metade)"""
+        state["atualizado_em"] = datetime.now(timezone.utc).isoformat()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        temporary.write_text(json.dumps(state, ensure_ascii=False, indent=2))
+        os.replace(temporary, self.path)
+
+    @staticmethod
+    def is_active(state: Optional[dict]) -> bool:
+        """Se o job do checkpoint ainda está rodando (pid vivo ou checkpoint recente)"""
+        if not state or state.get("status") != STATUS_RUNNING:
+            return False
+        if state.get("host") == socket.gethostname():
+            try:
+                os.kill(state["pid"], 0)
+            except ProcessLookupError:
+                return False
+            except PermissionError:
+                pass
+            return True
+        updated_at = datetime.fromisoformat(state["atualizado_em"])
+        return datetime.now(timezone.utc) - updated_at < HEARTBEAT_TIMEOUT
+
+
+class LeadRescoringService:
+    """
+    Recalcula score e status de todos os leads com as regras atuais.
+
+    Uma execução interrompida é retomada do checkpoint se as regras não
+    mudaram desde então; com regras diferentes, ou com `restart`, recomeça do
+    primeiro lead. Leads criados depois do início ficam fora (já são
+    pontuados com as regras novas). Com `trigger_automations`, os leads que
+    mudaram de status disparam as automações e o evento de mudança de status.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        chunk_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        trigger_automations: bool = True,
+        checkpoint: Optional[RescoringCheckpoint] = None
+    ):
+        self.engine = engine
+        self.chunk_size = chunk_size or settings.rescoring_chunk_size
+        self.workers = workers or settings.rescoring_workers or min(os.cpu_count() or 1, 8)
+        self.trigger_automations = trigger_automations
+        self.checkpoint = checkpoint or RescoringCheckpoint()
+        self.scoring = LeadScoringService()
+
+    def run(self, restart: bool = False) -> dict:
+        """Inicia (ou retoma) e executa o job até o fim"""
+        return self.execute(self.begin(restart))
+
+    def begin(self, restart: bool = False) -> dict:
+        """
+        Prepara o checkpoint da execução e o devolve.
+
+        Levanta RuntimeError se outro job estiver em andamento.
+        """
+        version = rules_version(self.scoring)
+        state = self.checkpoint.load()
+        if self.checkpoint.is_active(state):
+            raise RuntimeError(
+                f"Já existe um rescoring em andamento (pid {state['pid']} em {state['host']})"
+            )
+
+        resume = (
+            not restart and state is not None
+            and state["status"] != STATUS_DONE and state["versao_regras"] == version
+        )
+        if resume:
+            logger.info(
+                f"Retomando rescoring a partir do lead {state['ultimo_id']} "
+                f"({state['processados']}/{state['total']})"
+            )
+        else:
+            if state and state["status"] != STATUS_DONE and not restart:
+                logger.warning("As regras de scoring mudaram desde o checkpoint; recomeçando o rescoring")
+            state = self._new_state(version)
+
+        state.update({
+            "status": STATUS_RUNNING,
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "automacoes": self.trigger_automations,
+            "erro": None
+        })
+        self.checkpoint.save(state)
+        return state
+
+    def execute(self, state: dict) -> dict:
+        """Pontua os blocos restantes, gravando o checkpoint a cada bloco"""
+        # (instante, leads processados) ao fim dos últimos blocos: a partida dos
+        # processos fica fora da vazão
+        samples = deque(maxlen=PROGRESS_WINDOW)
+        # O spawn não herda conexões nem threads do processo principal (seguro na API)
+        pool = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(vars(self.scoring),)
+        )
+        try:
+            chunks = self._iter_chunks(state["ultimo_id"], state["id_maximo"])
+            for last_id, count, changes in bounded_map(pool, _score_chunk, chunks, self.workers * 2):
+                written = self._write(changes)
+                if self.trigger_automations:
+                    self._run_automations(changes)
+
+                state["ultimo_id"] = last_id
+                state["processados"] += count
+                state["alterados"] += written
+                state["mudancas_status"] += sum(1 for change in changes if change[2] != change[3])
+                state["conflitos"] += len(changes) - written
+                samples.append((time.perf_counter(), state["processados"]))
+                self._update_progress(state, samples)
+                self.checkpoint.save(state)
+
+                logger.info(
+                    f"Rescoring: {state['processados']}/{state['total']} leads "
+                    f"({state['progresso']}%), {state['alterados']} alterados, "
+                    f"{state['linhas_por_segundo']:,} linhas/s, ETA {state['eta_segundos']}s"
+                )
+        except BaseException as e:
+            state["status"] = STATUS_INTERRUPTED
+            state["erro"] = str(e) or type(e).__name__
+            self.checkpoint.save(state)
+            logger.error(f"Rescoring interrompido no lead {state['ultimo_id']}: {state['erro']}")
+            raise
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+        state["status"] = STATUS_DONE
+        state["concluido_em"] = datetime.now(timezone.utc).isoformat()
+        state["eta_segundos"] = 0
+        self.checkpoint.save(state)
+        logger.info(
+            f"Rescoring concluído: {state['processados']} leads, {state['alterados']} alterados, "
+            f"{state['mudancas_status']} mudanças de status"
+        )
+        return state
+
+    def _new_state(self, version: str) -> dict:
+        with self.engine.connect() as conn:
+            max_id, total = conn.execute(select(func.max(Lead.id), func.count(Lead.id))).one()
+
+        return {
+            "versao_regras": version,
+            "iniciado_em": datetime.now(timezone.utc).isoformat(),
+            "concluido_em": None,
+            "id_maximo": max_id or 0,
+            "ultimo_id": 0,
+            "total": total,
+            "processados": 0,
+            "alterados": 0,
+            "mudancas_status": 0,
+            "conflitos": 0,
+            "progresso": 0.0,
+            "linhas_por_segundo": 0,
+            "eta_segundos": None
+        }
+
+    @staticmethod
+    def _update_progress(state: dict, samples: deque):
+        """Percentual, vazão nos últimos blocos e tempo restante estimado"""
+        (first_time, first_count), (last_time, last_count) = samples[0], samples[-1]
+        elapsed = last_time - first_time
+        rate = (last_count - first_count) / elapsed if elapsed else 0
+        remaining = max(state["total"] - state["processados"], 0)
+        state["progresso"] = round(100 * state["processados"] / state["total"], 1) if state["total"] else 100.0
+        state["linhas_por_segundo"] = round(rate)
+        state["eta_segundos"] = round(remaining / rate) if rate else None
+
+    def _iter_chunks(self, after_id: int, max_id: int) -> Iterator[List[tuple]]:
+        """Blocos de leads em ordem de id, cada um lido em sua própria transação"""
+        while True:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    select(*RESCORE_COLUMNS)
+                    .where(Lead.id > after_id, Lead.id <= max_id)
+                    .order_by(Lead.id)
+                    .limit(self.chunk_size)
+                ).all()
+
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+            after_id = rows[-1][0]
+
+    def _write(self, changes: List[tuple]) -> int:
+        """
+        Grava os novos scores em um UPDATE e devolve quantos leads foram alterados.
+
+        No PostgreSQL é um UPDATE ... FROM unnest(arrays), com um array por
+        coluna: o SQL é o mesmo em todo bloco (compilado uma vez) e não cresce
+        com o número de leads. Nos demais bancos, um executemany. Leads cujos
+        GUARD_FIELDS mudaram desde a leitura ficam de fora.
+        """
+        if not changes:
+            return 0
+
+        table = Lead.__table__
+        fields = ["id", "score", "status", *GUARD_FIELDS]
+        rows = [(lead_id, score, status, *guard) for lead_id, score, status, _, *guard in changes]
+        # O bloco é um intervalo de ids: o limite deixa o planner usar a PK em vez
+        # de varrer a tabela inteira no join
+        bounds = {"primeiro_id": rows[0][0], "ultimo_id": rows[-1][0]}
+        in_chunk = table.c.id.between(bindparam("primeiro_id"), bindparam("ultimo_id"))
+
+        with self.engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                novos = func.unnest(
+                    *[bindparam(f"novos_{field}", type_=ARRAY(table.c[field].type)) for field in fields]
+                ).table_valued(*fields).render_derived(name="novos")
+                novo = novos.c
+                statement = (
+                    update(table)
+                    .where(
+                        in_chunk,
+                        table.c.id == novo["id"],
+                        *[table.c[field].is_not_distinct_from(novo[field]) for field in GUARD_FIELDS]
+                    )
+                    .values(score=novo["score"], status=novo["status"], processado="Y", updated_at=func.now())
+                )
+                arrays = {f"novos_{field}": list(column) for field, column in zip(fields, zip(*rows))}
+                return conn.execute(statement, {**bounds, **arrays}).rowcount
+
+            statement = (
+                update(table)
+                .where(
+                    in_chunk,
+                    table.c.id == bindparam("lead_id"),
+                    *[
+                        table.c[field].is_not_distinct_from(bindparam(f"lido_{field}", type_=table.c[field].type))
+                        for field in GUARD_FIELDS
+                    ]
+                )
+                .values(
+                    score=bindparam("novo_score"),
+                    status=bindparam("novo_status", type_=table.c.status.type),
+                    processado="Y",
+                    updated_at=func.now()
+                )
+            )
+            params = [
+                {
+                    **bounds, "lead_id": lead_id, "novo_score": score, "novo_status": status,
+                    **{f"lido_{field}": value for field, value in zip(GUARD_FIELDS, guard)}
+                }
+                for lead_id, score, status, *guard in rows
+            ]
+            return conn.execute(statement, params).rowcount
+
+    def _run_automations(self, changes: List[tuple]):
+        """Automações e evento de status para os leads gravados com status novo"""
+        status_changes = {
+            lead_id: (score, status, previous)
+            for lead_id, score, status, previous, *_ in changes if status != previous
+        }
+        if not status_changes:
+            return
+
+        automation_service = AutomationService()
+        with Session(self.engine) as db:
+            for lead in db.query(Lead).filter(Lead.id.in_(list(status_changes))).all():
+                score, status, previous = status_changes[lead.id]
+                # Lead alterado durante o job (UPDATE descartado): não dispara nada
+                if (lead.score, lead.status) != (score, status):
+                    continue
+                event_broker.publish_lead(
+                    LEAD_STATUS_CHANGED, lead, status_anterior=previous.value if previous else None
+                )
+                automation_service.process_lead_actions(lead)
+
+
+# Serviço de scoring de cada processo de trabalho
+_worker_state = {}
+
+
+def _init_worker(scoring_config: dict):
+    # Mesma configuração do processo principal, sem os logs por regra (milhões de linhas)
+    scoring = LeadScoringService()
+    scoring.__dict__.update(scoring_config)
+    _worker_state["scoring"] = scoring
+    logger.disable("app.services.scoring")
+
+
+def _score_chunk(rows: List[tuple]) -> Tuple[int, int, List[tuple]]:
+    """
+    Pontua um bloco e devolve (último id, leads lidos, alterações).
+
+    Cada alteração é (id, score, status, status anterior, *GUARD_FIELDS lidos).
+    """
+    scoring = _worker_state["scoring"]
+    changes = []
+    for row in rows:
+        lead = _LeadRow._make(row)
+        score = scoring.calculate_score(lead)
+        status = scoring.classify_lead(score)
+        if score != lead.score or status != lead.status or lead.processado != "Y":
+            changes.append((
+                lead.id, score, status, lead.status,
+                *(getattr(lead, field) for field in GUARD_FIELDS)
+            ))
+    return rows[-1][0], len(rows), changes
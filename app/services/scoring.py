@@ -1,5 +1,7 @@
 from app.models.lead import Lead, LeadStatus
 from app.config import settings
+from app.metrics import LEAD_SCORING_DURATION
+from app.tracing import start_span
 from loguru import logger
 from typing import List
 
@@ -67,9 +69,11 @@ class LeadScoringService:
     
     def process_lead(self, lead: Lead) -> Lead:
         """Processa um lead: calcula score e classifica"""
-        lead.score = self.calculate_score(lead)
-        lead.status = self.classify_lead(lead.score)
-        lead.processado = "Y"
+        with start_span("scoring.calculate_score", **{"lead.id": lead.id}), \
+                LEAD_SCORING_DURATION.time():
+            lead.score = self.calculate_score(lead)
+            lead.status = self.classify_lead(lead.score)
+            lead.processado = "Y"
         
         logger.info(
             f"Lead processado - ID: {lead.id}, Nome: {lead.nome}, "
@@ -0,0 +1,417 @@
+"""
+Gerador de leads sintéticos para benchmarks e testes de carga.
+
+Os dados são determinísticos para uma mesma semente: o Faker (pt_BR) gera uma
+única vez os conjuntos de nomes, e cada lead é sorteado desses conjuntos e das
+distribuições configuradas (origem, cidade, palavras de interesse, renda
+log-normal); só o created_at é relativo ao momento da geração. Os blocos
+têm sementes independentes e podem ser gerados em vários processos; a carga
+usa COPY no PostgreSQL e INSERT em lote (executemany) nos demais bancos, sem
+passar pelo ORM.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, partial
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
+import csv
+import io
+import math
+import random
+import time
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Engine
+from loguru import logger
+
+from app.models.lead import Lead, LeadOrigin, LeadStatus
+from app.services.scoring import LeadScoringService
+from app.utils.concurrency import bounded_map
+from app.utils.normalization import name_key, normalize_city, normalize_email, strip_accents
+
+DEFAULT_ORIGEM_WEIGHTS = {
+    LeadOrigin.META_ADS.value: 35,
+    LeadOrigin.GOOGLE_ADS.value: 25,
+    LeadOrigin.WHATSAPP.value: 15,
+    LeadOrigin.SITE.value: 12,
+    LeadOrigin.INDICACAO.value: 8,
+    LeadOrigin.OUTROS.value: 5
+}
+
+# Cidade -> (peso, DDD)
+DEFAULT_CIDADES = {
+    "São Paulo": (30, 11), "Rio de Janeiro": (15, 21), "Belo Horizonte": (8, 31),
+    "Brasília": (6, 61), "Curitiba": (5, 41), "Porto Alegre": (5, 51), "Salvador": (4, 71),
+    "Fortaleza": (4, 85), "Recife": (4, 81), "Campinas": (4, 19), "Goiânia": (3, 62),
+    "Santos": (2, 13), "Osasco": (2, 11), "Manaus": (2, 92), "Belém": (2, 91),
+    "Florianópolis": (2, 48), "Vitória": (1, 27), "Natal": (1, 84)
+}
+
+DEFAULT_INTERESSE_WEIGHTS = {
+    "apartamento": 30, "casa": 20, "financiamento": 12, "investimento": 10, "terreno": 8,
+    "aluguel": 8, "comercial": 5, "cobertura": 4, "consórcio": 3
+}
+
+INTERESSE_TEMPLATES = [
+    "{} na zona sul", "Quero saber mais sobre {}", "{} com 3 quartos", "Informações sobre {}",
+    "{} perto do metrô", "Procuro {} para a família", "{} em condomínio fechado"
+]
+
+EMAIL_DOMAINS = {
+    "gmail.com": 50, "hotmail.com": 18, "outlook.com": 10, "yahoo.com.br": 8,
+    "uol.com.br": 6, "bol.com.br": 4, "empresa.com.br": 4
+}
+
+# Tamanho dos conjuntos de nomes gerados pelo Faker
+NAME_POOL_SIZE = 2000
+
+# Leads por bloco (unidade de geração, de paralelismo e de transação na carga)
+GENERATION_CHUNK = 10000
+
+COPY_COLUMNS = [
+    "nome", "email", "telefone", "origem", "interesse", "renda_aproximada", "cidade",
+    "score", "status", "processado", "email_normalizado", "telefone_normalizado",
+    "nome_chave", "cidade_normalizada", "created_at", "updated_at"
+]
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """Converte "Meta Ads=40,Site=10" em {"Meta Ads": 40.0, "Site": 10.0}"""
+    weights = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, separator, weight = item.rpartition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"Peso inválido: {item!r} (use nome=peso)")
+        weights[name.strip()] = float(weight)
+    if not weights or any(weight < 0 for weight in weights.values()) or not sum(weights.values()):
+        raise ValueError(f"Distribuição inválida: {value!r}")
+    return weights
+
+
+class _Choice:
+    """Sorteio ponderado em lote (random.choices com pesos acumulados)"""
+
+    def __init__(self, weights: Dict):
+        self.values = list(weights)
+        total = 0.0
+        self.cum_weights = []
+        for weight in weights.values():
+            total += weight
+            self.cum_weights.append(total)
+
+    def sample(self, rng: random.Random, k: int) -> list:
+        return rng.choices(self.values, cum_weights=self.cum_weights, k=k)
+
+
+class SyntheticLeadGenerator:
+    """Gera leads realistas e reprodutíveis a partir de uma semente"""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        days: int = 365,
+        origem_weights: Optional[Dict[str, float]] = None,
+        cidade_weights: Optional[Dict[str, float]] = None,
+        interesse_weights: Optional[Dict[str, float]] = None,
+        renda_mediana: float = 6000.0,
+        renda_dispersao: float = 0.7,
+        processed_ratio: float = 0.9,
+        end: Optional[datetime] = None
+    ):
+        end = end or datetime.now(timezone.utc).replace(microsecond=0)
+        # Parâmetros para recriar o mesmo gerador nos processos de trabalho
+        self.options = {
+            "seed": seed, "days": days, "origem_weights": origem_weights,
+            "cidade_weights": cidade_weights, "interesse_weights": interesse_weights,
+            "renda_mediana": renda_mediana, "renda_dispersao": renda_dispersao,
+            "processed_ratio": processed_ratio, "end": end
+        }
+
+        origens = {origem.value: origem for origem in LeadOrigin}
+        origem_weights = origem_weights or DEFAULT_ORIGEM_WEIGHTS
+        invalid = [name for name in origem_weights if name not in origens]
+        if invalid:
+            raise ValueError(f"Origens inválidas: {', '.join(invalid)}. Disponíveis: {', '.join(origens)}")
+
+        self.seed = seed
+        self.days = days
+        self.end = end
+        self.renda_mu = math.log(renda_mediana)
+        self.renda_sigma = renda_dispersao
+        self.processed_ratio = processed_ratio
+
+        self._origens = _Choice({origens[name]: weight for name, weight in origem_weights.items()})
+        self._cidades = _Choice(
+            cidade_weights or {cidade: peso for cidade, (peso, _) in DEFAULT_CIDADES.items()}
+        )
+        self._ddds = {cidade: ddd for cidade, (_, ddd) in DEFAULT_CIDADES.items()}
+        self._interesses = _Choice(interesse_weights or DEFAULT_INTERESSE_WEIGHTS)
+        self._domains = _Choice(EMAIL_DOMAINS)
+        self._first_names, self._last_names = self._name_pools(seed)
+
+        scoring = LeadScoringService()
+        self._score = self._cached_scorer(scoring)
+        self._classify = scoring.classify_lead
+
+    @staticmethod
+    def _name_pools(seed: int):
+        try:
+            from faker import Faker
+        except ImportError as e:
+            raise RuntimeError("O gerador de dados sintéticos requer o pacote faker") from e
+
+        faker = Faker("pt_BR")
+        faker.seed_instance(seed)
+        first_names = sorted({faker.first_name() for _ in range(NAME_POOL_SIZE)})
+        last_names = sorted({faker.last_name() for _ in range(NAME_POOL_SIZE)})
+
+        # (nome, usuário de email, token da chave de deduplicação) calculados uma vez:
+        # a chave de "Maria Alice Souza" é o primeiro token do nome + o último do sobrenome
+        def parts(name: str, token: int) -> tuple:
+            usuario = strip_accents(name).lower().replace(" ", "")
+            return name, usuario, name_key(name).split()[token]
+
+        return [parts(name, 0) for name in first_names], [parts(name, -1) for name in last_names]
+
+    @staticmethod
+    def _cached_scorer(scoring: LeadScoringService):
+        """
+        Score igual ao do LeadScoringService, memorizado por componente.
+
+        As regras são aditivas: (interesse, cidade) dão a parte fixa e a renda o
+        bônus, então cada combinação é calculada pelo serviço uma única vez.
+        """
+        def probe(**fields):
+            # Sem os logs por regra do serviço: seriam milhares de linhas na carga
+            logger.disable("app.services.scoring")
+            try:
+                return scoring.calculate_score(Lead(**fields))
+            finally:
+                logger.enable("app.services.scoring")
+
+        @lru_cache(maxsize=None)
+        def base(interesse: Optional[str], cidade: Optional[str]) -> int:
+            return probe(
+                nome="x", email="x", telefone="x", origem=LeadOrigin.OUTROS,
+                interesse=interesse, cidade=cidade
+            )
+
+        @lru_cache(maxsize=None)
+        def bonus(renda: Optional[float]) -> int:
+            return probe(renda_aproximada=renda) if renda else 0
+
+        return lambda interesse, cidade, renda: base(interesse, cidade) + bonus(renda)
+
+    def generate(self, count: int) -> Iterator[List[dict]]:
+        """Gera `count` leads em blocos de GENERATION_CHUNK, com created_at crescente"""
+        for number in range(math.ceil(count / GENERATION_CHUNK)):
+            yield self.chunk(number, count)
+
+    def chunk(self, number: int, count: int) -> List[dict]:
+        """
+        Leads do bloco `number` de um conjunto de `count` leads.
+
+        Cada bloco tem sua própria semente derivada, então os blocos podem ser
+        gerados em qualquer ordem ou em paralelo com o mesmo resultado.
+        """
+        rng = random.Random(f"{self.seed}:{number}")
+        start = self.end - timedelta(days=self.days)
+        step = (self.end - start).total_seconds() / max(count, 1)
+        offset = number * GENERATION_CHUNK
+        size = min(GENERATION_CHUNK, count - offset)
+
+        origens = self._origens.sample(rng, size)
+        cidades = self._cidades.sample(rng, size)
+        interesses = self._interesses.sample(rng, size)
+        domains = self._domains.sample(rng, size)
+        firsts = rng.choices(self._first_names, k=size)
+        lasts = rng.choices(self._last_names, k=size)
+        ddds = self._ddds
+
+        rows = []
+        for i in range(size):
+            index = offset + i
+            first, first_user, first_key = firsts[i]
+            last, last_user, last_key = lasts[i]
+            email = f"{first_user}.{last_user}{index}@{domains[i]}"
+
+            cidade = cidades[i] if rng.random() > 0.05 else None
+            telefone = f"{ddds.get(cidade, 11)}9{int(rng.random() * 1e8):08d}"
+            renda = (
+                round(rng.lognormvariate(self.renda_mu, self.renda_sigma), -2)
+                if rng.random() > 0.1 else None
+            )
+            interesse = (
+                rng.choice(INTERESSE_TEMPLATES).format(interesses[i]).capitalize()
+                if rng.random() > 0.15 else None
+            )
+            created_at = start + timedelta(seconds=(index + rng.random()) * step)
+
+            if rng.random() < self.processed_ratio:
+                score = self._score(interesse, cidade, renda)
+                status, processado = self._classify(score), "Y"
+            else:
+                score, status, processado = 0, LeadStatus.PROCESSANDO, "N"
+
+            rows.append({
+                "nome": f"{first} {last}",
+                "email": email,
+                "telefone": telefone,
+                "origem": origens[i],
+                "interesse": interesse,
+                "renda_aproximada": renda,
+                "cidade": cidade,
+                "score": score,
+                "status": status,
+                "processado": processado,
+                "email_normalizado": normalize_email(email),
+                "telefone_normalizado": telefone,
+                "nome_chave": f"{first_key} {last_key}",
+                "cidade_normalizada": _normalize_city(cidade),
+                "created_at": created_at,
+                "updated_at": created_at if processado == "Y" else None
+            })
+        return rows
+
+
+@lru_cache(maxsize=None)
+def _normalize_city(cidade: Optional[str]) -> Optional[str]:
+    return normalize_city(cidade)
+
+
+class SyntheticLeadLoader:
+    """
+    Grava os blocos gerados: COPY no PostgreSQL, INSERT em lote nos demais.
+
+    Com `workers` > 1, os blocos são gerados (e serializados para o COPY) em
+    processos separados enquanto o processo principal grava no banco. Com
+    `rebuild_indexes`, os índices secundários de leads são removidos antes da
+    carga e recriados no fim (construção ordenada, bem mais rápida que a
+    manutenção linha a linha); não use com a API recebendo tráfego.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        method: str = "auto",
+        workers: int = 1,
+        rebuild_indexes: bool = False
+    ):
+        self.engine = engine
+        if method == "auto":
+            method = "copy" if engine.dialect.name == "postgresql" else "insert"
+        if method == "copy" and engine.dialect.name != "postgresql":
+            raise ValueError("COPY só está disponível no PostgreSQL")
+        self.method = method
+        self.workers = max(workers, 1)
+        self.rebuild_indexes = rebuild_indexes
+
+    def load(self, generator: SyntheticLeadGenerator, count: int) -> dict:
+        """Gera e grava `count` leads, um bloco por transação, e informa a vazão"""
+        started = time.perf_counter()
+        write = self._copy if self.method == "copy" else self._insert
+        indexes = list(Lead.__table__.indexes) if self.rebuild_indexes else []
+        numbers = range(math.ceil(count / GENERATION_CHUNK))
+
+        # O pool é criado antes de qualquer conexão com o banco neste processo
+        pool = (
+            ProcessPoolExecutor(
+                self.workers, initializer=_init_worker, initargs=(generator.options, self.method)
+            )
+            if self.workers > 1 else None
+        )
+        try:
+            with self.engine.begin() as conn:
+                for index in indexes:
+                    index.drop(conn, checkfirst=True)
+
+            if pool:
+                payloads = bounded_map(pool, partial(_worker_chunk, count=count), numbers, self.workers * 2)
+            else:
+                payloads = (_prepare(generator.chunk(number, count), self.method) for number in numbers)
+
+            inserted = 0
+            for payload, rows in payloads:
+                write(payload)
+                inserted += rows
+                elapsed = time.perf_counter() - started
+                logger.info(f"Leads sintéticos: {inserted}/{count} ({inserted / elapsed:,.0f} linhas/s)")
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+            if indexes:
+                logger.info(f"Recriando {len(indexes)} índices de leads...")
+                with self.engine.begin() as conn:
+                    for index in indexes:
+                        index.create(conn, checkfirst=True)
+
+        if self.engine.dialect.name == "postgresql":
+            # Estatísticas atualizadas para o planner depois de uma carga grande
+            with self.engine.begin() as conn:
+                conn.execute(text("ANALYZE leads"))
+
+        elapsed = time.perf_counter() - started
+        return {
+            "leads_inseridos": inserted,
+            "metodo": self.method,
+            "processos": self.workers,
+            "indices_recriados": len(indexes),
+            "segundos": round(elapsed, 2),
+            "linhas_por_segundo": round(inserted / elapsed) if elapsed else inserted
+        }
+
+    def _insert(self, rows: List[dict]):
+        with self.engine.begin() as conn:
+            conn.execute(insert(Lead.__table__), rows)
+
+    def _copy(self, data: str):
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY leads ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                    io.StringIO(data)
+                )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+
+_copy_fields = itemgetter(*COPY_COLUMNS)
+_ORIGEM_POSITION = COPY_COLUMNS.index("origem")
+_STATUS_POSITION = COPY_COLUMNS.index("status")
+
+
+def _to_csv(rows: List[dict]) -> str:
+    """CSV do COPY: enums pelo nome (como o SQLAlchemy grava) e None como NULL"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = list(_copy_fields(row))
+        values[_ORIGEM_POSITION] = values[_ORIGEM_POSITION].name
+        values[_STATUS_POSITION] = values[_STATUS_POSITION].name
+        writer.writerow(values)
+    return buffer.getvalue()
+
+
+def _prepare(rows: List[dict], method: str) -> Tuple[object, int]:
+    return (_to_csv(rows) if method == "copy" else rows), len(rows)
+
+
+# Estado de cada processo de trabalho (o gerador é recriado a partir das opções)
+_worker_state = {}
+
+
+def _init_worker(options: dict, method: str):
+    _worker_state["generator"] = SyntheticLeadGenerator(**options)
+    _worker_state["method"] = method
+
+
+def _worker_chunk(number: int, count: int) -> Tuple[object, int]:
+    return _prepare(_worker_state["generator"].chunk(number, count), _worker_state["method"])
@@ -0,0 +1,141 @@
+"""
+Séries temporais de leads: buckets com granularidade configurável,
+preenchimento de lacunas e redução de pontos por LTTB.
+
+A contagem por bucket é feita no banco (LeadRepository.get_timeseries); aqui
+as lacunas viram zero e, quando pedido, cada série é reduzida com o
+Largest-Triangle-Three-Buckets, que preserva picos e vales do gráfico.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import enum
+
+
+class Granularity(str, enum.Enum):
+    """Tamanho dos buckets da série"""
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class Breakdown(str, enum.Enum):
+    """Coluna usada para separar a série"""
+    ORIGEM = "origem"
+    STATUS = "status"
+
+
+# Nome da série quando não há breakdown
+TOTAL_SERIES = "total"
+
+
+def truncate(value: datetime, granularity: Granularity) -> datetime:
+    """Início do bucket que contém `value` (semanas começam na segunda)"""
+    value = value.replace(minute=0, second=0, microsecond=0)
+    if granularity == Granularity.HOUR:
+        return value
+    value = value.replace(hour=0)
+    if granularity == Granularity.WEEK:
+        return value - timedelta(days=value.weekday())
+    if granularity == Granularity.MONTH:
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(value: datetime, granularity: Granularity) -> datetime:
+    if granularity == Granularity.HOUR:
+        return value + timedelta(hours=1)
+    if granularity == Granularity.DAY:
+        return value + timedelta(days=1)
+    if granularity == Granularity.WEEK:
+        return value + timedelta(weeks=1)
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def bucket_range(start: datetime, end: datetime, granularity: Granularity) -> List[datetime]:
+    """Inícios de todos os buckets em [start, end)"""
+    buckets = []
+    current = truncate(start, granularity)
+    while current < end:
+        buckets.append(current)
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+def lttb(values: Sequence[float], threshold: int) -> List[int]:
+    """
+    Índices escolhidos pelo Largest-Triangle-Three-Buckets (x = posição).
+
+    Mantém o primeiro e o último ponto e, em cada faixa, o ponto que forma o
+    maior triângulo com o ponto anterior escolhido e a média da faixa seguinte.
+    """
+    total = len(values)
+    if threshold >= total or threshold < 3:
+        return list(range(total))
+
+    every = (total - 2) / (threshold - 2)
+    selected = [0]
+    anchor = 0
+
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, total)
+        avg_x = (avg_start + avg_end - 1) / 2
+        avg_y = sum(values[avg_start:avg_end]) / (avg_end - avg_start)
+
+        anchor_y = values[anchor]
+        best, best_area = None, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((anchor - avg_x) * (values[j] - anchor_y) - (anchor - j) * (avg_y - anchor_y))
+            if area > best_area:
+                best, best_area = j, area
+
+        selected.append(best)
+        anchor = best
+
+    selected.append(total - 1)
+    return selected
+
+
+class TimeSeriesBuilder:
+    """Monta as séries completas (com zeros) a partir das contagens do banco"""
+
+    def __init__(self, granularity: Granularity, start: datetime, end: datetime):
+        self.granularity = granularity
+        self.start = start
+        self.end = end
+        self.buckets = bucket_range(start, end, granularity)
+
+    def build(
+        self,
+        rows: List[Tuple[datetime, Optional[str], int]],
+        max_points: Optional[int] = None
+    ) -> List[dict]:
+        """Uma série por grupo, ordenadas pelo total; reduzidas a `max_points`"""
+        positions = {bucket: index for index, bucket in enumerate(self.buckets)}
+        counts: Dict[str, List[int]] = {}
+        for bucket, group, count in rows:
+            name = group or TOTAL_SERIES
+            if name not in counts:
+                counts[name] = [0] * len(self.buckets)
+            index = positions.get(bucket)
+            if index is not None:
+                counts[name][index] += count
+
+        if not counts:
+            counts[TOTAL_SERIES] = [0] * len(self.buckets)
+
+        result = []
+        for name, values in counts.items():
+            indexes = lttb(values, max_points) if max_points else range(len(values))
+            result.append({
+                "nome": name,
+                "total": sum(values),
+                "pontos": [{"t": self.buckets[i], "count": values[i]} for i in indexes]
+            })
+
+        result.sort(key=lambda series: series["total"], reverse=True)
+        return result
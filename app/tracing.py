@@ -0,0 +1,310 @@
+"""
+Rastreamento (tracing) leve da jornada de um lead: requisição HTTP, consultas
+SQL, processamento em background, scoring e integrações externas.
+
+Os spans seguem o modelo do W3C Trace Context (trace_id/span_id, header
+`traceparent`) e são exportados em memória e/ou em um arquivo JSONL, sem
+depender de um coletor externo.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+import random
+import re
+import secrets
+import threading
+import time
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+TRACEPARENT_HEADER = "traceparent"
+TRACE_ID_HEADER = "X-Trace-Id"
+
+_TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class SpanContext:
+    """Identificação de um span, suficiente para criar filhos em outra thread/processo"""
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @classmethod
+    def from_traceparent(cls, value: Optional[str]) -> Optional["SpanContext"]:
+        """Lê um header traceparent; valores inválidos são ignorados"""
+        match = _TRACEPARENT_PATTERN.match((value or "").strip().lower())
+        if not match:
+            return None
+        return cls(match.group(1), match.group(2), sampled=match.group(3) == "01")
+
+
+class Span:
+    """Uma etapa com início, duração e atributos"""
+
+    def __init__(self, name: str, parent: Optional[SpanContext], attributes: dict):
+        if parent:
+            trace_id, sampled = parent.trace_id, parent.sampled
+        else:
+            trace_id = secrets.token_hex(16)
+            sampled = random.random() < settings.tracing_sample_rate
+
+        self.context = SpanContext(trace_id, secrets.token_hex(8), sampled)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.duration_ms is None:
+            self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+            if self.context.sampled:
+                for exporter in _exporters:
+                    exporter.export(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+
+class InMemoryExporter:
+    """Guarda os spans mais recentes em memória para consulta pela API"""
+
+    def __init__(self, max_spans: int):
+        self._spans: deque = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self._spans.append(span.to_dict())
+
+    def get_trace(self, trace_id: str) -> List[dict]:
+        with self._lock:
+            spans = [span for span in self._spans if span["trace_id"] == trace_id]
+        return sorted(spans, key=lambda span: span["start_time"])
+
+    def find_traces(self, lead_id: Optional[int] = None, limit: int = 20) -> List[dict]:
+        """Resumo dos traces mais recentes (opcionalmente de um lead)"""
+        with self._lock:
+            spans = list(self._spans)
+
+        span_ids = {span["span_id"] for span in spans}
+        traces: Dict[str, dict] = {}
+        for span in spans:
+            trace = traces.setdefault(span["trace_id"], {
+                "trace_id": span["trace_id"], "spans": 0, "lead_ids": set(),
+                "start_time": span["start_time"], "root": None, "duration_ms": None
+            })
+            trace["spans"] += 1
+            trace["start_time"] = min(trace["start_time"], span["start_time"])
+            if "lead.id" in span["attributes"]:
+                trace["lead_ids"].add(span["attributes"]["lead.id"])
+            # Raiz local: sem pai ou com pai remoto (traceparent recebido)
+            if span["parent_id"] not in span_ids and trace["root"] is None:
+                trace["root"] = span["name"]
+                trace["duration_ms"] = span["duration_ms"]
+
+        result = [
+            {**trace, "lead_ids": sorted(trace["lead_ids"])}
+            for trace in traces.values()
+            if lead_id is None or lead_id in trace["lead_ids"]
+        ]
+        result.sort(key=lambda trace: trace["start_time"], reverse=True)
+        return result[:limit]
+
+
+class JsonlFileExporter:
+    """Grava um span por linha (JSON) em arquivo"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = orjson.dumps(span.to_dict(), default=str) + b"\n"
+        with self._lock:
+            with open(self.path, "ab") as file:
+                file.write(line)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_exporters: list = []
+memory_exporter: Optional[InMemoryExporter] = None
+
+
+def configure(exporters: str):
+    """Configura os exportadores ("memory", "file" ou "memory,file")"""
+    global memory_exporter
+
+    _exporters.clear()
+    memory_exporter = None
+    names = {name.strip() for name in exporters.split(",") if name.strip()}
+
+    if "memory" in names:
+        memory_exporter = InMemoryExporter(settings.tracing_memory_max_spans)
+        _exporters.append(memory_exporter)
+    if "file" in names:
+        _exporters.append(JsonlFileExporter(settings.tracing_file_path))
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_context() -> Optional[SpanContext]:
+    """Contexto do span atual, para ser levado a outra thread (background)"""
+    span = _current_span.get()
+    return span.context if span else None
+
+
+@contextmanager
+def start_span(name: str, parent: Optional[SpanContext] = None, **attributes):
+    """
+    Abre um span filho do span atual (ou de `parent`) e o torna o span atual.
+
+    Sem tracing habilitado não faz nada e retorna None.
+    """
+    if not settings.tracing_enabled:
+        yield None
+        return
+
+    span = Span(name, parent or current_context(), attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def set_attribute(key: str, value):
+    """Adiciona um atributo ao span atual, se houver"""
+    span = _current_span.get()
+    if span:
+        span.set_attribute(key, value)
+
+
+def inject_headers(headers: Optional[dict] = None) -> dict:
+    """Adiciona o header traceparent às chamadas de saída"""
+    headers = dict(headers or {})
+    context = current_context()
+    if context:
+        headers[TRACEPARENT_HEADER] = context.to_traceparent()
+    return headers
+
+
+def instrument_engine(engine: Engine):
+    """Cria um span por comando SQL executado dentro de um trace"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = current_context()
+        if parent is None or not parent.sampled:
+            return
+        span = Span("db.query", parent, {
+            "db.system": engine.dialect.name,
+            "db.statement": statement[:300]
+        })
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("trace_spans") if conn is not None else None
+        if spans:
+            span = spans.pop()
+            span.record_error(exception_context.original_exception)
+            span.end()
+
+
+class TracingMiddleware:
+    """Middleware ASGI que abre o span raiz de cada requisição HTTP"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.tracing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        parent = SpanContext.from_traceparent(
+            headers.get(TRACEPARENT_HEADER.encode(), b"").decode("latin-1")
+        )
+
+        with start_span(f"HTTP {scope['method']}", parent=parent, **{
+            "http.method": scope["method"],
+            "http.target": scope["path"]
+        }) as span:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    # Permite ao cliente localizar o trace da sua requisição
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (TRACE_ID_HEADER.lower().encode(), span.context.trace_id.encode())
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route:
+                    span.name = f"HTTP {scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
+
+
+def trace_summary(trace_id: str) -> Tuple[List[dict], Dict[str, float]]:
+    """Spans de um trace e o tempo total por nome de etapa"""
+    spans = memory_exporter.get_trace(trace_id) if memory_exporter else []
+    stages: Dict[str, float] = {}
+    for span in spans:
+        stages[span["name"]] = round(stages.get(span["name"], 0.0) + (span["duration_ms"] or 0.0), 3)
+    return spans, stages
+
+
+configure(settings.tracing_exporters)
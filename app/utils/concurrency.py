@@ -0,0 +1,14 @@
+from collections import deque
+from concurrent.futures import Executor
+from typing import Iterable, Iterator
+
+
+def bounded_map(pool: Executor, function, items: Iterable, window: int) -> Iterator:
+    """Como pool.map, em ordem, mas com no máximo `window` tarefas pendentes em memória"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(function, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
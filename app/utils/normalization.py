@@ -0,0 +1,79 @@
+import re
+import unicodedata
+from typing import Optional
+
+# Provedores em que pontos e sufixos "+tag" no usuário não diferenciam caixas
+GMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+PLUS_ADDRESSING_DOMAINS = GMAIL_DOMAINS | {"outlook.com", "hotmail.com", "live.com"}
+
+# Partículas ignoradas na chave de nome ("Maria da Silva" == "Maria Silva")
+NAME_PARTICLES = {"da", "de", "do", "das", "dos", "e"}
+
+
+def strip_accents(value: str) -> str:
+    """Remove acentos (São Paulo -> Sao Paulo)"""
+    normalized = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in normalized if not unicodedata.combining(char))
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """Normaliza email para deduplicação (caixa, variantes do Gmail, plus addressing)"""
+    if not email:
+        return None
+
+    email = email.strip().lower()
+    if "@" not in email:
+        return email
+
+    local, domain = email.rsplit("@", 1)
+    if domain in PLUS_ADDRESSING_DOMAINS:
+        local = local.split("+", 1)[0]
+    if domain in GMAIL_DOMAINS:
+        local = local.replace(".", "")
+        domain = "gmail.com"
+
+    return f"{local}@{domain}"
+
+
+def normalize_phone(telefone: Optional[str]) -> Optional[str]:
+    """Normaliza telefone para DDD + número (remove DDI 55 e zero de tronco)"""
+    if not telefone:
+        return None
+
+    digits = re.sub(r"\D", "", telefone)
+    # Prefixo internacional (00) antes do DDI: "0055 11 ..." -> "55 11 ..."
+    if len(digits) > 11 and digits.startswith("0"):
+        digits = digits.lstrip("0")
+    if len(digits) > 11 and digits.startswith("55"):
+        digits = digits[2:]
+    if len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+
+    return digits or None
+
+
+def name_key(nome: Optional[str]) -> Optional[str]:
+    """Chave de bloqueio do nome: primeiro e último nome, sem acentos e partículas"""
+    if not nome:
+        return None
+
+    tokens = [
+        token for token in re.split(r"[^a-z0-9]+", strip_accents(nome).lower())
+        if token and token not in NAME_PARTICLES
+    ]
+    if not tokens:
+        return None
+
+    key = tokens[0] if len(tokens) == 1 else f"{tokens[0]} {tokens[-1]}"
+    return key[:100]
+
+
+def normalize_city(cidade: Optional[str]) -> Optional[str]:
+    """Normaliza cidade ("São Paulo - SP" -> "sao paulo")"""
+    if not cidade:
+        return None
+
+    # Hífen só separa UF quando cercado de espaços ("Embu-Guaçu" é nome de cidade)
+    city = re.split(r"\s+-\s+|/|,", cidade, maxsplit=1)[0]
+    city = re.sub(r"\s+", " ", strip_accents(city).lower()).strip()
+    return city[:100] or None
@@ -3,7 +3,9 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
+import pyarrow as pa
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, List
 import json
 
@@ -18,68 +20,117 @@ st.set_page_config(
 # URL da API
 API_BASE_URL = "http://localhost:8000/api/v1"
 
+# Colunas exibidas na listagem de leads
+LEADS_TABLE_COLUMNS = ["id", "nome", "email", "telefone", "origem", "status", "score", "created_at"]
+
+
+# Tempo de cache (s) das respostas por endpoint; limpo após alterações
+CACHE_TTL_LEADS = 15
+CACHE_TTL_LEAD = 30
+CACHE_TTL_STATS = 60
+
+REQUEST_TIMEOUT = 10
+
+# A listagem vem em Arrow IPC: colunas tipadas lidas direto dos buffers
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PAGE_SIZES = [10, 20, 50, 100, 1000, 10000, 100000]
+
+# Série temporal do overview: reduzida no servidor (LTTB) a no máximo N pontos por série
+TIMELINE_MAX_POINTS = 500
+TIMELINE_PERIODS = {"7 dias": 7, "30 dias": 30, "90 dias": 90, "1 ano": 365, "2 anos": 730, "5 anos": 1825}
+TIMELINE_GRANULARITIES = {"Hora": "hour", "Dia": "day", "Semana": "week", "Mês": "month"}
+TIMELINE_BREAKDOWNS = {"Nenhum": None, "Origem": "origem", "Status": "status"}
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Sessão HTTP compartilhada entre reruns e usuários (reaproveita conexões)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _get_json(path: str, params: Dict = None) -> Dict:
+    response = get_http_session().get(f"{API_BASE_URL}{path}", params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def _get_arrow(path: str, params: Dict = None) -> pa.Table:
+    response = get_http_session().get(
+        f"{API_BASE_URL}{path}", params=params, timeout=REQUEST_TIMEOUT,
+        headers={"Accept": ARROW_STREAM_MEDIA_TYPE}
+    )
+    response.raise_for_status()
+    return pa.ipc.open_stream(response.content).read_all()
+
+
+# Erros não são cacheados: a exceção chega ao cliente, que mostra a mensagem
+@st.cache_data(ttl=CACHE_TTL_LEADS, show_spinner=False)
+def _fetch_leads(params: Dict) -> Dict:
+    table = _get_arrow("/leads/", params)
+    pagination = {key.decode(): int(value) for key, value in (table.schema.metadata or {}).items()}
+    return {**pagination, "leads": table.to_pandas(split_blocks=True, self_destruct=True)}
+
+
+@st.cache_data(ttl=CACHE_TTL_LEAD, show_spinner=False)
+def _fetch_lead(lead_id: int) -> Dict:
+    return _get_json(f"/leads/{lead_id}", {"include_archived": "true"})
+
+
+@st.cache_data(ttl=CACHE_TTL_STATS, show_spinner=False)
+def _fetch_dashboard_stats(params: Dict) -> Dict:
+    return _get_json("/leads/stats/dashboard", params)
+
+
+CACHED_FETCHES = [_fetch_leads, _fetch_lead, _fetch_dashboard_stats]
+
+
+def clear_api_cache():
+    """Descarta as respostas em cache (após alterar leads)"""
+    for fetch in CACHED_FETCHES:
+        fetch.clear()
+
 
 class StreamLeadsAPI:
     """Cliente para comunicação com a API"""
     
     def __init__(self, base_url: str):
         self.base_url = base_url
+        self.session = get_http_session()
     
     def get_leads(self, **params) -> Dict:
         """Busca leads com filtros"""
         try:
-            response = requests.get(f"{self.base_url}/leads", params=params)
-            response.raise_for_status()
-            return response.json()
+            return _fetch_leads(params)
         except requests.exceptions.RequestException as e:
             st.error(f"Erro ao buscar leads: {str(e)}")
-            return {"leads": [], "total": 0}
+            return {"leads": pd.DataFrame(), "total": 0}
     
     def get_lead(self, lead_id: int) -> Dict:
         """Busca um lead específico"""
         try:
-            response = requests.get(f"{self.base_url}/leads/{lead_id}")
-            response.raise_for_status()
-            return response.json()
+            return _fetch_lead(lead_id)
         except requests.exceptions.RequestException as e:
             st.error(f"Erro ao buscar lead: {str(e)}")
             return {}
     
-    def get_stats(self) -> Dict:
-        """Busca estatísticas gerais"""
+    def get_dashboard_stats(self, **params) -> Dict:
+        """Busca resumo, leads por origem e a série temporal em uma única chamada"""
         try:
-            response = requests.get(f"{self.base_url}/leads/stats/overview")
-            response.raise_for_status()
-            return response.json()
+            return _fetch_dashboard_stats(params)
         except requests.exceptions.RequestException as e:
             st.error(f"Erro ao buscar estatísticas: {str(e)}")
             return {}
     
-    def get_leads_by_origem(self) -> Dict:
-        """Busca leads por origem"""
-        try:
-            response = requests.get(f"{self.base_url}/leads/stats/origem")
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"Erro ao buscar leads por origem: {str(e)}")
-            return {"leads_por_origem": {}}
-    
-    def get_leads_by_period(self, days: int = 30) -> Dict:
-        """Busca leads por período"""
-        try:
-            response = requests.get(f"{self.base_url}/leads/stats/periodo", params={"days": days})
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"Erro ao buscar leads por período: {str(e)}")
-            return {"leads_por_periodo": []}
-    
     def update_lead(self, lead_id: int, data: Dict) -> Dict:
         """Atualiza um lead"""
         try:
-            response = requests.put(f"{self.base_url}/leads/{lead_id}", json=data)
+            response = self.session.put(f"{self.base_url}/leads/{lead_id}", json=data, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
+            clear_api_cache()
             return response.json()
         except requests.exceptions.RequestException as e:
             st.error(f"Erro ao atualizar lead: {str(e)}")
@@ -88,8 +139,9 @@ class StreamLeadsAPI:
     def reprocess_lead(self, lead_id: int) -> Dict:
         """Reprocessa um lead"""
         try:
-            response = requests.post(f"{self.base_url}/leads/{lead_id}/reprocess")
+            response = self.session.post(f"{self.base_url}/leads/{lead_id}/reprocess", timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
+            clear_api_cache()
             return response.json()
         except requests.exceptions.RequestException as e:
             st.error(f"Erro ao reprocessar lead: {str(e)}")
@@ -112,6 +164,9 @@ def main():
         ["📈 Overview", "📋 Leads", "🔍 Detalhes do Lead", "⚙️ Configurações"]
     )
     
+    if st.sidebar.button("🔄 Atualizar dados"):
+        clear_api_cache()
+    
     if page == "📈 Overview":
         show_overview()
     elif page == "📋 Leads":
@@ -126,10 +181,36 @@ def show_overview():
     """Página de overview com estatísticas"""
     st.header("📈 Visão Geral")
     
-    # Buscar estatísticas
-    stats = api.get_stats()
+    # O resumo fica acima dos seletores da linha do tempo, que são lidos antes da chamada
+    summary = st.container()
     
-    if stats:
+    st.subheader("📅 Leads ao Longo do Tempo")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        period = st.selectbox("Período", list(TIMELINE_PERIODS), index=1)
+    with col2:
+        granularity = st.selectbox("Agrupar por", list(TIMELINE_GRANULARITIES), index=1)
+    with col3:
+        breakdown = st.selectbox("Separar por", list(TIMELINE_BREAKDOWNS))
+    
+    days = TIMELINE_PERIODS[period]
+    params = {
+        "granularity": TIMELINE_GRANULARITIES[granularity],
+        "data_inicio": (date.today() - timedelta(days=days - 1)).isoformat(),
+        "max_points": TIMELINE_MAX_POINTS
+    }
+    if TIMELINE_BREAKDOWNS[breakdown]:
+        params["breakdown"] = TIMELINE_BREAKDOWNS[breakdown]
+    
+    # Resumo, leads por origem e série temporal em uma chamada
+    dashboard = api.get_dashboard_stats(**params)
+    stats = dashboard.get("resumo")
+    
+    if not stats:
+        return
+    
+    with summary:
         # Métricas principais
         col1, col2, col3, col4 = st.columns(4)
         
@@ -190,10 +271,9 @@ def show_overview():
         
         with col2:
             # Gráfico de barras - Leads por origem
-            origem_data = api.get_leads_by_origem()
-            if origem_data.get("leads_por_origem"):
-                origens = list(origem_data["leads_por_origem"].keys())
-                valores = list(origem_data["leads_por_origem"].values())
+            if dashboard.get("leads_por_origem"):
+                origens = list(dashboard["leads_por_origem"].keys())
+                valores = list(dashboard["leads_por_origem"].values())
                 
                 fig_origem = px.bar(
                     x=origens,
@@ -202,25 +282,25 @@ def show_overview():
                     labels={"x": "Origem", "y": "Quantidade"}
                 )
                 st.plotly_chart(fig_origem, use_container_width=True)
-        
-        # Gráfico de linha - Leads ao longo do tempo
-        st.subheader("📅 Leads ao Longo do Tempo")
-        
-        period_days = st.selectbox("Período", [7, 15, 30, 60], index=2)
-        period_data = api.get_leads_by_period(period_days)
-        
-        if period_data.get("leads_por_periodo"):
-            df_period = pd.DataFrame(period_data["leads_por_periodo"])
-            df_period['data'] = pd.to_datetime(df_period['data'])
-            
-            fig_timeline = px.line(
-                df_period,
-                x='data',
-                y='count',
-                title=f"Leads nos Últimos {period_days} Dias",
-                labels={"data": "Data", "count": "Quantidade de Leads"}
-            )
-            st.plotly_chart(fig_timeline, use_container_width=True)
+    
+    # Gráfico de linha - Leads ao longo do tempo
+    series = (dashboard.get("serie_temporal") or {}).get("series", [])
+    df_period = pd.DataFrame(
+        [(point["t"], item["nome"], point["count"]) for item in series for point in item["pontos"]],
+        columns=["t", "serie", "count"]
+    )
+    df_period["t"] = pd.to_datetime(df_period["t"])
+    
+    if not df_period.empty:
+        fig_timeline = px.line(
+            df_period,
+            x="t",
+            y="count",
+            color="serie" if TIMELINE_BREAKDOWNS[breakdown] else None,
+            title=f"Leads nos Últimos {period}",
+            labels={"t": "Data", "count": "Quantidade de Leads", "serie": breakdown}
+        )
+        st.plotly_chart(fig_timeline, use_container_width=True)
 
 
 def show_leads_list():
@@ -259,12 +339,13 @@ def show_leads_list():
     with col1:
         page = st.number_input("Página", min_value=1, value=1)
     with col2:
-        per_page = st.selectbox("Itens por página", [10, 20, 50, 100], index=1)
+        per_page = st.selectbox("Itens por página", PAGE_SIZES, index=1)
     
-    # Preparar parâmetros
+    # Preparar parâmetros (apenas as colunas exibidas na tabela)
     params = {
         "page": page,
-        "per_page": per_page
+        "per_page": per_page,
+        "fields": ",".join(LEADS_TABLE_COLUMNS)
     }
     
     if status_filter != "Todos":
@@ -285,18 +366,14 @@ def show_leads_list():
     # Buscar leads
     leads_data = api.get_leads(**params)
     
-    if leads_data.get("leads"):
+    df = leads_data["leads"]
+    
+    if not df.empty:
         st.subheader(f"📊 Resultados ({leads_data.get('total', 0)} leads encontrados)")
         
-        # Converter para DataFrame
-        df = pd.DataFrame(leads_data["leads"])
-        
-        # Formatação das colunas
-        df['created_at'] = pd.to_datetime(df['created_at']).dt.strftime('%d/%m/%Y %H:%M')
-        
-        # Exibir tabela
+        # Colunas já tipadas (datas, categorias); a formatação fica na exibição
         st.dataframe(
-            df[['id', 'nome', 'email', 'telefone', 'origem', 'status', 'score', 'created_at']],
+            df[LEADS_TABLE_COLUMNS],
             use_container_width=True,
             column_config={
                 "id": "ID",
@@ -306,7 +383,7 @@ def show_leads_list():
                 "origem": "Origem",
                 "status": "Status",
                 "score": "Score",
-                "created_at": "Criado em"
+                "created_at": st.column_config.DatetimeColumn("Criado em", format="DD/MM/YYYY HH:mm")
             }
         )
         
@@ -450,7 +527,9 @@ def show_settings():
     st.subheader("📡 Status da API")
     
     try:
-        response = requests.get(f"{API_BASE_URL.replace('/api/v1', '')}/health")
+        response = get_http_session().get(
+            f"{API_BASE_URL.replace('/api/v1', '')}/health", timeout=REQUEST_TIMEOUT
+        )
         if response.status_code == 200:
             health_data = response.json()
             st.success(f"✅ API Online - Ambiente: {health_data.get('environment', 'N/A')}")
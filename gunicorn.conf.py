@@ -0,0 +1,87 @@
+"""
+Configuração do gunicorn para produção (workers uvicorn).
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Variáveis de ambiente:
+    WEB_CONCURRENCY             workers (padrão: núcleos disponíveis)
+    GUNICORN_BIND               endereço (padrão: API_HOST:API_PORT)
+    GUNICORN_TIMEOUT            segundos até um worker travado ser reiniciado
+    GUNICORN_GRACEFUL_TIMEOUT   segundos para concluir requisições ao reciclar/encerrar
+    GUNICORN_MAX_REQUESTS       requisições por worker antes de reciclá-lo (0 desabilita)
+    PROMETHEUS_MULTIPROC_DIR    diretório das métricas compartilhadas entre workers
+"""
+
+import os
+import shutil
+
+
+def _available_cpus() -> int:
+    # Respeita o limite de CPUs do container/cgroup quando disponível
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+bind = os.environ.get(
+    "GUNICORN_BIND", f"{os.environ.get('API_HOST', '0.0.0.0')}:{os.environ.get('API_PORT', '8000')}"
+)
+workers = int(os.environ.get("WEB_CONCURRENCY", _available_cpus()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# A aplicação é importada uma vez no master e compartilhada (copy-on-write) pelos workers
+preload_app = True
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+# Reciclagem gradual dos workers (contém vazamentos de memória); o jitter evita
+# que todos reiniciem ao mesmo tempo
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", str(max_requests // 10)))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+# Métricas Prometheus agregadas entre workers: o diretório precisa existir,
+# vazio, antes de a aplicação ser importada (preload)
+if workers > 1:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/streamleads_prometheus")
+
+_prometheus_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if _prometheus_dir:
+    shutil.rmtree(_prometheus_dir, ignore_errors=True)
+    os.makedirs(_prometheus_dir, exist_ok=True)
+
+
+def on_starting(server):
+    """Executa o create_all uma única vez no master, em vez de em cada worker"""
+    from app.config import settings
+    from app.database import create_tables, engine
+
+    if settings.debug:
+        server.log.warning("DEBUG=true em produção: SQL logado e reload ignorado; defina DEBUG=false")
+
+    if settings.db_create_tables_on_startup:
+        create_tables()
+        settings.db_create_tables_on_startup = False
+
+    # Conexões abertas pelo master não devem ser herdadas pelos workers
+    engine.dispose()
+
+
+def post_fork(server, worker):
+    """Descarta as conexões herdadas do master sem fechá-las (continuam do master)"""
+    from app.database import engine, replica_engines
+
+    for target in [engine, *replica_engines]:
+        target.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Remove as métricas de gauges "live" do worker encerrado"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
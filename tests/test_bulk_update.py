@@ -0,0 +1,98 @@
+import pytest
+
+from app.models.lead import Lead, LeadOrigin, LeadStatus
+from app.repositories.lead_repository import LeadRepository
+
+pytestmark = pytest.mark.database
+
+SCORING_FIELDS = ["interesse", "renda_aproximada", "cidade"]
+
+
+@pytest.fixture
+def leads(any_db, make_lead):
+    """Dois leads em Campinas e dois em Santos; os dois últimos ainda não processados"""
+    return [
+        make_lead(any_db, cidade="Campinas", origem=LeadOrigin.SITE),
+        make_lead(any_db, cidade="Santos", origem=LeadOrigin.SITE),
+        make_lead(any_db, cidade="Campinas", origem=LeadOrigin.WHATSAPP,
+                  processado="N", status=LeadStatus.PROCESSANDO),
+        make_lead(any_db, cidade="Santos", origem=LeadOrigin.WHATSAPP,
+                  processado="N", status=LeadStatus.PROCESSANDO),
+    ]
+
+
+def _ids(leads):
+    return sorted(lead.id for lead in leads)
+
+
+def _processado(db):
+    return dict(db.query(Lead.id, Lead.processado).all())
+
+
+def test_selects_by_ids(any_db, leads):
+    updated, _, _ = LeadRepository(any_db).bulk_update(
+        {"observacoes": "lote"}, ids=[leads[0].id, leads[3].id]
+    )
+
+    assert sorted(updated) == [leads[0].id, leads[3].id]
+    notes = dict(any_db.query(Lead.id, Lead.observacoes).all())
+    assert notes == {
+        leads[0].id: "lote", leads[1].id: None, leads[2].id: None, leads[3].id: "lote"
+    }
+
+
+def test_selects_by_filter(any_db, leads):
+    updated, _, _ = LeadRepository(any_db).bulk_update(
+        {"observacoes": "whatsapp"}, origem=LeadOrigin.WHATSAPP
+    )
+
+    assert sorted(updated) == _ids(leads[2:])
+
+
+def test_rescores_only_leads_whose_scoring_fields_changed(any_db, leads):
+    updated, rescore, _ = LeadRepository(any_db).bulk_update(
+        {"cidade": "Campinas"}, ids=_ids(leads), rescore_fields=SCORING_FIELDS
+    )
+
+    assert sorted(updated) == _ids(leads)
+    # Quem já estava em Campinas não muda, mesmo o lead 3 que já era "N"
+    assert sorted(rescore) == [leads[1].id, leads[3].id]
+
+    processado = _processado(any_db)
+    assert processado[leads[0].id] == "Y"
+    assert processado[leads[1].id] == "N"
+    cidades = {cidade for (cidade,) in any_db.query(Lead.cidade_normalizada)}
+    assert cidades == {"campinas"}
+
+
+def test_non_scoring_change_rescores_nothing(any_db, leads):
+    _, rescore, _ = LeadRepository(any_db).bulk_update(
+        {"observacoes": "sem impacto"}, ids=_ids(leads), rescore_fields=SCORING_FIELDS
+    )
+
+    assert rescore == []
+    assert _processado(any_db) == {
+        leads[0].id: "Y", leads[1].id: "Y", leads[2].id: "N", leads[3].id: "N"
+    }
+
+
+def test_reports_previous_status_only_for_changed_leads(any_db, leads):
+    _, _, status_changes = LeadRepository(any_db).bulk_update(
+        {"status": LeadStatus.FRIO}, ids=_ids(leads)
+    )
+
+    assert status_changes == {
+        leads[2].id: LeadStatus.PROCESSANDO, leads[3].id: LeadStatus.PROCESSANDO
+    }
+
+
+def test_no_status_changes_without_status_in_values(any_db, leads):
+    _, _, status_changes = LeadRepository(any_db).bulk_update(
+        {"observacoes": "x"}, ids=_ids(leads)
+    )
+
+    assert status_changes == {}
+
+
+def test_empty_selection(any_db, leads):
+    assert LeadRepository(any_db).bulk_update({"observacoes": "x"}, ids=[]) == ([], [], {})
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.api.caching import check_etag, etag_matches, make_etag
+from app.models.lead import Lead
+
+
+def test_make_etag_is_weak_and_depends_on_every_part():
+    etag = make_etag("/leads/1", 1, None)
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag("/leads/1", 1, None)
+    assert etag != make_etag("/leads/1", 1, "2024-01-01")
+    assert etag != make_etag("/leads/2", 1, None)
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False),
+    ("", False),
+    ('W/"abc"', True),
+    # Comparação fraca: o ETag forte equivalente também vale
+    ('"abc"', True),
+    ('W/"outro", W/"abc"', True),
+    ("*", True),
+    ('W/"outro"', False),
+])
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, 'W/"abc"') is expected
+
+
+@pytest.fixture
+def versioned_client():
+    """Aplicação mínima cujo recurso tem a versão definida pelo teste"""
+    app = FastAPI()
+    state = {"version": 1, "built": 0}
+
+    @app.get("/recurso")
+    async def recurso(request: Request, response: Response):
+        not_modified = check_etag(request, response, state["version"])
+        if not_modified:
+            return not_modified
+        state["built"] += 1
+        return {"version": state["version"]}
+
+    return TestClient(app), state
+
+
+def test_check_etag_returns_304_without_building_the_body(versioned_client):
+    client, state = versioned_client
+
+    first = client.get("/recurso")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = client.get("/recurso", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+    assert state["built"] == 1
+
+
+def test_check_etag_returns_new_version_after_change(versioned_client):
+    client, state = versioned_client
+    etag = client.get("/recurso").headers["etag"]
+
+    state["version"] = 2
+    response = client.get("/recurso", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json() == {"version": 2}
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.api
+def test_get_lead_conditional_get(client, db, make_lead):
+    lead = make_lead(db)
+    url = f"/api/v1/leads/{lead.id}"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # Alteração do lead muda updated_at e, com ele, o ETag
+    db.query(Lead).filter(Lead.id == lead.id).update(
+        {"observacoes": "alterado", "updated_at": datetime.now() + timedelta(minutes=1)}
+    )
+    db.commit()
+
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["observacoes"] == "alterado"
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.api
+def test_list_etag_varies_with_query_and_data(client, db, make_lead):
+    make_lead(db)
+    etag = client.get("/api/v1/leads/").headers["etag"]
+
+    assert client.get("/api/v1/leads/", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/v1/leads/?per_page=5", headers={"If-None-Match": etag}).status_code == 200
+
+    make_lead(db)
+    assert client.get("/api/v1/leads/", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,51 @@
+import pytest
+
+from app.models.lead import Lead
+from app.services.deduplication import LeadDeduplicationService, _UnionFind
+
+pytestmark = pytest.mark.database
+
+
+def test_union_find_groups_by_smallest_id():
+    groups = _UnionFind()
+    groups.union(5, 3)
+    groups.union(3, 9)
+    groups.union(7, 8)
+    groups.find(1)
+
+    assert sorted(groups.clusters()) == [[3, 5, 9], [7, 8]]
+
+
+def test_find_clusters_joins_exact_and_blocking_keys(db, make_lead):
+    # Mesmo email com variantes do Gmail
+    a = make_lead(db, email="joao.silva@gmail.com")
+    b = make_lead(db, email="joaosilva+promo@gmail.com")
+    # Mesmo telefone com e sem DDI, ligado ao grupo anterior pelo email
+    c = make_lead(db, email="JoaoSilva@gmail.com", telefone="+55 (21) 98888-7777")
+    d = make_lead(db, telefone="21 98888-7777")
+    # Mesmo nome + cidade e número antigo sem o nono dígito
+    e = make_lead(db, nome="Maria da Silva", cidade="São Paulo - SP", telefone="11 8765-4321")
+    f = make_lead(db, nome="Maria Silva", cidade="sao paulo", telefone="(11) 98765-4321")
+    # Mesmo nome + cidade, mas email e telefone sem relação
+    make_lead(db, nome="Maria Silva", cidade="São Paulo", email="outra@example.com", telefone="11 91111-2222")
+    make_lead(db, email="isolado@example.com")
+
+    clusters = LeadDeduplicationService(db)._find_clusters()
+
+    assert sorted(clusters) == [[a.id, b.id, c.id, d.id], [e.id, f.id]]
+
+
+def test_merge_duplicates_keeps_oldest_and_fills_missing_fields(db, make_lead):
+    canonical = make_lead(db, email="ana@gmail.com", cidade=None)
+    duplicate = make_lead(db, email="a.n.a@gmail.com", cidade="Campinas", interesse="Imóveis")
+
+    result = LeadDeduplicationService(db).merge_duplicates()
+
+    assert result["grupos_duplicados"] == 1
+    assert result["leads_mesclados"] == 1
+    assert db.query(Lead).count() == 1
+    db.refresh(canonical)
+    assert canonical.cidade == "Campinas"
+    assert canonical.interesse == "Imóveis"
+    assert canonical.processado == "N"
+    assert str(duplicate.id) in canonical.observacoes
@@ -0,0 +1,29 @@
+import pytest
+
+from app.config import settings
+
+pytestmark = pytest.mark.api
+
+DIAGNOSTIC_ROUTES = ["/health/pool", "/traces", "/traces/inexistente", "/admin/profiles"]
+
+
+@pytest.mark.parametrize("path", DIAGNOSTIC_ROUTES)
+def test_diagnostics_disabled_without_admin_token(client, monkeypatch, path):
+    monkeypatch.setattr(settings, "admin_token", None)
+
+    assert client.get(path, headers={"X-Admin-Token": "qualquer"}).status_code == 404
+
+
+@pytest.mark.parametrize("path", DIAGNOSTIC_ROUTES)
+def test_diagnostics_require_admin_token(client, monkeypatch, path):
+    monkeypatch.setattr(settings, "admin_token", "segredo")
+
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={"X-Admin-Token": "errado"}).status_code == 403
+
+
+@pytest.mark.parametrize("path", ["/health/pool", "/traces", "/admin/profiles"])
+def test_diagnostics_with_admin_token(client, monkeypatch, path):
+    monkeypatch.setattr(settings, "admin_token", "segredo")
+
+    assert client.get(path, headers={"X-Admin-Token": "segredo"}).status_code == 200
@@ -0,0 +1,78 @@
+import pytest
+
+from app.services.deduplication import _is_probable_match
+from app.utils.normalization import name_key, normalize_city, normalize_email, normalize_phone
+
+
+@pytest.mark.parametrize("email, expected", [
+    ("Joao.Silva@Gmail.com", "joaosilva@gmail.com"),
+    ("joao.silva+promo@gmail.com", "joaosilva@gmail.com"),
+    ("j.o.a.o.silva@googlemail.com", "joaosilva@gmail.com"),
+    ("joao+news@outlook.com", "joao@outlook.com"),
+    # Fora do Gmail o ponto diferencia caixas
+    ("joao.silva@outlook.com", "joao.silva@outlook.com"),
+    # Provedores sem plus addressing mantêm o sufixo
+    ("joao+tag@empresa.com.br", "joao+tag@empresa.com.br"),
+    ("  JOAO@EMPRESA.COM  ", "joao@empresa.com"),
+    ("sem-arroba", "sem-arroba"),
+    ("", None),
+    (None, None),
+])
+def test_normalize_email(email, expected):
+    assert normalize_email(email) == expected
+
+
+@pytest.mark.parametrize("telefone, expected", [
+    ("(11) 98765-4321", "11987654321"),
+    ("+55 (11) 98765-4321", "11987654321"),
+    ("55 11 98765 4321", "11987654321"),
+    # Zero de tronco
+    ("011 98765-4321", "11987654321"),
+    ("0055 11 98765-4321", "11987654321"),
+    # Fixo (8 dígitos) com DDI
+    ("+55 11 3456-7890", "1134567890"),
+    # Número de 11 dígitos que começa com 55 não perde o DDD
+    ("55 98765-4321", "55987654321"),
+    ("sem dígitos", None),
+    (None, None),
+])
+def test_normalize_phone(telefone, expected):
+    assert normalize_phone(telefone) == expected
+
+
+@pytest.mark.parametrize("nome, expected", [
+    ("Maria da Silva", "maria silva"),
+    ("Maria Silva", "maria silva"),
+    ("  JOSÉ  dos   Santos Conceição ", "jose conceicao"),
+    ("Ana", "ana"),
+    ("da de do", None),
+    (None, None),
+])
+def test_name_key(nome, expected):
+    assert name_key(nome) == expected
+
+
+@pytest.mark.parametrize("cidade, expected", [
+    ("São Paulo - SP", "sao paulo"),
+    ("São Paulo/SP", "sao paulo"),
+    ("Campinas, SP", "campinas"),
+    ("Embu-Guaçu", "embu-guacu"),
+    ("  Rio   de Janeiro ", "rio de janeiro"),
+    ("", None),
+])
+def test_normalize_city(cidade, expected):
+    assert normalize_city(cidade) == expected
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    # Nono dígito: o número antigo de 8 dígitos é o mesmo celular
+    (("x@a.com", "1187654321"), ("y@b.com", "11987654321"), True),
+    # Mesmo número em outro DDD
+    (("x@a.com", "11987654321"), ("y@b.com", "21987654321"), True),
+    # Mesmo usuário de email em outro provedor
+    (("maria@gmail.com", None), ("maria@hotmail.com", None), True),
+    (("maria@gmail.com", "11911112222"), ("ana@gmail.com", "11933334444"), False),
+    ((None, None), (None, None), False),
+])
+def test_is_probable_match(a, b, expected):
+    assert _is_probable_match(a[0], a[1], b[0], b[1]) is expected
@@ -0,0 +1,199 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.lead import LeadOrigin
+from app.repositories.lead_repository import LeadRepository
+from app.services.timeseries import (
+    TOTAL_SERIES, Granularity, TimeSeriesBuilder, bucket_range, lttb, truncate
+)
+
+UTC = timezone.utc
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=UTC)
+
+
+@pytest.mark.parametrize("threshold", [0, 2, 10, 20])
+def test_lttb_keeps_everything_when_there_is_nothing_to_reduce(threshold):
+    assert lttb(list(range(10)), threshold) == list(range(10))
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    values = [1.0] * 100
+    values[37] = 50.0
+    values[71] = -40.0
+
+    selected = lttb(values, 10)
+
+    assert len(selected) == 10
+    assert selected[0] == 0 and selected[-1] == 99
+    assert selected == sorted(selected)
+    assert {37, 71} <= set(selected)
+
+
+@pytest.mark.parametrize("value, granularity, expected", [
+    (_utc(2026, 10, 15, 13, 45, 10), Granularity.HOUR, _utc(2026, 10, 15, 13)),
+    (_utc(2026, 10, 15, 13, 45), Granularity.DAY, _utc(2026, 10, 15)),
+    # 15/10/2026 é uma quinta; a semana começa na segunda
+    (_utc(2026, 10, 15, 13, 45), Granularity.WEEK, _utc(2026, 10, 12)),
+    (_utc(2026, 10, 12), Granularity.WEEK, _utc(2026, 10, 12)),
+    (_utc(2026, 10, 15, 13, 45), Granularity.MONTH, _utc(2026, 10, 1)),
+])
+def test_truncate(value, granularity, expected):
+    assert truncate(value, granularity) == expected
+
+
+def test_bucket_range_crosses_the_year_by_month():
+    buckets = bucket_range(_utc(2025, 11, 20), _utc(2026, 2, 1), Granularity.MONTH)
+
+    assert buckets == [_utc(2025, 11, 1), _utc(2025, 12, 1), _utc(2026, 1, 1)]
+
+
+def test_bucket_range_by_week_starts_on_monday():
+    buckets = bucket_range(_utc(2026, 10, 1), _utc(2026, 10, 20), Granularity.WEEK)
+
+    assert buckets[0] == _utc(2026, 9, 28)
+    assert all(bucket.weekday() == 0 for bucket in buckets)
+    assert buckets[-1] == _utc(2026, 10, 19)
+
+
+def test_builder_fills_gaps_with_zeros_and_sorts_by_total():
+    builder = TimeSeriesBuilder(Granularity.DAY, _utc(2026, 10, 1), _utc(2026, 10, 5))
+    rows = [
+        (_utc(2026, 10, 1), "Site", 2),
+        (_utc(2026, 10, 4), "Site", 1),
+        (_utc(2026, 10, 2), "WhatsApp", 5),
+        # Fora da janela: ignorado
+        (_utc(2026, 10, 9), "WhatsApp", 7),
+    ]
+
+    series = builder.build(rows)
+
+    assert [item["nome"] for item in series] == ["WhatsApp", "Site"]
+    assert [point["count"] for point in series[1]["pontos"]] == [2, 0, 0, 1]
+    assert [point["t"] for point in series[1]["pontos"]] == builder.buckets
+    assert [item["total"] for item in series] == [5, 3]
+
+
+def test_builder_without_rows_returns_a_zeroed_total_series():
+    builder = TimeSeriesBuilder(Granularity.DAY, _utc(2026, 10, 1), _utc(2026, 10, 4))
+
+    series = builder.build([])
+
+    assert series == [{
+        "nome": TOTAL_SERIES,
+        "total": 0,
+        "pontos": [{"t": bucket, "count": 0} for bucket in builder.buckets]
+    }]
+
+
+def test_builder_reduces_each_series_to_max_points():
+    builder = TimeSeriesBuilder(Granularity.HOUR, _utc(2026, 10, 1), _utc(2026, 10, 3))
+    rows = [(bucket, None, index % 7) for index, bucket in enumerate(builder.buckets)]
+
+    series = builder.build(rows, max_points=10)
+
+    assert len(builder.buckets) == 48
+    assert len(series[0]["pontos"]) == 10
+    assert series[0]["total"] == sum(index % 7 for index in range(48))
+
+
+@pytest.fixture
+def dated_leads(any_db, make_lead):
+    """Leads em datas fixas (UTC): 2026-10-05 é segunda, 2026-10-11 domingo"""
+    for created_at, origem in [
+        (datetime(2026, 9, 30, 23, 0), LeadOrigin.SITE),
+        (datetime(2026, 10, 5, 8, 0), LeadOrigin.SITE),
+        (datetime(2026, 10, 5, 20, 0), LeadOrigin.WHATSAPP),
+        (datetime(2026, 10, 11, 23, 59), LeadOrigin.WHATSAPP),
+        (datetime(2026, 10, 12, 0, 0), LeadOrigin.SITE),
+    ]:
+        make_lead(any_db, created_at=created_at, origem=origem)
+
+
+@pytest.fixture
+def dated_leads_sqlite(db, make_lead):
+    """Leads de outubro/2026 no banco usado pelo TestClient"""
+    for day, origem in [(2, LeadOrigin.SITE), (5, LeadOrigin.WHATSAPP), (5, LeadOrigin.SITE), (20, LeadOrigin.SITE)]:
+        make_lead(db, created_at=datetime(2026, 10, day, 12, 0), origem=origem)
+
+
+@pytest.mark.database
+@pytest.mark.parametrize("granularity, expected", [
+    ("day", {_utc(2026, 9, 30): 1, _utc(2026, 10, 5): 2, _utc(2026, 10, 11): 1, _utc(2026, 10, 12): 1}),
+    ("week", {_utc(2026, 9, 28): 1, _utc(2026, 10, 5): 3, _utc(2026, 10, 12): 1}),
+    ("month", {_utc(2026, 9, 1): 1, _utc(2026, 10, 1): 4}),
+])
+def test_get_timeseries_buckets(any_db, dated_leads, granularity, expected):
+    rows = LeadRepository(any_db).get_timeseries(
+        granularity, _utc(2026, 9, 1), _utc(2026, 11, 1)
+    )
+
+    assert {bucket: count for bucket, group, count in rows} == expected
+    assert {group for _, group, _ in rows} == {None}
+
+
+@pytest.mark.database
+def test_get_timeseries_breakdown_and_half_open_window(any_db, dated_leads):
+    rows = LeadRepository(any_db).get_timeseries(
+        "week", _utc(2026, 10, 1), _utc(2026, 10, 12), breakdown="origem"
+    )
+
+    assert sorted(rows) == [
+        (_utc(2026, 10, 5), "Site", 1),
+        (_utc(2026, 10, 5), "WhatsApp", 2),
+    ]
+
+
+@pytest.mark.database
+def test_dashboard_stats_embeds_the_series_in_the_same_query(any_db, dated_leads):
+    serie = ("week", _utc(2026, 10, 1), _utc(2026, 10, 13), "origem")
+
+    stats = LeadRepository(any_db).get_dashboard_stats(30, serie)
+
+    assert stats["leads_por_origem"] == {"Site": 3, "WhatsApp": 2}
+    assert sorted(stats["serie"]) == [
+        (_utc(2026, 10, 5), "Site", 1),
+        (_utc(2026, 10, 5), "WhatsApp", 2),
+        (_utc(2026, 10, 12), "Site", 1),
+    ]
+
+
+def test_dashboard_endpoint_keeps_the_per_day_series(client, db, make_lead):
+    now = datetime.now()
+    make_lead(db, created_at=now)
+    make_lead(db, created_at=now - timedelta(days=1))
+    make_lead(db, created_at=now - timedelta(days=40))
+
+    body = client.get("/api/v1/leads/stats/dashboard", params={"days": 7}).json()
+
+    assert body["dias"] == 7
+    assert body["resumo"]["total_leads"] == 3
+    assert sum(item["count"] for item in body["leads_por_periodo"]) == 2
+    assert body["leads_por_periodo"] == sorted(body["leads_por_periodo"], key=lambda item: item["data"])
+    assert body["serie_temporal"] is None
+
+
+def test_dashboard_endpoint_serie_matches_timeseries_endpoint(client, db, dated_leads_sqlite):
+    params = {
+        "granularity": "day", "data_inicio": "2026-10-01", "data_fim": "2026-10-31",
+        "breakdown": "origem", "max_points": 10
+    }
+
+    dashboard = client.get("/api/v1/leads/stats/dashboard", params=params)
+    timeseries = client.get("/api/v1/leads/stats/timeseries", params=params)
+
+    assert dashboard.status_code == 200
+    assert dashboard.json()["serie_temporal"] == timeseries.json()
+    assert dashboard.json()["serie_temporal"]["amostrado"] is True
+
+
+@pytest.mark.parametrize("path", ["/api/v1/leads/stats/dashboard", "/api/v1/leads/stats/timeseries"])
+def test_timeseries_window_is_validated(client, path):
+    inverted = client.get(path, params={"granularity": "day", "data_inicio": "2026-10-10", "data_fim": "2026-10-01"})
+    too_long = client.get(path, params={"granularity": "day", "data_inicio": "2000-01-01", "data_fim": "2026-10-01"})
+
+    assert inverted.status_code == 422
+    assert too_long.status_code == 422